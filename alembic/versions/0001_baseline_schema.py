@@ -0,0 +1,535 @@
+"""baseline schema
+
+The tables as they stood before migrations were kept in the repository, when the first
+start of a deployment autogenerated its own initial revision (see entrypoint.sh).
+
+Revision ID: 0001_baseline
+Revises: 
+Create Date: 2026-10-17 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '0001_baseline'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Enum types shared between tables, created once up front
+ENUMS = {
+    'orderstatus': ['pending', 'fulfilled', 'cancelled'],
+    'paymenttype': ['ORDER_CARD', 'ORDER_TRANSFER', 'INVOICE', 'INSTALLMENT', 'LOAN', 'TRANSFER', 'BUY_NOW_PAY_LATER', 'MONEY_REQUEST'],
+    'paymentstatus': ['PENDING', 'PROCESSING', 'COMPLETED', 'FAILED', 'CANCELLED'],
+    'accountsource': ['INTERNAL', 'EXTERNAL'],
+    'accounttype': ['PERSONAL', 'BUSINESS'],
+    'payout_status': ['PENDING', 'PAID'],
+    'restockrequesturgency': ['NORMAL', 'HIGH'],
+    'restockrequeststatus': ['PENDING', 'APPROVED', 'DELIVERED', 'CANCELLED'],
+    'transactiontype': ['CREDIT', 'DEBIT'],
+    'transactiontag': ['SALES', 'RESTOCK', 'ONLINE', 'LOAN', 'TRANSFER', 'OTHERS', 'MONEY_REQUEST'],
+    'automationtype': ['TRANSFER', 'POOL_TRANSFER'],
+    'automationschedule': ['DAILY', 'WEEKLY', 'BIWEEKLY', 'MONTHLY'],
+}
+
+# Foreign keys between tables that reference each other (orders, payments, invoices and
+# marketplace orders), added once all tables exist; named the way PostgreSQL names them
+DEFERRED_FOREIGN_KEYS = [
+    ('invoice_requests', 'orders', ['order_id'], ['id']),
+    ('invoice_requests', 'users', ['created_by'], ['id']),
+    ('invoice_requests', 'users', ['generated_by'], ['id']),
+    ('invoice_requests', 'users', ['updated_by'], ['id']),
+    ('marketplace_orders', 'payments', ['payment_id'], ['id']),
+    ('orders', 'marketplace_orders', ['marketplace_order_id'], ['id']),
+    ('orders', 'users', ['buyer_id'], ['id']),
+    ('orders', 'users', ['seller_id'], ['id']),
+    ('payments', 'bank_accounts', ['from_account_id'], ['id']),
+    ('payments', 'bank_accounts', ['to_account_id'], ['id']),
+    ('payments', 'external_accounts', ['from_external_account_id'], ['id']),
+    ('payments', 'external_accounts', ['to_external_account_id'], ['id']),
+    ('payments', 'invoice_requests', ['invoice_request_id'], ['id']),
+    ('payments', 'loans', ['loan_id'], ['id']),
+    ('payments', 'marketplace_orders', ['marketplace_order_id'], ['id']),
+    ('payments', 'money_requests', ['money_request_id'], ['id']),
+    ('payments', 'orders', ['order_id'], ['id']),
+]
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    # Databases whose tables were made by create_all at startup already hold this schema
+    if sa.inspect(bind).has_table('users'):
+        return
+
+    for name, values in ENUMS.items():
+        postgresql.ENUM(*values, name=name).create(bind, checkfirst=True)
+
+    op.create_table('invoice_requests',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('order_id', sa.Integer(), nullable=False),
+    sa.Column('customer_name', sa.String(), nullable=False),
+    sa.Column('customer_email', sa.String(), nullable=False),
+    sa.Column('customer_phone', sa.String(), nullable=True),
+    sa.Column('shipping_address', sa.String(), nullable=False),
+    sa.Column('amount', sa.Float(), nullable=False),
+    sa.Column('items', sa.JSON(), nullable=False),
+    sa.Column('status', sa.String(), nullable=False),
+    sa.Column('invoice_number', sa.String(), nullable=True),
+    sa.Column('notes', sa.String(), nullable=True),
+    sa.Column('payment_terms', sa.String(), nullable=True),
+    sa.Column('due_date', sa.DateTime(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.Column('generated_at', sa.DateTime(), nullable=True),
+    sa.Column('sent_at', sa.DateTime(), nullable=True),
+    sa.Column('paid_at', sa.DateTime(), nullable=True),
+    sa.Column('created_by', sa.Integer(), nullable=True),
+    sa.Column('generated_by', sa.Integer(), nullable=True),
+    sa.Column('updated_by', sa.Integer(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('invoice_number')
+    )
+    op.create_index(op.f('ix_invoice_requests_id'), 'invoice_requests', ['id'], unique=False)
+    op.create_table('marketplace_orders',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('customer_name', sa.String(), nullable=True),
+    sa.Column('customer_email', sa.String(), nullable=True),
+    sa.Column('customer_phone', sa.String(), nullable=True),
+    sa.Column('shipping_address', sa.String(), nullable=True),
+    sa.Column('total_amount', sa.Float(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('payment_info', sa.JSON(), nullable=True),
+    sa.Column('payment_id', sa.Integer(), nullable=True),
+    sa.Column('order_type', sa.String(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_marketplace_orders_id'), 'marketplace_orders', ['id'], unique=False)
+    op.create_table('orders',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('marketplace_order_id', sa.Integer(), nullable=True),
+    sa.Column('seller_id', sa.Integer(), nullable=True),
+    sa.Column('buyer_id', sa.Integer(), nullable=True),
+    sa.Column('customer_name', sa.String(), nullable=True),
+    sa.Column('customer_email', sa.String(), nullable=True),
+    sa.Column('customer_phone', sa.String(), nullable=True),
+    sa.Column('shipping_address', sa.String(), nullable=True),
+    sa.Column('total_amount', sa.Float(), nullable=True),
+    sa.Column('payment_info', sa.JSON(), nullable=True),
+    sa.Column('order_type', sa.String(), nullable=True),
+    sa.Column('status', postgresql.ENUM('pending', 'fulfilled', 'cancelled', name='orderstatus'), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_orders_id'), 'orders', ['id'], unique=False)
+    op.create_table('otp_verifications',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('email', sa.String(), nullable=False),
+    sa.Column('phone', sa.String(), nullable=False),
+    sa.Column('otp', sa.String(), nullable=False),
+    sa.Column('type', sa.String(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('used_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_otp_verifications_id'), 'otp_verifications', ['id'], unique=False)
+    op.create_table('payments',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('payment_type', postgresql.ENUM('ORDER_CARD', 'ORDER_TRANSFER', 'INVOICE', 'INSTALLMENT', 'LOAN', 'TRANSFER', 'BUY_NOW_PAY_LATER', 'MONEY_REQUEST', name='paymenttype'), nullable=False),
+    sa.Column('amount', sa.Float(), nullable=False),
+    sa.Column('status', postgresql.ENUM('PENDING', 'PROCESSING', 'COMPLETED', 'FAILED', 'CANCELLED', name='paymentstatus'), nullable=False),
+    sa.Column('from_account_id', sa.Integer(), nullable=True),
+    sa.Column('from_external_account_id', sa.Integer(), nullable=True),
+    sa.Column('from_account_source', postgresql.ENUM('INTERNAL', 'EXTERNAL', name='accountsource'), nullable=False),
+    sa.Column('to_account_id', sa.Integer(), nullable=True),
+    sa.Column('to_external_account_id', sa.Integer(), nullable=True),
+    sa.Column('to_account_source', postgresql.ENUM('INTERNAL', 'EXTERNAL', name='accountsource'), nullable=False),
+    sa.Column('description', sa.String(length=255), nullable=True),
+    sa.Column('gateway_transaction_id', sa.String(), nullable=True),
+    sa.Column('reference_number', sa.String(length=50), nullable=True),
+    sa.Column('due_date', sa.DateTime(), nullable=True),
+    sa.Column('completed_at', sa.DateTime(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('total_installments', sa.Integer(), nullable=True),
+    sa.Column('current_installment', sa.Integer(), nullable=True),
+    sa.Column('installment_amount', sa.Float(), nullable=True),
+    sa.Column('loan_id', sa.Integer(), nullable=True),
+    sa.Column('order_id', sa.Integer(), nullable=True),
+    sa.Column('marketplace_order_id', sa.Integer(), nullable=True),
+    sa.Column('invoice_request_id', sa.Integer(), nullable=True),
+    sa.Column('money_request_id', sa.Integer(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('gateway_transaction_id'),
+    sa.UniqueConstraint('reference_number')
+    )
+    op.create_table('token_blacklist',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('token', sa.String(length=500), nullable=False),
+    sa.Column('blacklisted_on', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('token')
+    )
+    op.create_table('users',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('email', sa.String(length=120), nullable=False),
+    sa.Column('phone', sa.String(length=15), nullable=True),
+    sa.Column('password', sa.String(length=60), nullable=False),
+    sa.Column('business_name', sa.String(length=100), nullable=True),
+    sa.Column('store_slug', sa.String(length=150), nullable=True),
+    sa.Column('has_business_account', sa.Boolean(), nullable=True),
+    sa.Column('has_personal_account', sa.Boolean(), nullable=True),
+    sa.Column('business_banking_onboarded', sa.Boolean(), nullable=True),
+    sa.Column('personal_banking_onboarded', sa.Boolean(), nullable=True),
+    sa.Column('is_admin', sa.Boolean(), nullable=True),
+    sa.Column('admin_role', sa.String(length=50), nullable=True),
+    sa.Column('last_login', sa.DateTime(), nullable=True),
+    sa.Column('is_verified', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('active_view', sa.String(length=20), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('email'),
+    sa.UniqueConstraint('phone'),
+    sa.UniqueConstraint('store_slug')
+    )
+    op.create_table('bank_accounts',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('account_type', postgresql.ENUM('PERSONAL', 'BUSINESS', name='accounttype'), nullable=False),
+    sa.Column('account_name', sa.String(length=100), nullable=False),
+    sa.Column('account_number', sa.String(length=20), nullable=False),
+    sa.Column('bvn', sa.String(length=11), nullable=True),
+    sa.Column('bank_name', sa.String(length=100), nullable=False),
+    sa.Column('balance', sa.Float(), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('bank_details',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('bank_name', sa.String(), nullable=True),
+    sa.Column('account_number', sa.String(), nullable=True),
+    sa.Column('account_name', sa.String(), nullable=True),
+    sa.Column('sort_code', sa.String(), nullable=True),
+    sa.Column('account_type', sa.String(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_bank_details_bank_name'), 'bank_details', ['bank_name'], unique=False)
+    op.create_index(op.f('ix_bank_details_id'), 'bank_details', ['id'], unique=False)
+    op.create_table('external_accounts',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('account_name', sa.String(length=100), nullable=False),
+    sa.Column('account_number', sa.String(length=20), nullable=False),
+    sa.Column('bank_name', sa.String(length=100), nullable=False),
+    sa.Column('description', sa.String(length=255), nullable=True),
+    sa.Column('is_verified', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('feedback',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('email', sa.String(length=120), nullable=False),
+    sa.Column('phone', sa.String(length=20), nullable=True),
+    sa.Column('message', sa.Text(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=True),
+    sa.Column('admin_notes', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('money_requests',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('requester_id', sa.Integer(), nullable=False),
+    sa.Column('requested_from_id', sa.Integer(), nullable=False),
+    sa.Column('amount', sa.Float(), nullable=False),
+    sa.Column('description', sa.String(), nullable=True),
+    sa.Column('account_type', sa.String(), nullable=False),
+    sa.Column('request_from_account_type', sa.String(), nullable=True),
+    sa.Column('status', sa.String(), nullable=True),
+    sa.Column('rejection_reason', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('expires_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['requested_from_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['requester_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('notifications',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('type', sa.String(), nullable=False),
+    sa.Column('notification_metadata', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.Column('text', sa.String(), nullable=False),
+    sa.Column('is_read', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('reference_id', sa.Integer(), nullable=True),
+    sa.Column('reference_type', sa.String(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('payout_bank_details',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('bank_name', sa.String(), nullable=False),
+    sa.Column('account_number', sa.String(), nullable=False),
+    sa.Column('account_name', sa.String(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id')
+    )
+    op.create_index(op.f('ix_payout_bank_details_id'), 'payout_bank_details', ['id'], unique=False)
+    op.create_table('payouts',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('seller_id', sa.Integer(), nullable=False),
+    sa.Column('order_id', sa.Integer(), nullable=False),
+    sa.Column('amount', sa.Float(), nullable=False),
+    sa.Column('status', postgresql.ENUM('PENDING', 'PAID', name='payout_status'), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('paid_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['order_id'], ['orders.id'], ),
+    sa.ForeignKeyConstraint(['seller_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('products',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('sku', sa.String(length=50), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=True),
+    sa.Column('price', sa.Float(), nullable=False),
+    sa.Column('low_stock_threshold', sa.Integer(), nullable=True),
+    sa.Column('category', sa.String(length=50), nullable=True),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'sku')
+    )
+    op.create_table('store_settings',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('theme', sa.String(length=50), nullable=True),
+    sa.Column('logo_url', sa.String(length=200), nullable=True),
+    sa.Column('primary_color', sa.String(length=7), nullable=True),
+    sa.Column('secondary_color', sa.String(length=7), nullable=True),
+    sa.Column('tagline', sa.String(length=200), nullable=True),
+    sa.Column('street_address', sa.String(length=200), nullable=True),
+    sa.Column('phone_number', sa.String(length=20), nullable=True),
+    sa.Column('contact_email', sa.String(length=120), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('financial_pools',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('bank_account_id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('percentage', sa.Float(), nullable=False),
+    sa.Column('balance', sa.Float(), nullable=True),
+    sa.Column('is_credit_pool', sa.Boolean(), nullable=True),
+    sa.Column('is_locked', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['bank_account_id'], ['bank_accounts.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('loans',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('bank_account_id', sa.Integer(), nullable=False),
+    sa.Column('amount', sa.Float(), nullable=False),
+    sa.Column('purpose', sa.String(length=255), nullable=True),
+    sa.Column('status', sa.String(length=50), nullable=False),
+    sa.Column('remaining_amount', sa.Float(), nullable=False),
+    sa.Column('equity_share', sa.Float(), nullable=True),
+    sa.Column('rejection_reason', sa.Text(), nullable=True),
+    sa.Column('approved_at', sa.DateTime(), nullable=True),
+    sa.Column('completed_at', sa.DateTime(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['bank_account_id'], ['bank_accounts.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('order_items',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('order_id', sa.Integer(), nullable=True),
+    sa.Column('product_id', sa.Integer(), nullable=True),
+    sa.Column('quantity', sa.Integer(), nullable=True),
+    sa.Column('price', sa.Float(), nullable=True),
+    sa.ForeignKeyConstraint(['order_id'], ['orders.id'], ),
+    sa.ForeignKeyConstraint(['product_id'], ['products.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_order_items_id'), 'order_items', ['id'], unique=False)
+    op.create_table('product_images',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('image_url', sa.String(length=255), nullable=False),
+    sa.ForeignKeyConstraint(['product_id'], ['products.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('product_reviews',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('rating', sa.Integer(), nullable=False),
+    sa.Column('review_text', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['product_id'], ['products.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'product_id')
+    )
+    op.create_table('product_views',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('viewed_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['product_id'], ['products.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('product_wishlists',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['product_id'], ['products.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'product_id')
+    )
+    op.create_table('restock_requests',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('product_id', sa.Integer(), nullable=True),
+    sa.Column('product_name', sa.String(length=100), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('address', sa.Text(), nullable=False),
+    sa.Column('additional_notes', sa.Text(), nullable=True),
+    sa.Column('urgency', postgresql.ENUM('NORMAL', 'HIGH', name='restockrequesturgency'), nullable=True),
+    sa.Column('status', postgresql.ENUM('PENDING', 'APPROVED', 'DELIVERED', 'CANCELLED', name='restockrequeststatus'), nullable=True),
+    sa.Column('type', sa.String(length=20), nullable=False),
+    sa.Column('request_date', sa.DateTime(), nullable=True),
+    sa.Column('expected_delivery', sa.DateTime(), nullable=True),
+    sa.Column('admin_notes', sa.Text(), nullable=True),
+    sa.Column('delivered_date', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['product_id'], ['products.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('storefront_products',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('storefront_price', sa.Float(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['product_id'], ['products.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'product_id')
+    )
+    op.create_table('transactions',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('bank_account_id', sa.Integer(), nullable=False),
+    sa.Column('type', postgresql.ENUM('CREDIT', 'DEBIT', name='transactiontype'), nullable=False),
+    sa.Column('amount', sa.Float(), nullable=False),
+    sa.Column('description', sa.String(length=255), nullable=True),
+    sa.Column('reference', sa.String(length=50), nullable=False),
+    sa.Column('tag', postgresql.ENUM('SALES', 'RESTOCK', 'ONLINE', 'LOAN', 'TRANSFER', 'OTHERS', 'MONEY_REQUEST', name='transactiontag'), nullable=False),
+    sa.Column('payment_id', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['bank_account_id'], ['bank_accounts.id'], ),
+    sa.ForeignKeyConstraint(['payment_id'], ['payments.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('banking_automations',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('bank_account_id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('type', postgresql.ENUM('TRANSFER', 'POOL_TRANSFER', name='automationtype'), nullable=False),
+    sa.Column('schedule', postgresql.ENUM('DAILY', 'WEEKLY', 'BIWEEKLY', 'MONTHLY', name='automationschedule'), nullable=False),
+    sa.Column('amount', sa.Float(), nullable=True),
+    sa.Column('percentage', sa.Float(), nullable=True),
+    sa.Column('source_pool_id', sa.Integer(), nullable=False),
+    sa.Column('destination_pool_id', sa.Integer(), nullable=True),
+    sa.Column('destination_account_id', sa.Integer(), nullable=True),
+    sa.Column('destination_bam_account_id', sa.Integer(), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('last_run', sa.DateTime(), nullable=True),
+    sa.Column('next_run', sa.DateTime(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['bank_account_id'], ['bank_accounts.id'], ),
+    sa.ForeignKeyConstraint(['destination_account_id'], ['external_accounts.id'], ),
+    sa.ForeignKeyConstraint(['destination_bam_account_id'], ['bank_accounts.id'], ),
+    sa.ForeignKeyConstraint(['destination_pool_id'], ['financial_pools.id'], ),
+    sa.ForeignKeyConstraint(['source_pool_id'], ['financial_pools.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('automation_schedule_details',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('automation_id', sa.Integer(), nullable=False),
+    sa.Column('execution_time', sa.Time(), nullable=False),
+    sa.Column('day_of_week', sa.Integer(), nullable=True),
+    sa.Column('day_of_month', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['automation_id'], ['banking_automations.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+    for table, referred_table, columns, referred_columns in DEFERRED_FOREIGN_KEYS:
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.create_foreign_key(f"{table}_{columns[0]}_fkey", referred_table, columns, referred_columns)
+
+
+def downgrade() -> None:
+    for table, _, columns, _ in DEFERRED_FOREIGN_KEYS:
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_constraint(f"{table}_{columns[0]}_fkey", type_="foreignkey")
+    op.drop_table('automation_schedule_details')
+    op.drop_table('banking_automations')
+    op.drop_table('transactions')
+    op.drop_table('storefront_products')
+    op.drop_table('restock_requests')
+    op.drop_table('product_wishlists')
+    op.drop_table('product_views')
+    op.drop_table('product_reviews')
+    op.drop_table('product_images')
+    op.drop_table('order_items')
+    op.drop_table('loans')
+    op.drop_table('financial_pools')
+    op.drop_table('store_settings')
+    op.drop_table('products')
+    op.drop_table('payouts')
+    op.drop_table('payout_bank_details')
+    op.drop_table('notifications')
+    op.drop_table('money_requests')
+    op.drop_table('feedback')
+    op.drop_table('external_accounts')
+    op.drop_table('bank_details')
+    op.drop_table('bank_accounts')
+    op.drop_table('users')
+    op.drop_table('token_blacklist')
+    op.drop_table('payments')
+    op.drop_table('otp_verifications')
+    op.drop_table('orders')
+    op.drop_table('marketplace_orders')
+    op.drop_table('invoice_requests')
+
+    bind = op.get_bind()
+    for name, values in ENUMS.items():
+        postgresql.ENUM(*values, name=name).drop(bind, checkfirst=True)
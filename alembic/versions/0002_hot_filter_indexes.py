@@ -0,0 +1,63 @@
+"""indexes for hot filter columns
+
+Revision ID: 0002_hot_filter_indexes
+Revises: 0001_baseline
+Create Date: 2026-10-17 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0002_hot_filter_indexes'
+down_revision: Union[str, None] = '0001_baseline'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (name, table, columns, dialect options)
+INDEXES = [
+    ('ix_product_views_product_id_viewed_at', 'product_views', ['product_id', 'viewed_at'], {}),
+    ('ix_product_views_user_id_viewed_at', 'product_views', ['user_id', 'viewed_at'], {}),
+    ('ix_storefront_products_product_id', 'storefront_products', ['product_id'], {}),
+    ('ix_orders_seller_id_status_created_at', 'orders', ['seller_id', 'status', 'created_at'], {}),
+    ('ix_orders_buyer_id_created_at', 'orders', ['buyer_id', 'created_at'], {}),
+    ('ix_notifications_user_id_is_read_created_at', 'notifications', ['user_id', 'is_read', 'created_at'], {}),
+    ('ix_notifications_user_id_unread', 'notifications', ['user_id', 'created_at'],
+     {'postgresql_where': sa.text('is_read = false')}),
+    ('ix_notifications_metadata', 'notifications', ['notification_metadata'], {'postgresql_using': 'gin'}),
+    ('ix_bank_accounts_user_id_account_type', 'bank_accounts', ['user_id', 'account_type'], {}),
+    ('ix_transactions_bank_account_id_created_at', 'transactions', ['bank_account_id', 'created_at'], {}),
+    ('ix_banking_automations_is_active_next_run', 'banking_automations', ['is_active', 'next_run'], {}),
+    ('ix_financial_pools_bank_account_id_is_credit_pool', 'financial_pools', ['bank_account_id', 'is_credit_pool'], {}),
+]
+
+
+def drop_invalid_index(name: str) -> None:
+    """A CONCURRENTLY build that failed leaves an invalid index behind; clear it so the rerun rebuilds it"""
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+    invalid = bind.execute(sa.text(
+        "SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+        "WHERE c.relname = :name AND NOT i.indisvalid"
+    ), {'name': name}).first()
+    if invalid:
+        op.drop_index(name, postgresql_concurrently=True)
+
+
+def upgrade() -> None:
+    # These tables are live and some (transactions, notifications, product views) are large:
+    # build without blocking writes, which CREATE INDEX CONCURRENTLY can only do outside a
+    # transaction. IF NOT EXISTS lets a half-finished run be resumed.
+    with op.get_context().autocommit_block():
+        for name, table, columns, options in INDEXES:
+            drop_invalid_index(name)
+            op.create_index(name, table, columns, if_not_exists=True, postgresql_concurrently=True, **options)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
@@ -0,0 +1,191 @@
+"""account versions, metric counters, automation runs and keyset indexes
+
+Revision ID: 0003_versions_counters_runs
+Revises: 0002_hot_filter_indexes
+Create Date: 2026-10-17 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0003_versions_counters_runs'
+down_revision: Union[str, None] = '0002_hot_filter_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def counter(name: str) -> sa.Column:
+    return sa.Column(name, sa.Integer(), server_default='0', nullable=False)
+
+
+def amount(name: str) -> sa.Column:
+    return sa.Column(name, sa.Float(), server_default='0', nullable=False)
+
+
+# (name, table, columns, dialect options): keyset pagination orders by (created_at, id)
+INDEXES = [
+    ('ix_feedback_created_at_id', 'feedback', ['created_at', 'id'], {}),
+    ('ix_feedback_status_created_at_id', 'feedback', ['status', 'created_at', 'id'], {}),
+    ('ix_invoice_requests_created_at_id', 'invoice_requests', ['created_at', 'id'], {}),
+    ('ix_invoice_requests_order_id', 'invoice_requests', ['order_id'], {}),
+    ('ix_notifications_user_id_created_at_id', 'notifications', ['user_id', 'created_at', 'id'], {}),
+    ('ix_orders_buyer_id_created_at_id', 'orders', ['buyer_id', 'created_at', 'id'], {}),
+    ('ix_orders_seller_id_created_at_id', 'orders', ['seller_id', 'created_at', 'id'], {}),
+    ('ix_payouts_created_at_id', 'payouts', ['created_at', 'id'], {}),
+    ('ix_payouts_status_created_at_id', 'payouts', ['status', 'created_at', 'id'], {}),
+    ('ix_product_reviews_user_id_created_at_id', 'product_reviews', ['user_id', 'created_at', 'id'], {}),
+    ('ix_product_wishlists_user_id_created_at_id', 'product_wishlists', ['user_id', 'created_at', 'id'], {}),
+    ('ix_restock_requests_user_id_request_date', 'restock_requests', ['user_id', 'request_date'], {}),
+    ('ix_transactions_bank_account_id_created_at_id', 'transactions', ['bank_account_id', 'created_at', 'id'], {}),
+]
+
+# Indexes the keyset ones above make redundant, dropped once their replacement is built
+SUPERSEDED_INDEXES = [
+    ('ix_orders_buyer_id_created_at', 'orders', ['buyer_id', 'created_at'], {}),
+    ('ix_transactions_bank_account_id_created_at', 'transactions', ['bank_account_id', 'created_at'], {}),
+]
+
+UNREAD_INDEX = 'ix_notifications_user_id_unread'
+
+
+def drop_invalid_index(name: str) -> None:
+    """A CONCURRENTLY build that failed leaves an invalid index behind; clear it so the rerun rebuilds it"""
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+    invalid = bind.execute(sa.text(
+        "SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+        "WHERE c.relname = :name AND NOT i.indisvalid"
+    ), {'name': name}).first()
+    if invalid:
+        op.drop_index(name, postgresql_concurrently=True)
+
+
+def create_unread_index(columns) -> None:
+    drop_invalid_index(UNREAD_INDEX)
+    op.create_index(UNREAD_INDEX, 'notifications', columns, if_not_exists=True, postgresql_concurrently=True,
+                    postgresql_where=sa.text('is_read = false'))
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+
+    # A constant default makes this a catalogue-only change on PostgreSQL: no table rewrite
+    if 'version' not in {column['name'] for column in inspector.get_columns('bank_accounts')}:
+        op.add_column('bank_accounts', sa.Column('version', sa.Integer(), server_default='0', nullable=False))
+
+    op.create_table('seller_metrics',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    counter('product_count'),
+    counter('low_stock_count'),
+    counter('out_of_stock_count'),
+    counter('pending_order_count'),
+    counter('pending_invoice_count'),
+    counter('sent_invoice_count'),
+    counter('paid_invoice_count'),
+    counter('overdue_invoice_count'),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id'),
+    if_not_exists=True
+    )
+    op.create_table('seller_category_metrics',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('category', sa.String(length=50), nullable=False),
+    counter('product_count'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id', 'category'),
+    if_not_exists=True
+    )
+    op.create_table('buyer_metrics',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    counter('view_count'),
+    counter('wishlist_count'),
+    counter('review_count'),
+    counter('purchase_count'),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id'),
+    if_not_exists=True
+    )
+    op.create_table('platform_daily_metrics',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('snapshot_at', sa.DateTime(), nullable=True),
+    counter('total_users'),
+    counter('new_users'),
+    counter('active_users'),
+    counter('verified_users'),
+    counter('total_products'),
+    counter('active_products'),
+    counter('low_stock_products'),
+    counter('low_stock_in_stock_products'),
+    counter('out_of_stock_products'),
+    counter('pending_restock_requests'),
+    counter('high_priority_restock_requests'),
+    counter('total_orders'),
+    counter('pending_orders'),
+    counter('fulfilled_orders'),
+    counter('cancelled_orders'),
+    amount('total_gmv'),
+    counter('total_payments'),
+    counter('pending_payments'),
+    counter('completed_payments'),
+    counter('failed_payments'),
+    amount('pending_payment_amount'),
+    counter('total_invoices'),
+    counter('pending_invoices'),
+    counter('paid_invoices'),
+    counter('overdue_invoices'),
+    amount('gmv'),
+    amount('payment_volume'),
+    amount('invoice_volume'),
+    sa.PrimaryKeyConstraint('day'),
+    if_not_exists=True
+    )
+    op.create_table('automation_runs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('automation_id', sa.Integer(), nullable=False),
+    sa.Column('scheduled_run', sa.DateTime(), nullable=False),
+    sa.Column('executed_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['automation_id'], ['banking_automations.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('automation_id', 'scheduled_run'),
+    if_not_exists=True
+    )
+
+    # Indexes on live tables are built without blocking writes, outside a transaction (see 0002).
+    # Replacements are built before what they replace is dropped, so the queries never lose theirs.
+    with op.get_context().autocommit_block():
+        for name, table, columns, options in INDEXES:
+            drop_invalid_index(name)
+            op.create_index(name, table, columns, if_not_exists=True, postgresql_concurrently=True, **options)
+        for name, table, _, _ in SUPERSEDED_INDEXES:
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
+
+        # The unread index gains id as a tiebreaker under the same name
+        unread = {index['name']: index['column_names'] for index in sa.inspect(bind).get_indexes('notifications')}
+        if unread.get(UNREAD_INDEX, ['id'])[-1] != 'id':
+            op.drop_index(UNREAD_INDEX, table_name='notifications', postgresql_concurrently=True)
+        create_unread_index(['user_id', 'created_at', 'id'])
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(UNREAD_INDEX, table_name='notifications', if_exists=True, postgresql_concurrently=True)
+        create_unread_index(['user_id', 'created_at'])
+        for name, table, columns, options in SUPERSEDED_INDEXES:
+            op.create_index(name, table, columns, if_not_exists=True, postgresql_concurrently=True, **options)
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
+
+    op.drop_table('automation_runs')
+    op.drop_table('platform_daily_metrics')
+    op.drop_table('buyer_metrics')
+    op.drop_table('seller_category_metrics')
+    op.drop_table('seller_metrics')
+    with op.batch_alter_table('bank_accounts') as batch_op:
+        batch_op.drop_column('version')
@@ -1,18 +1,24 @@
 # app.py
 from venv import logger
 import asyncio
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from models import create_tables
 from routes import (auth, inventory, storefront, orders, 
                     marketplace, invoice, chat_inference, my_items,
                     notifications, dashboard, feedback, payouts,
                     admin, restock, admin_restock, banking, payment)
 from utils.chatInferenceQueryParser import QueryIntentParser
 from banking_automations.automation_processor import process_automations
-from sql_database import SessionLocal
-from config import FRONTEND_URL, UPLOAD_DIRECTORY, UPLOAD_PATH, BASE_API_PREFIX
+from banking_automations.scheduler import automation_scheduler
+from sql_database import SessionLocal, async_engine
+from utils.redis_cache import redis_cache
+from utils.cache_metrics import scrape_registry
+from utils.metric_counters import run_metric_counter_reconciliation  # also registers the counter listeners
+from utils.admin_rollups import run_admin_rollup_refresher
+from utils.read_replica import track_user_writes
+from config import FRONTEND_URL, UPLOAD_DIRECTORY, UPLOAD_PATH, BASE_API_PREFIX, REDIS_ASYNC_CLIENT, AUTOMATION_IN_APP
 
 # Initialize FastAPI
 app = FastAPI()
@@ -29,18 +35,22 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Keeps a user's reads on the primary right after their own writes (see utils/read_replica.py)
+app.middleware("http")(track_user_writes)
+
 # Mount the static files
 app.mount(UPLOAD_PATH, StaticFiles(directory=UPLOAD_DIRECTORY), name=UPLOAD_DIRECTORY)
 
 # Global variable for automation task
 automation_task = None
+cache_listener_task = None
+metric_counters_task = None
+admin_rollups_task = None
 
 @app.on_event("startup")
 async def startup_event():
-    global automation_task
-    await create_tables()
-    logger.info("DATABASE TABLES CREATED")
-
+    global automation_task, cache_listener_task, metric_counters_task, admin_rollups_task
+    # The schema is brought to head by the alembic service (entrypoint.sh) before the app starts
     db = SessionLocal()
     try:
         await auth.create_super_admin(db)
@@ -50,14 +60,25 @@ async def startup_event():
     # Initialize query parser
     chat_inference.query_parser = query_parser
 
-    # Start automation processor
-    logger.info("Starting automation processor as a background task.")
-    automation_task = asyncio.create_task(process_automations(), name="AutomationProcessor")
-    logger.info(f"Automation processor started: {automation_task.get_name()} (ID: {id(automation_task)})")
+    # Start automation processor, unless a standalone worker (banking_automations/worker.py) runs it
+    if AUTOMATION_IN_APP:
+        logger.info("Starting automation processor as a background task.")
+        automation_task = asyncio.create_task(process_automations(), name="AutomationProcessor")
+        logger.info(f"Automation processor started: {automation_task.get_name()} (ID: {id(automation_task)})")
+
+    # Keep the in-process cache coherent with invalidations from other workers
+    if redis_cache.local_cache is not None:
+        cache_listener_task = asyncio.create_task(redis_cache.listen_for_invalidations(), name="CacheInvalidationListener")
+
+    # Seed the dashboard counters and periodically repair any drift
+    metric_counters_task = asyncio.create_task(run_metric_counter_reconciliation(), name="MetricCounterReconciliation")
+
+    # Keep the admin dashboard rollups current
+    admin_rollups_task = asyncio.create_task(run_admin_rollup_refresher(), name="AdminRollupRefresher")
 
 @app.on_event("shutdown")
 async def shutdown_event():
-    global automation_task
+    global automation_task, cache_listener_task, metric_counters_task, admin_rollups_task
     if automation_task and not automation_task.done():
         logger.info("Cancelling automation processor...")
         automation_task.cancel()
@@ -65,6 +86,22 @@ async def shutdown_event():
             await automation_task
         except asyncio.CancelledError:
             logger.info("Automation processor task successfully cancelled.")
+        try:
+            await automation_scheduler.remove_health()
+        except Exception as e:
+            logger.warning(f"Could not deregister automation processor: {e}")
+
+    for task in (cache_listener_task, metric_counters_task, admin_rollups_task):
+        if task and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    # Release pooled async Redis and database connections
+    await REDIS_ASYNC_CLIENT.aclose()
+    await async_engine.dispose()
     logger.info("Shutdown complete.")
 
 @app.get("/automation-status")
@@ -72,10 +109,28 @@ async def get_automation_status():
     global automation_task
     if automation_task:
         if automation_task.done():
-            return {"status": "completed", "result": automation_task.result() if not automation_task.cancelled() else "Cancelled"}
+            status = {"status": "completed", "result": automation_task.result() if not automation_task.cancelled() else "Cancelled"}
         else:
-            return {"status": "running", "name": automation_task.get_name()}
-    return {"status": "not started"}
+            status = {"status": "running", "name": automation_task.get_name()}
+    else:
+        status = {"status": "not started" if AUTOMATION_IN_APP else "disabled in app"}
+
+    # Heartbeats and lag of every process running automations (web workers and standalone workers)
+    try:
+        status["scheduler"] = await automation_scheduler.status()
+    except Exception as e:
+        logger.error(f"Could not read automation scheduler status: {e}")
+        status["scheduler"] = None
+    return status
+
+@app.get("/cache-stats")
+async def get_cache_stats():
+    return redis_cache.get_stats()
+
+@app.get("/metrics")
+async def get_metrics():
+    # Prometheus scrape endpoint: cache hit/miss/set/invalidation counters, latencies and hot keys
+    return Response(generate_latest(scrape_registry()), media_type=CONTENT_TYPE_LATEST)
 
 # Include route 
 app.include_router(auth.router, prefix=BASE_API_PREFIX + "/auth", tags=["auth"])
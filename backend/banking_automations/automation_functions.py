@@ -71,3 +71,13 @@ def calculate_next_run(schedule: str, schedule_details: dict, from_date: Optiona
     
     return next_run
 
+def next_run_after(automation, from_date: datetime) -> datetime:
+    """calculate_next_run for a stored BankingAutomation and its schedule details"""
+    details = automation.schedule_details
+    schedule_details = {
+        name: getattr(details, name)
+        for name in ("execution_time", "day_of_week", "day_of_month")
+        if details is not None and getattr(details, name) is not None
+    }
+    schedule = getattr(automation.schedule, "value", automation.schedule)
+    return calculate_next_run(schedule, schedule_details, from_date=from_date)
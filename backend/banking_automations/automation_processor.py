@@ -1,61 +1,202 @@
 # automation_processor.py
-from datetime import datetime
+from collections import defaultdict
+from datetime import datetime, timedelta
 import asyncio
-from sqlalchemy import and_
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session
-from models import (BankingAutomation, BankAccount, User, ExternalAccount, 
+from models import (AutomationRun, AutomationType, BankingAutomation, BankAccount, User, ExternalAccount, 
                     Payment, AccountSource, PaymentStatus, PaymentType,
                     Transaction, TransactionTag, TransactionType, Notification,
                     NotificationType, AccountType, FinancialPool)
 from utils.cache_constants import CacheNamespace
 from utils.cache_manager import cache_manager
-from banking_automations.automation_functions import calculate_next_run
-from sql_database import get_db
+from utils.cache_write_through import snapshot_account_change, write_through_account_change
+from banking_automations.automation_functions import next_run_after
+from banking_automations.pool_transfer_batch import execute_pool_transfer_batch
+from banking_automations.scheduler import automation_scheduler
+from sql_database import SessionLocal
+from config import AUTOMATION_RETRY_DELAY, AUTOMATION_CONCURRENCY
 import logging
 import uuid
 
 logger = logging.getLogger(__name__)
 
-async def process_automations():
+async def process_automations(role: str = "app"):
     """
-    Continuously checks and processes due automations.
+    Runs automations as they come due, woken by the scheduler (see banking_automations/scheduler.py)
+    rather than polling the table. `role` tells the web process and the standalone worker apart
+    in the heartbeats.
     """
-    while True:
+    listener = asyncio.create_task(automation_scheduler.listen_for_wakeups(), name="AutomationWakeupListener")
+    heartbeat = asyncio.create_task(automation_scheduler.report_health(role), name="AutomationHeartbeat")
+    try:
+        await automation_scheduler.run(run_due_automations)
+    finally:
+        listener.cancel()
+        heartbeat.cancel()
+
+async def run_due_automations(automation_ids: List[int]) -> Dict[int, Optional[datetime]]:
+    """
+    Run the claimed automations: pool transfers as one batch (see pool_transfer_batch.py), the
+    rest up to AUTOMATION_CONCURRENCY at a time. Automations drawing on the same bank account run
+    one after another, so they never race on its pools.
+    Returns when each should next be considered; None for those no longer active.
+    """
+    next_runs = dict.fromkeys(automation_ids)
+    accounts = {}
+    pool_transfers = []
+    for automation_id, bank_account_id, automation_type in await asyncio.to_thread(_source_accounts, automation_ids):
+        accounts[automation_id] = bank_account_id
+        if automation_type == AutomationType.POOL_TRANSFER:
+            pool_transfers.append(automation_id)
+
+    if pool_transfers:
         try:
-            with next(get_db()) as db:  # Ensures session cleanup
-                current_time = datetime.utcnow()
-                
-                # Fetch due automations
-                due_automations = db.query(BankingAutomation).filter(
-                    and_(
-                        BankingAutomation.is_active == True,
-                        BankingAutomation.next_run <= current_time
-                    )
-                ).all()
-                
-                for automation in due_automations:
-                    try:
-                        await process_single_automation(automation, db)
-                    except Exception as e:
-                        logger.error(
-                            f"Error processing automation {automation.id} for user {automation.user_id}: {str(e)}"
-                        )
-                        continue
-                
-            # Wait before the next check
-            await asyncio.sleep(60)
-        
+            next_runs.update(await run_pool_transfer_batch(pool_transfers))
+            for automation_id in pool_transfers:
+                del accounts[automation_id]
         except Exception as e:
-            logger.error(f"Error in automation processor: {str(e)}")
-            await asyncio.sleep(60)  # Prevents tight looping on error
-            continue
+            # Rolled back as a whole: run them one by one below
+            logger.error(f"Error processing pool transfer batch, running it one by one: {str(e)}")
+
+    by_account = defaultdict(list)
+    for automation_id, bank_account_id in accounts.items():
+        by_account[bank_account_id].append(automation_id)
+
+    semaphore = asyncio.Semaphore(AUTOMATION_CONCURRENCY)
+
+    async def run_account_automations(account_automation_ids: List[int]):
+        for automation_id in account_automation_ids:
+            async with semaphore:
+                next_runs[automation_id] = await run_automation(automation_id)
+
+    await asyncio.gather(*(run_account_automations(ids) for ids in by_account.values()))
+    return next_runs
+
+def _source_accounts(automation_ids: List[int]) -> List[Tuple[int, int, AutomationType]]:
+    """(id, bank_account_id, type) of the active automations among `automation_ids`, in id order"""
+    db = SessionLocal()
+    try:
+        return db.query(BankingAutomation.id, BankingAutomation.bank_account_id, BankingAutomation.type)\
+            .filter(BankingAutomation.id.in_(automation_ids), BankingAutomation.is_active == True)\
+            .order_by(BankingAutomation.id)\
+            .all()
+    finally:
+        db.close()
+
+async def run_pool_transfer_batch(automation_ids: List[int]) -> Dict[int, Optional[datetime]]:
+    """Run the due pool transfers among `automation_ids` in one transaction on a worker thread"""
+    current_time = automation_scheduler.clock()
+    next_runs, account_changes = await asyncio.to_thread(_execute_pool_transfer_batch, automation_ids, current_time)
+    await _write_through(account_changes, f"pool transfer batch {automation_ids}")
+    return {automation_id: _retry_if_due(next_run, current_time) for automation_id, next_run in next_runs.items()}
+
+def _execute_pool_transfer_batch(automation_ids: List[int],
+                                 current_time: datetime) -> Tuple[Dict[int, Optional[datetime]], List[Dict]]:
+    db = SessionLocal()
+    try:
+        result = execute_pool_transfer_batch(db, automation_ids, current_time)
+        db.commit()
+        return result
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+async def run_automation(automation_id: int) -> Optional[datetime]:
+    """
+    Run one automation if it is still due, in its own session on a worker thread.
+    Returns its next run; None if it is no longer active.
+    """
+    current_time = automation_scheduler.clock()
+    try:
+        next_run, account_changes = await asyncio.to_thread(_execute_automation, automation_id, current_time)
+    except Exception as e:
+        logger.error(f"Error processing automation {automation_id}: {str(e)}")
+        return current_time + timedelta(seconds=AUTOMATION_RETRY_DELAY)
 
+    await _write_through(account_changes, f"automation {automation_id}")
+    return _retry_if_due(next_run, current_time)
 
-async def process_single_automation(automation: BankingAutomation, db: Session):
+async def _write_through(account_changes: List[Dict], source: str):
+    # Patch cached accounts and transactions; pools and notifications are recomputed
+    try:
+        for change in account_changes:
+            await write_through_account_change(change)
+            await cache_manager.invalidate_user_cache(
+                change["user_id"],
+                [CacheNamespace.POOL, CacheNamespace.NOTIFICATION]
+            )
+    except Exception as e:
+        # The transfers are committed; only the cached views are behind
+        logger.error(f"Error updating caches after {source}: {str(e)}")
+
+def _retry_if_due(next_run: Optional[datetime], current_time: datetime) -> Optional[datetime]:
+    # Still due means it couldn't run (e.g. insufficient funds): try again later
+    if next_run is not None and next_run <= current_time:
+        return current_time + timedelta(seconds=AUTOMATION_RETRY_DELAY)
+    return next_run
+
+def _execute_automation(automation_id: int, current_time: datetime) -> Tuple[Optional[datetime], List[Dict]]:
+    """Returns the automation's next run and the account changes committed by running it"""
+    db = SessionLocal()
+    try:
+        # Held until the run commits (or the connection drops, should this worker die), so no
+        # other worker can run the automation meanwhile; one that tries skips it instead of waiting
+        automation = db.query(BankingAutomation)\
+            .filter(BankingAutomation.id == automation_id)\
+            .with_for_update(skip_locked=True)\
+            .first()
+        if automation is None:
+            if db.query(BankingAutomation.id).filter(BankingAutomation.id == automation_id).first():
+                # Running elsewhere; by the retry its next_run has moved on
+                return current_time + timedelta(seconds=AUTOMATION_RETRY_DELAY), []
+            return None, []
+        if not automation.is_active:
+            return None, []
+        if automation.next_run > current_time:
+            return automation.next_run, []
+
+        account_changes = process_single_automation(automation, db)
+        return automation.next_run, account_changes
+    finally:
+        db.close()
+
+def _record_run(automation: BankingAutomation, db: Session) -> bool:
+    """Record that the automation's scheduled run is executing; False if it already has"""
+    insert = postgresql_insert if db.bind.dialect.name == "postgresql" else sqlite_insert
+    return db.execute(
+        insert(AutomationRun.__table__)
+        .values(automation_id=automation.id, scheduled_run=automation.next_run, executed_at=datetime.utcnow())
+        .on_conflict_do_nothing(index_elements=["automation_id", "scheduled_run"])
+    ).rowcount == 1
+
+def _advance_next_run(automation: BankingAutomation):
+    automation.last_run = datetime.utcnow()
+    automation.next_run = next_run_after(automation, automation.last_run)
+
+def _lock_accounts(automation: BankingAutomation, db: Session):
+    """
+    Lock the accounts the automation moves money between before reading their balances, in id
+    order so that concurrent automations crediting each other's accounts can't deadlock.
+    """
+    account_ids = {automation.bank_account_id, automation.destination_bam_account_id} - {None}
+    db.query(BankAccount).filter(BankAccount.id.in_(account_ids))\
+        .order_by(BankAccount.id)\
+        .with_for_update()\
+        .all()
+
+def process_single_automation(automation: BankingAutomation, db: Session) -> List[Dict]:
     """
     Process a single automation and update its next run time.
+    Returns the account changes to write through to the cache.
     """
     try:
+        _lock_accounts(automation, db)
+
         # Calculate transfer amount
         transfer_amount = automation.amount if automation.amount is not None else (
             automation.source_pool.balance * automation.percentage / 100
@@ -63,35 +204,38 @@ async def process_single_automation(automation: BankingAutomation, db: Session):
         
         if transfer_amount > automation.source_pool.balance:
             logger.error(f"Insufficient funds in pool for automation {automation.id}")
-            return
+            return []
+
+        if not _record_run(automation, db):
+            logger.warning(f"Automation {automation.id} already ran for {automation.next_run}, skipping")
+            _advance_next_run(automation)
+            db.commit()
+            return []
         
-        if automation.type == "pool_transfer":
-            await process_automated_pool_transfer(automation, transfer_amount, db)
+        if automation.type == AutomationType.POOL_TRANSFER:
+            account_changes = process_automated_pool_transfer(automation, transfer_amount, db)
         else:  # bank_transfer
-            await process_automated_bank_transfer(automation, transfer_amount, db)
+            account_changes = process_automated_bank_transfer(automation, transfer_amount, db)
 
         # Update run timestamps
-        automation.last_run = datetime.utcnow()
-        automation.next_run = calculate_next_run(
-            automation.schedule,
-            automation.schedule_details.__dict__,
-            from_date=automation.last_run
-        )
+        _advance_next_run(automation)
         db.commit()
+        return account_changes
 
     except Exception as e:
         db.rollback()
         logger.error(f"Error in single automation {automation.id}: {str(e)}")
         raise
 
-async def process_automated_pool_transfer(automation: BankingAutomation, transfer_amount: float, db: Session):
+def process_automated_pool_transfer(automation: BankingAutomation, transfer_amount: float, db: Session):
     """
     Process an automated pool-to-pool transfer.
+    Returns the account changes to write through to the cache once committed.
     """
     # Verify destination pool exists
     if not automation.destination_pool:
         logger.error(f"Destination pool not found for automation {automation.id}")
-        return
+        return []
         
     # Create payment record
     payment = Payment(
@@ -141,10 +285,19 @@ async def process_automated_pool_transfer(automation: BankingAutomation, transfe
         }
     )
     db.add(notification)
+    db.flush()
+
+    return [snapshot_account_change(
+        automation.bank_account,
+        [automation.source_pool, automation.destination_pool],
+        debit_transaction,
+        payment
+    )]
 
-async def process_automated_bank_transfer(automation: BankingAutomation, transfer_amount: float, db: Session):
+def process_automated_bank_transfer(automation: BankingAutomation, transfer_amount: float, db: Session):
     """
     Process an automated bank transfer (either to external bank or BAM account).
+    Returns the account changes to write through to the cache once committed.
     """
     is_bam_transfer = automation.destination_bam_account_id is not None
     
@@ -156,7 +309,7 @@ async def process_automated_bank_transfer(automation: BankingAutomation, transfe
 
         if not recipient_account:
             logger.error(f"Recipient BAM account not found for automation {automation.id}")
-            return
+            return []
 
         recipient_user = db.query(User).filter(
             User.id == recipient_account.user_id
@@ -164,7 +317,7 @@ async def process_automated_bank_transfer(automation: BankingAutomation, transfe
         
         if not recipient_user:
             logger.error(f"Recipient BAM user not found for automation {automation.id}")
-            return
+            return []
 
         # Create payment record for BAM transfer
         payment = Payment(
@@ -258,12 +411,6 @@ async def process_automated_bank_transfer(automation: BankingAutomation, transfe
         )
         db.add(recipient_notification)
 
-        # Invalidate recipient's cache
-        cache_manager.invalidate_user_cache(
-            recipient_user.id,
-            [CacheNamespace.ACCOUNT, CacheNamespace.TRANSACTION]
-        )
-
     # Create notification for sender
     sender_notification = Notification(
         user_id=automation.user_id,
@@ -278,4 +425,12 @@ async def process_automated_bank_transfer(automation: BankingAutomation, transfe
             'user_view': automation.user.active_view
         }
     )
-    db.add(sender_notification)
\ No newline at end of file
+    db.add(sender_notification)
+    db.flush()
+
+    account_changes = [snapshot_account_change(automation.bank_account, [automation.source_pool], debit_transaction, payment)]
+    if is_bam_transfer:
+        account_changes.append(
+            snapshot_account_change(recipient_account, [receiver_credit_pool], credit_transaction, payment)
+        )
+    return account_changes
\ No newline at end of file
@@ -0,0 +1,251 @@
+# scheduler.py
+import asyncio
+import logging
+import os
+import socket
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+from models import BankingAutomation
+from sql_database import SessionLocal
+from config import (REDIS_ASYNC_CLIENT, AUTOMATION_RECONCILE_INTERVAL, AUTOMATION_RETRY_DELAY, AUTOMATION_CLAIM_LEASE,
+                    AUTOMATION_HEARTBEAT_INTERVAL)
+
+logger = logging.getLogger(__name__)
+
+# Due automations live in a Redis sorted set scored by next_run, shared by every process: the
+# scheduler sleeps until the earliest score (or a wakeup from the automation routes), claims
+# what is due and reschedules each automation at its new next_run. The database stays the
+# source of truth; a periodic sweep re-adds anything the set lost.
+
+SCHEDULE_KEY = "automations:schedule"
+# Automations claimed by a scheduler, scored by when the claim lapses
+RUNNING_KEY = "automations:running"
+WAKEUP_CHANNEL = "automations:wakeup"
+# Processes running a scheduler, scored by their last heartbeat, each with its details in a
+# WORKER_KEY hash that expires when the heartbeats stop
+WORKERS_KEY = "automations:workers"
+WORKER_KEY = "automations:worker:{}"
+CLAIM_BATCH_SIZE = 100
+RECONCILE_BATCH_SIZE = 5000
+
+# Move up to ARGV[3] due automations from the schedule to the running set, atomically, so each
+# is claimed by exactly one scheduler. Returns them with the scores they were due at.
+CLAIM_DUE_SCRIPT = """
+local due = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'WITHSCORES', 'LIMIT', 0, tonumber(ARGV[3]))
+for i = 1, #due, 2 do
+    redis.call('ZREM', KEYS[1], due[i])
+    redis.call('ZADD', KEYS[2], ARGV[2], due[i])
+end
+return due
+"""
+
+def _score(moment: datetime) -> float:
+    """Sorted set score of a naive UTC datetime"""
+    return moment.replace(tzinfo=timezone.utc).timestamp()
+
+def _moment(score: float) -> datetime:
+    return datetime.fromtimestamp(score, tz=timezone.utc).replace(tzinfo=None)
+
+class AutomationScheduler:
+    def __init__(self, redis_client, clock: Callable[[], datetime] = datetime.utcnow):
+        self.redis = redis_client
+        self.clock = clock
+        self._claim_due = redis_client.register_script(CLAIM_DUE_SCRIPT)
+        self._wakeup = asyncio.Event()
+        self.stopping = False
+        # Reported with each heartbeat
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self.started_at = clock()
+        self.last_batch_at: Optional[datetime] = None
+        self.last_batch_size = 0
+        self.lag_seconds = 0.0
+        self.runs_total = 0
+
+    async def schedule(self, automation_id: int, next_run: datetime) -> None:
+        """Put an automation (back) on the schedule and wake the schedulers to re-plan"""
+        try:
+            await self.redis.zadd(SCHEDULE_KEY, {str(automation_id): _score(next_run)})
+            self._wakeup.set()
+            await self.redis.publish(WAKEUP_CHANNEL, automation_id)
+        except Exception as e:
+            # The reconciliation sweep picks it up
+            logger.warning(f"Could not schedule automation {automation_id}: {e}")
+
+    async def unschedule(self, automation_id: int) -> None:
+        try:
+            await self.redis.zrem(SCHEDULE_KEY, str(automation_id))
+        except Exception as e:
+            # Harmless: a stale entry is dropped when it comes due
+            logger.warning(f"Could not unschedule automation {automation_id}: {e}")
+
+    async def claim_due(self) -> List[int]:
+        """Claim the automations due now; the claim lapses after AUTOMATION_CLAIM_LEASE seconds"""
+        now = self.clock()
+        lease_until = now + timedelta(seconds=AUTOMATION_CLAIM_LEASE)
+        due = await self._claim_due(
+            keys=[SCHEDULE_KEY, RUNNING_KEY],
+            args=[_score(now), _score(lease_until), CLAIM_BATCH_SIZE]
+        )
+        if due:
+            # How late the most overdue of them is being picked up
+            self.lag_seconds = max(_score(now) - float(due[1]), 0.0)
+        return [int(automation_id) for automation_id in due[::2]]
+
+    async def release(self, next_runs: Dict[int, Optional[datetime]]) -> None:
+        """End claims, rescheduling each automation at its next run (None drops it)"""
+        pipeline = self.redis.pipeline(transaction=True)
+        pipeline.zrem(RUNNING_KEY, *map(str, next_runs))
+        upcoming = {str(automation_id): _score(next_run) for automation_id, next_run in next_runs.items() if next_run}
+        if upcoming:
+            pipeline.zadd(SCHEDULE_KEY, upcoming)
+        await pipeline.execute()
+
+    async def next_due_at(self) -> Optional[datetime]:
+        head = await self.redis.zrange(SCHEDULE_KEY, 0, 0, withscores=True)
+        return _moment(head[0][1]) if head else None
+
+    async def reconcile(self, active: List[Tuple[int, datetime]]) -> None:
+        """
+        Re-add every active automation, as (id, next_run) from the database. Only adds missing
+        entries or moves entries earlier (ZADD LT), so it can't delay anything a route just
+        scheduled; entries that are too early or stale are corrected when they come due.
+        """
+        # Claims that lapsed belonged to a scheduler that died mid-run: their automations are
+        # re-added below. Live claims are left alone so nothing runs twice.
+        await self.redis.zremrangebyscore(RUNNING_KEY, "-inf", _score(self.clock()))
+        running = {int(automation_id) for automation_id in await self.redis.zrange(RUNNING_KEY, 0, -1)}
+
+        entries = [(str(automation_id), _score(next_run)) for automation_id, next_run in active
+                   if automation_id not in running]
+        for start in range(0, len(entries), RECONCILE_BATCH_SIZE):
+            await self.redis.zadd(SCHEDULE_KEY, dict(entries[start:start + RECONCILE_BATCH_SIZE]), lt=True)
+        self._wakeup.set()
+
+    async def listen_for_wakeups(self) -> None:
+        """Background task: wake this process's scheduler when another process schedules"""
+        while True:
+            pubsub = self.redis.pubsub()
+            try:
+                await pubsub.subscribe(WAKEUP_CHANNEL)
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        self._wakeup.set()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Automation wakeup listener error: {str(e)}")
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.aclose()
+
+    async def report_health(self, role: str) -> None:
+        """Background task: heartbeat this scheduler's progress to Redis for /automation-status"""
+        key = WORKER_KEY.format(self.worker_id)
+        while True:
+            try:
+                now = self.clock()
+                pipeline = self.redis.pipeline(transaction=True)
+                pipeline.hset(key, mapping={
+                    "role": role,
+                    "started_at": self.started_at.isoformat(),
+                    "heartbeat_at": now.isoformat(),
+                    "last_batch_at": self.last_batch_at.isoformat() if self.last_batch_at else "",
+                    "last_batch_size": self.last_batch_size,
+                    "lag_seconds": round(self.lag_seconds, 3),
+                    "runs_total": self.runs_total,
+                })
+                pipeline.expire(key, AUTOMATION_HEARTBEAT_INTERVAL * 3)
+                pipeline.zadd(WORKERS_KEY, {self.worker_id: _score(now)})
+                await pipeline.execute()
+            except Exception as e:
+                logger.warning(f"Automation scheduler heartbeat failed: {e}")
+            await asyncio.sleep(AUTOMATION_HEARTBEAT_INTERVAL)
+
+    async def remove_health(self) -> None:
+        """Drop this scheduler from the status report, on a clean shutdown"""
+        await self.redis.delete(WORKER_KEY.format(self.worker_id))
+        await self.redis.zrem(WORKERS_KEY, self.worker_id)
+
+    async def status(self) -> Dict:
+        """Schedule depth and lag, and every scheduler heard from within three heartbeats"""
+        now = self.clock()
+        await self.redis.zremrangebyscore(WORKERS_KEY, "-inf", _score(now) - AUTOMATION_HEARTBEAT_INTERVAL * 3)
+        workers = []
+        for worker_id, heartbeat in await self.redis.zrange(WORKERS_KEY, 0, -1, withscores=True):
+            worker_id = worker_id.decode()
+            details = {name.decode(): value.decode()
+                       for name, value in (await self.redis.hgetall(WORKER_KEY.format(worker_id))).items()}
+            workers.append(dict(details, id=worker_id, seconds_since_heartbeat=round(_score(now) - heartbeat, 3)))
+
+        next_due = await self.next_due_at()
+        return {
+            "scheduled": await self.redis.zcard(SCHEDULE_KEY),
+            "running": await self.redis.zcard(RUNNING_KEY),
+            "next_due_at": next_due.isoformat() if next_due else None,
+            # How long the most overdue unclaimed automation has been waiting
+            "lag_seconds": round(max((now - next_due).total_seconds(), 0.0), 3) if next_due else 0.0,
+            "workers": workers,
+        }
+
+    def stop(self) -> None:
+        """Let `run` return once the batch in hand is finished"""
+        self.stopping = True
+        self._wakeup.set()
+
+    async def wait(self, timeout: float) -> None:
+        """Sleep up to `timeout` seconds, returning early on a wakeup"""
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=max(timeout, 0))
+        except asyncio.TimeoutError:
+            pass
+        self._wakeup.clear()
+
+    async def run(self, run_due: Callable[[List[int]], Awaitable[Dict[int, Optional[datetime]]]]) -> None:
+        """
+        Scheduler loop: claim what is due, hand it to `run_due` (which returns each automation's
+        next run), and sleep until the next one is due, a wakeup, or the next reconciliation.
+        Returns after `stop`.
+        """
+        next_reconcile = self.clock()
+        while not self.stopping:
+            try:
+                if self.clock() >= next_reconcile:
+                    await self.reconcile(await asyncio.to_thread(active_automation_runs))
+                    next_reconcile = self.clock() + timedelta(seconds=AUTOMATION_RECONCILE_INTERVAL)
+
+                claimed = await self.claim_due()
+                if claimed:
+                    try:
+                        next_runs = await run_due(claimed)
+                    except Exception as e:
+                        logger.error(f"Error running automations {claimed}: {str(e)}")
+                        next_runs = {automation_id: self.clock() + timedelta(seconds=AUTOMATION_RETRY_DELAY)
+                                     for automation_id in claimed}
+                    await self.release(next_runs)
+                    self.last_batch_at, self.last_batch_size = self.clock(), len(claimed)
+                    self.runs_total += len(claimed)
+                    continue
+
+                wake_at = next_reconcile
+                next_due = await self.next_due_at()
+                if next_due is not None:
+                    wake_at = min(wake_at, next_due)
+                await self.wait((wake_at - self.clock()).total_seconds())
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error in automation scheduler: {str(e)}")
+                await asyncio.sleep(AUTOMATION_RETRY_DELAY)  # Prevents tight looping on error
+
+def active_automation_runs() -> List[Tuple[int, datetime]]:
+    """(id, next_run) of every active automation, for the reconciliation sweep"""
+    db = SessionLocal()
+    try:
+        return db.query(BankingAutomation.id, BankingAutomation.next_run)\
+            .filter(BankingAutomation.is_active == True)\
+            .all()
+    finally:
+        db.close()
+
+automation_scheduler = AutomationScheduler(REDIS_ASYNC_CLIENT)
@@ -0,0 +1,55 @@
+# worker.py
+import asyncio
+import logging
+import signal
+import utils.metric_counters  # registers the counter listeners, as in the web process
+from banking_automations.automation_processor import process_automations
+from banking_automations.scheduler import automation_scheduler
+from sql_database import engine
+from config import REDIS_ASYNC_CLIENT, AUTOMATION_IN_APP
+
+logger = logging.getLogger(__name__)
+
+# Standalone automation worker, so automation bursts don't compete with request handling on the
+# web workers' event loops and the scheduler scales separately from them:
+#
+#     python -m banking_automations.worker
+#
+# Set AUTOMATION_IN_APP=false on the web process to leave automations to it. Any number of these
+# can run side by side; claims keep each run on one of them. SIGTERM/SIGINT finish the batch in
+# hand and exit; a second signal aborts it (the lease and idempotency key make that safe).
+
+async def main():
+    if AUTOMATION_IN_APP:
+        logger.warning("AUTOMATION_IN_APP is on: the web workers are also running automations")
+
+    worker = asyncio.create_task(process_automations(role="worker"), name="AutomationWorker")
+
+    def shut_down():
+        if automation_scheduler.stopping:
+            logger.warning("Aborting the current automation batch")
+            worker.cancel()
+        else:
+            logger.info("Stopping the automation worker after the current batch")
+            automation_scheduler.stop()
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, shut_down)
+
+    logger.info(f"Automation worker {automation_scheduler.worker_id} started")
+    try:
+        await worker
+    except asyncio.CancelledError:
+        pass
+    finally:
+        try:
+            await automation_scheduler.remove_health()
+        except Exception as e:
+            logger.warning(f"Could not deregister automation worker: {e}")
+        await REDIS_ASYNC_CLIENT.aclose()
+        engine.dispose()
+        logger.info("Automation worker stopped")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -2,6 +2,7 @@ import os
 import structlog
 import logging
 import redis
+import redis.asyncio as aioredis
 
 # Logging setup
 # Set up the basic configuration for the standard logging module
@@ -38,6 +39,52 @@ SQLALCHEMY_DATABASE_URL = os.getenv('DB_TYPE', "postgresql://") + \
     f"{os.getenv('DB_USER', 'postgres')}:{os.getenv('DB_PASSWORD', 'alegeaa')}@" + \
     f"{os.getenv('DB_HOST', 'localhost')}:{os.getenv('DB_PORT', '5432')}/" + \
     os.getenv('DB_NAME', 'myaje')
+# Same database through asyncpg, for routes on AsyncSession
+SQLALCHEMY_ASYNC_DATABASE_URL = os.getenv('ASYNC_DATABASE_URL', SQLALCHEMY_DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://", 1))
+
+# Optional streaming replica for the read-only routes; unset, they read from the primary
+READ_REPLICA_DATABASE_URL = os.getenv('READ_REPLICA_DATABASE_URL')
+READ_REPLICA_ASYNC_DATABASE_URL = os.getenv('READ_REPLICA_ASYNC_DATABASE_URL', READ_REPLICA_DATABASE_URL and READ_REPLICA_DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://", 1))
+# Seconds a user's reads stay on the primary after they write; keep it above the replica's usual lag
+READ_YOUR_WRITES_WINDOW = int(os.getenv('READ_YOUR_WRITES_WINDOW', 5))
+
+# Connection pool, per engine (the sync and async engines each get one per worker)
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 10))
+DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', 20))
+DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', 10)) # seconds to wait for a free connection
+DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', 1800)) # replace connections older than this, in seconds
+DB_POOL_PRE_PING = os.getenv('DB_POOL_PRE_PING', 'true').lower() == 'true'
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv('DB_STATEMENT_TIMEOUT_MS', 30000)) # 0 disables
+DB_POOL_SLOW_WAIT_MS = float(os.getenv('DB_POOL_SLOW_WAIT_MS', 100)) # log checkouts that wait longer
+# Set when connecting through PgBouncer in transaction pooling mode: no server-side prepared statements
+DB_PGBOUNCER_MODE = os.getenv('DB_PGBOUNCER_MODE', 'false').lower() == 'true'
+
+# Cursor-paginated list endpoints: rows per page when the client doesn't ask, and the most it may ask for
+PAGE_SIZE_DEFAULT = int(os.getenv('PAGE_SIZE_DEFAULT', 50))
+PAGE_SIZE_MAX = int(os.getenv('PAGE_SIZE_MAX', 200))
+
+# How often the dashboard metric counters are rebuilt from their source tables, in seconds
+METRIC_COUNTERS_RECONCILE_INTERVAL = int(os.getenv('METRIC_COUNTERS_RECONCILE_INTERVAL', 6 * 3600))
+# Users whose counters are rebuilt per transaction; their writes wait for that transaction only
+METRIC_COUNTERS_RECONCILE_BATCH_SIZE = int(os.getenv('METRIC_COUNTERS_RECONCILE_BATCH_SIZE', 200))
+
+# Admin dashboard daily rollups: refresh period in seconds, and how many trailing days each
+# refresh recomputes (must cover the month-to-date window)
+ADMIN_ROLLUP_REFRESH_INTERVAL = int(os.getenv('ADMIN_ROLLUP_REFRESH_INTERVAL', 15 * 60))
+ADMIN_ROLLUP_LOOKBACK_DAYS = int(os.getenv('ADMIN_ROLLUP_LOOKBACK_DAYS', 35))
+
+# Automation scheduler: how often the schedule is re-synced from the database, how long to wait
+# before retrying an automation that couldn't run, and how long a claim on a due automation
+# lasts before another scheduler may take it over (all in seconds)
+AUTOMATION_RECONCILE_INTERVAL = int(os.getenv('AUTOMATION_RECONCILE_INTERVAL', 300))
+AUTOMATION_RETRY_DELAY = int(os.getenv('AUTOMATION_RETRY_DELAY', 60))
+AUTOMATION_CLAIM_LEASE = int(os.getenv('AUTOMATION_CLAIM_LEASE', 300))
+# How many automations run at once, each holding a database connection (keep below DB_POOL_SIZE)
+AUTOMATION_CONCURRENCY = int(os.getenv('AUTOMATION_CONCURRENCY', 8))
+# Run the automation scheduler inside each web worker; set to false when a standalone worker
+# (python -m banking_automations.worker) runs it instead
+AUTOMATION_IN_APP = os.getenv('AUTOMATION_IN_APP', 'true').lower() == 'true'
+AUTOMATION_HEARTBEAT_INTERVAL = int(os.getenv('AUTOMATION_HEARTBEAT_INTERVAL', 15)) # seconds
 
 # Read secret key from file
 SECRET_KEY_PATH = os.getenv('SECRET_KEY_PATH', './secrets/appsecret.txt')
@@ -64,12 +111,46 @@ MYAJE_BANK_ACCOUNT_ID = int(os.getenv('MYAJE_BANK_ACCOUNT_ID', 5))
 PERSONAL_ACCOUNT_INITIAL_BALANCE = float(os.getenv('PERSONAL_ACCOUNT_INITIAL_BALANCE', 100000.00))
 BUSINESS_ACCOUNT_INITIAL_BALANCE = float(os.getenv('BUSINESS_ACCOUNT_INITIAL_BALANCE', 1000000.00))
 CACHE_EXPIRATION_TIME = int(os.getenv('CACHE_EXPIRATION_TIME', 3600)) #1 hour
+# Optional in-process (L1) cache in front of Redis, kept coherent across workers via pub/sub
+L1_CACHE_ENABLED = os.getenv('L1_CACHE_ENABLED', 'false').lower() == 'true'
+L1_CACHE_MAX_BYTES = int(os.getenv('L1_CACHE_MAX_BYTES', 64 * 1024 * 1024)) # 64 MB per worker
+L1_CACHE_TTL = int(os.getenv('L1_CACHE_TTL', 60)) # upper bound on L1 entry lifetime, in seconds
+CACHE_INVALIDATION_CHANNEL = os.getenv('CACHE_INVALIDATION_CHANNEL', 'cache:invalidate')
+# Single-flight recomputation of missed cache keys across workers
+CACHE_LOCK_TIMEOUT = int(os.getenv('CACHE_LOCK_TIMEOUT', 10)) # seconds a recompute lock is held at most
+CACHE_LOCK_POLL_INTERVAL = float(os.getenv('CACHE_LOCK_POLL_INTERVAL', 0.05)) # seconds between waiter polls
+# Cached payload encoding: json, orjson or msgpack; compression: none, zstd or lz4 (needs zstandard / lz4)
+CACHE_CODEC = os.getenv('CACHE_CODEC', 'orjson')
+CACHE_COMPRESSION = os.getenv('CACHE_COMPRESSION', 'none')
+CACHE_COMPRESSION_THRESHOLD = int(os.getenv('CACHE_COMPRESSION_THRESHOLD', 4096)) # only compress payloads at least this many bytes
+CACHE_HOT_KEY_SAMPLE_RATE = float(os.getenv('CACHE_HOT_KEY_SAMPLE_RATE', 0.01)) # fraction of reads counted for the hot-key report
+CACHE_HOT_KEY_TOP_N = int(os.getenv('CACHE_HOT_KEY_TOP_N', 20))
+# Set when several worker processes serve the app (gunicorn): each writes its metrics here and /metrics sums them
+PROMETHEUS_MULTIPROC_DIR = os.getenv('PROMETHEUS_MULTIPROC_DIR')
+REDIS_MAX_CONNECTIONS = int(os.getenv('REDIS_MAX_CONNECTIONS', 50))
+REDIS_POOL_TIMEOUT = float(os.getenv('REDIS_POOL_TIMEOUT', 5)) # seconds to wait for a free connection
+REDIS_SOCKET_TIMEOUT = float(os.getenv('REDIS_SOCKET_TIMEOUT', 2))
+# Sync client, kept for background/blocking code such as the automation processor
 REDIS_CLIENT = redis.Redis(
     host=os.getenv('REDIS_HOST', 'redis'),
     port=int(os.getenv('REDIS_PORT', 6379)),
     db=0,
     decode_responses=True
 )
+# Async client used by the request path (RedisCache, CacheManager) so cache I/O never blocks the event loop.
+# Responses are raw bytes because cached payloads are binary (see utils/cache_codec.py).
+REDIS_ASYNC_CLIENT = aioredis.Redis(
+    connection_pool=aioredis.BlockingConnectionPool(
+        host=REDIS_HOST,
+        port=REDIS_PORT,
+        db=0,
+        decode_responses=False,
+        max_connections=REDIS_MAX_CONNECTIONS,
+        timeout=REDIS_POOL_TIMEOUT,
+        socket_timeout=REDIS_SOCKET_TIMEOUT,
+        socket_connect_timeout=REDIS_SOCKET_TIMEOUT,
+    )
+)
 PERSONAL_LOAN_TIERS = [
     {"purchases": 5, "amount": 5000},
     {"purchases": 15, "amount": 10000},
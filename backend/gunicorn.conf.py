@@ -0,0 +1,19 @@
+# gunicorn.conf.py
+import os
+import shutil
+from prometheus_client import multiprocess
+
+# Workers write their Prometheus metrics to PROMETHEUS_MULTIPROC_DIR, where /metrics sums them
+# (utils/cache_metrics.py scrape_registry)
+
+def on_starting(server):
+    """Start from an empty metrics directory: files left by a previous run would be counted again"""
+    directory = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if directory:
+        shutil.rmtree(directory, ignore_errors=True)
+        os.makedirs(directory)
+
+def child_exit(server, worker):
+    """Drop an exited worker's live gauges (e.g. the connections it had checked out) from the sums"""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        multiprocess.mark_process_dead(worker.pid)
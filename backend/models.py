@@ -1,7 +1,7 @@
 from venv import logger
 from sqlalchemy.dialects.postgresql import JSONB
 from datetime import datetime, time
-from sqlalchemy import Column, Integer, String, Float, Text, DateTime, ForeignKey, UniqueConstraint, Enum, JSON, Boolean, Time
+from sqlalchemy import Column, Integer, String, Float, Text, Date, DateTime, ForeignKey, UniqueConstraint, Enum, JSON, Boolean, Time, Index
 from sqlalchemy.orm import relationship
 from sql_database import Base
 from sqlalchemy.sql import func
@@ -135,7 +135,10 @@ class ProductReview(Base):
     user = relationship('User', back_populates='reviews')
     product = relationship('Product', back_populates='reviews')
     
-    __table_args__ = (UniqueConstraint('user_id', 'product_id'),)  # One review per product per user
+    __table_args__ = (
+        UniqueConstraint('user_id', 'product_id'),  # One review per product per user
+        Index('ix_product_reviews_user_id_created_at_id', 'user_id', 'created_at', 'id'),
+    )
 
 class ProductWishlist(Base):
     __tablename__ = "product_wishlists"
@@ -149,7 +152,10 @@ class ProductWishlist(Base):
     user = relationship('User', back_populates='wishlisted_products')
     product = relationship('Product', back_populates='wishlists')
     
-    __table_args__ = (UniqueConstraint('user_id', 'product_id'),)  # Can't wishlist same product twice
+    __table_args__ = (
+        UniqueConstraint('user_id', 'product_id'),  # Can't wishlist same product twice
+        Index('ix_product_wishlists_user_id_created_at_id', 'user_id', 'created_at', 'id'),
+    )
 
 class ProductView(Base):
     __tablename__ = "product_views"
@@ -163,6 +169,12 @@ class ProductView(Base):
     product = relationship('Product', back_populates='views')
     user = relationship('User', back_populates='product_views')
 
+    # Per-product and per-user view counts over a time window
+    __table_args__ = (
+        Index('ix_product_views_product_id_viewed_at', 'product_id', 'viewed_at'),
+        Index('ix_product_views_user_id_viewed_at', 'user_id', 'viewed_at'),
+    )
+
 class StoreSettings(Base):
     __tablename__ = "store_settings"
     
@@ -202,7 +214,10 @@ class StorefrontProduct(Base):
     owner = relationship('User', backref='storefront_products')
     product = relationship('Product')
     
-    __table_args__ = (UniqueConstraint('user_id', 'product_id'),)
+    __table_args__ = (
+        UniqueConstraint('user_id', 'product_id'),
+        Index('ix_storefront_products_product_id', 'product_id'),  # the unique constraint leads with user_id
+    )
 
 class OrderStatus(enum.Enum):
     pending = "pending"
@@ -253,6 +268,14 @@ class Order(Base):
     invoice_requests = relationship("InvoiceRequest", back_populates="order")
     payout = relationship("Payout", uselist=False, back_populates="order")
 
+    # Seller order lists filtered by status, newest first; buyer purchase history
+    __table_args__ = (
+        Index('ix_orders_seller_id_status_created_at', 'seller_id', 'status', 'created_at'),
+        # Keyset pages over (created_at, id); see utils/pagination.py
+        Index('ix_orders_seller_id_created_at_id', 'seller_id', 'created_at', 'id'),
+        Index('ix_orders_buyer_id_created_at_id', 'buyer_id', 'created_at', 'id'),
+    )
+
 class OrderItem(Base):
     __tablename__ = "order_items"
     
@@ -281,6 +304,11 @@ class Payout(Base):
     seller = relationship("User", backref="payouts")
     order = relationship("Order", back_populates="payout")
 
+    __table_args__ = (
+        Index('ix_payouts_created_at_id', 'created_at', 'id'),
+        Index('ix_payouts_status_created_at_id', 'status', 'created_at', 'id'),
+    )
+
 class InvoiceStatus(str, Enum):
     pending = "pending"
     generated = "generated"
@@ -327,6 +355,11 @@ class InvoiceRequest(Base):
     updater = relationship("User", foreign_keys=[updated_by])
     payments = relationship("Payment", back_populates="invoice_request")
 
+    __table_args__ = (
+        Index('ix_invoice_requests_order_id', 'order_id'),
+        Index('ix_invoice_requests_created_at_id', 'created_at', 'id'),
+    )
+
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         if not self.invoice_number and self.id:
@@ -415,6 +448,7 @@ class NotificationType(str, enum.Enum):
     MONEY_REQUEST_STATUS_CHANGE = "money_request_status_change"
     LOAN_STATUS_CHANGE = "loan_status_change"
     PAYOUT = "payout"
+    AUTOMATION_EXECUTED = "automation_executed"
 
 class Notification(Base):
     __tablename__ = "notifications"
@@ -432,6 +466,14 @@ class Notification(Base):
     # Relationships
     user = relationship("User", back_populates="notifications")
 
+    __table_args__ = (
+        Index('ix_notifications_user_id_created_at_id', 'user_id', 'created_at', 'id'),
+        Index('ix_notifications_user_id_is_read_created_at', 'user_id', 'is_read', 'created_at'),
+        # Unread badges and lists only ever scan the (small) unread set
+        Index('ix_notifications_user_id_unread', 'user_id', 'created_at', 'id', postgresql_where=(is_read == False)),
+        Index('ix_notifications_metadata', 'notification_metadata', postgresql_using='gin'),
+    )
+
 class Feedback(Base):
     __tablename__ = "feedback"
     
@@ -448,6 +490,11 @@ class Feedback(Base):
     # Relationship with User model
     user = relationship("User", back_populates="feedbacks")
 
+    __table_args__ = (
+        Index('ix_feedback_created_at_id', 'created_at', 'id'),
+        Index('ix_feedback_status_created_at_id', 'status', 'created_at', 'id'),
+    )
+
 class RestockRequestStatus(str, enum.Enum):
     PENDING = "pending"
     APPROVED = "approved"
@@ -481,6 +528,11 @@ class RestockRequest(Base):
     user = relationship('User', back_populates='restock_requests')
     product = relationship('Product', back_populates='restock_requests')
 
+    # A seller's restock requests, for the dashboard's restock trends
+    __table_args__ = (
+        Index('ix_restock_requests_user_id_request_date', 'user_id', 'request_date'),
+    )
+
 ###############################################################
 #################### BANKING_RELATED MODELS ###################
 class AccountType(enum.Enum):
@@ -569,6 +621,8 @@ class BankAccount(Base):
     balance = Column(Float, default=0.00)
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime, default=datetime.utcnow)
+    # Bumped by every change written through to the cached account (utils/cache_write_through.py)
+    version = Column(Integer, nullable=False, default=0, server_default='0')
     
     # Relationships
     user = relationship("User", back_populates="bank_accounts")
@@ -578,6 +632,10 @@ class BankAccount(Base):
     incoming_payments = relationship("Payment", foreign_keys="[Payment.to_account_id]")
     loans = relationship("Loan", back_populates="bank_account")
     automations = relationship("BankingAutomation", back_populates="bank_account", foreign_keys="[BankingAutomation.bank_account_id]")
+
+    __table_args__ = (
+        Index('ix_bank_accounts_user_id_account_type', 'user_id', 'account_type'),
+    )
     
 class Transaction(Base):
     __tablename__ = "transactions"
@@ -596,6 +654,11 @@ class Transaction(Base):
     bank_account = relationship("BankAccount", back_populates="transactions")
     payment = relationship("Payment", back_populates="transactions")
 
+    # Account statements, newest first
+    __table_args__ = (
+        Index('ix_transactions_bank_account_id_created_at_id', 'bank_account_id', 'created_at', 'id'),
+    )
+
 class Payment(Base):
     __tablename__ = "payments"
     
@@ -696,6 +759,24 @@ class BankingAutomation(Base):
     destination_account = relationship("ExternalAccount", foreign_keys=[destination_account_id])
     schedule_details = relationship("AutomationScheduleDetails", back_populates="automation", uselist=False)
 
+    # The automation processor's due-automation scan
+    __table_args__ = (
+        Index('ix_banking_automations_is_active_next_run', 'is_active', 'next_run'),
+    )
+
+class AutomationRun(Base):
+    __tablename__ = "automation_runs"
+
+    id = Column(Integer, primary_key=True)
+    automation_id = Column(Integer, ForeignKey('banking_automations.id'), nullable=False)
+    scheduled_run = Column(DateTime, nullable=False)  # The next_run this execution was for
+    executed_at = Column(DateTime, default=datetime.utcnow)
+
+    # Idempotency key: each scheduled run of an automation executes at most once, whichever worker gets it
+    __table_args__ = (
+        UniqueConstraint('automation_id', 'scheduled_run'),
+    )
+
 class FinancialPool(Base):
     __tablename__ = "financial_pools"
     
@@ -719,6 +800,11 @@ class FinancialPool(Base):
                                          foreign_keys=[BankingAutomation.destination_pool_id],
                                          back_populates="destination_pool")
 
+    # Credit pool lookup on every incoming transfer
+    __table_args__ = (
+        Index('ix_financial_pools_bank_account_id_is_credit_pool', 'bank_account_id', 'is_credit_pool'),
+    )
+
 class Loan(Base):
     __tablename__ = "loans"
     
@@ -772,4 +858,89 @@ class PayoutBankDetails(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
-    user = relationship("User", back_populates="payout_bank_details")
\ No newline at end of file
+    user = relationship("User", back_populates="payout_bank_details")
+
+class SellerMetrics(Base):
+    """Running dashboard counters for a seller, kept in step with their rows by utils/metric_counters.py"""
+    __tablename__ = "seller_metrics"
+
+    user_id = Column(Integer, ForeignKey('users.id'), primary_key=True)
+    product_count = Column(Integer, nullable=False, default=0, server_default='0')
+    low_stock_count = Column(Integer, nullable=False, default=0, server_default='0')
+    out_of_stock_count = Column(Integer, nullable=False, default=0, server_default='0')
+    pending_order_count = Column(Integer, nullable=False, default=0, server_default='0')
+    pending_invoice_count = Column(Integer, nullable=False, default=0, server_default='0')
+    sent_invoice_count = Column(Integer, nullable=False, default=0, server_default='0')
+    paid_invoice_count = Column(Integer, nullable=False, default=0, server_default='0')
+    overdue_invoice_count = Column(Integer, nullable=False, default=0, server_default='0')
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class SellerCategoryMetrics(Base):
+    """Products per category for a seller; the dashboard counts the categories still in use"""
+    __tablename__ = "seller_category_metrics"
+
+    user_id = Column(Integer, ForeignKey('users.id'), primary_key=True)
+    category = Column(String(50), primary_key=True)
+    product_count = Column(Integer, nullable=False, default=0, server_default='0')
+
+class BuyerMetrics(Base):
+    """Running dashboard counters for a shopper (personal view)"""
+    __tablename__ = "buyer_metrics"
+
+    user_id = Column(Integer, ForeignKey('users.id'), primary_key=True)
+    view_count = Column(Integer, nullable=False, default=0, server_default='0')
+    wishlist_count = Column(Integer, nullable=False, default=0, server_default='0')
+    review_count = Column(Integer, nullable=False, default=0, server_default='0')
+    purchase_count = Column(Integer, nullable=False, default=0, server_default='0')
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class PlatformDailyMetrics(Base):
+    """
+    Daily rollup behind the admin dashboard, maintained by utils/admin_rollups.py.
+    Snapshot columns hold platform totals as of `snapshot_at`; flow columns hold the
+    amounts created on `day`, so month-to-date figures are a sum over a month of rows.
+    """
+    __tablename__ = "platform_daily_metrics"
+
+    day = Column(Date, primary_key=True)
+    snapshot_at = Column(DateTime, nullable=True)  # Null until a snapshot was taken for the day
+
+    # Snapshot: users
+    total_users = Column(Integer, nullable=False, default=0, server_default='0')
+    new_users = Column(Integer, nullable=False, default=0, server_default='0')  # Joined in the 30 days before
+    active_users = Column(Integer, nullable=False, default=0, server_default='0')  # Logged in in the 30 days before
+    verified_users = Column(Integer, nullable=False, default=0, server_default='0')
+
+    # Snapshot: inventory health
+    total_products = Column(Integer, nullable=False, default=0, server_default='0')
+    active_products = Column(Integer, nullable=False, default=0, server_default='0')  # Listed in a storefront
+    low_stock_products = Column(Integer, nullable=False, default=0, server_default='0')
+    low_stock_in_stock_products = Column(Integer, nullable=False, default=0, server_default='0')
+    out_of_stock_products = Column(Integer, nullable=False, default=0, server_default='0')
+    pending_restock_requests = Column(Integer, nullable=False, default=0, server_default='0')
+    high_priority_restock_requests = Column(Integer, nullable=False, default=0, server_default='0')
+
+    # Snapshot: orders by status
+    total_orders = Column(Integer, nullable=False, default=0, server_default='0')
+    pending_orders = Column(Integer, nullable=False, default=0, server_default='0')
+    fulfilled_orders = Column(Integer, nullable=False, default=0, server_default='0')
+    cancelled_orders = Column(Integer, nullable=False, default=0, server_default='0')
+    total_gmv = Column(Float, nullable=False, default=0, server_default='0')
+
+    # Snapshot: payments by status
+    total_payments = Column(Integer, nullable=False, default=0, server_default='0')
+    pending_payments = Column(Integer, nullable=False, default=0, server_default='0')
+    completed_payments = Column(Integer, nullable=False, default=0, server_default='0')
+    failed_payments = Column(Integer, nullable=False, default=0, server_default='0')
+    pending_payment_amount = Column(Float, nullable=False, default=0, server_default='0')
+
+    # Snapshot: invoices by status
+    total_invoices = Column(Integer, nullable=False, default=0, server_default='0')
+    pending_invoices = Column(Integer, nullable=False, default=0, server_default='0')
+    paid_invoices = Column(Integer, nullable=False, default=0, server_default='0')
+    overdue_invoices = Column(Integer, nullable=False, default=0, server_default='0')
+
+    # Flow: created on `day`
+    gmv = Column(Float, nullable=False, default=0, server_default='0')  # Orders not cancelled
+    payment_volume = Column(Float, nullable=False, default=0, server_default='0')  # Completed payments
+    invoice_volume = Column(Float, nullable=False, default=0, server_default='0')
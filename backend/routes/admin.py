@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session, joinedload
 from datetime import datetime
 from typing import List, Optional
@@ -13,7 +13,9 @@ from enum import Enum
 from utils.app_metrics_calculator import get_all_metrics
 from utils.cache_decorators import cache_response, invalidate_cache
 from utils.cache_constants import CacheNamespace, CACHE_KEYS
-from config import CACHE_EXPIRATION_TIME, MYAJE_BANK_ACCOUNT_ID
+from utils.eager_loading import ADMIN_PAYOUT_OPTIONS, ADMIN_MARKETPLACE_ORDER_OPTIONS
+from utils.pagination import keyset_paginate, keyset_page
+from config import CACHE_EXPIRATION_TIME, MYAJE_BANK_ACCOUNT_ID, PAGE_SIZE_DEFAULT, PAGE_SIZE_MAX
 from sqlalchemy import and_
 import uuid
 
@@ -63,6 +65,10 @@ class PayoutResponse(BaseModel):
     class Config:
         orm_mode = True
 
+class PayoutPage(BaseModel):
+    items: List[PayoutResponse]
+    next_cursor: Optional[str] = None
+
 class RelatedOrder(BaseModel):
     id: int
     seller_email: str
@@ -141,7 +147,7 @@ async def create_admin_user(
     return new_admin
 
 @router.get("/get_admin_users", response_model=List[AdminUserResponse])
-@cache_response(expire=CACHE_EXPIRATION_TIME)
+@cache_response(expire=CACHE_EXPIRATION_TIME, key=CACHE_KEYS["admin_users_list"])
 async def get_admin_users(
     db: Session = Depends(get_db),
     current_admin: User = Depends(get_admin_user)
@@ -189,7 +195,7 @@ async def delete_admin_user(
     return {"message": "Admin user deleted successfully"}
 
 @router.get("/metrics")
-@cache_response(expire=300)  # Short expiration time (5 minutes) for metrics
+@cache_response(expire=300, key=CACHE_KEYS["app_metrics"], stale_ttl=300)  # Short expiration time (5 minutes) for metrics
 async def get_app_metrics(
     db: Session = Depends(get_db),
     admin: User = Depends(get_admin_user)
@@ -369,36 +375,32 @@ async def reject_loan(
     db.commit()
     return {"status": "success"}
 
-@router.get("/payouts", response_model=List[PayoutResponse])
+@router.get("/payouts", response_model=PayoutPage)
 async def get_payouts(
     status: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(PAGE_SIZE_DEFAULT, gt=0, le=PAGE_SIZE_MAX),
     db: Session = Depends(get_db),
     current_admin: User = Depends(get_admin_user)
 ):
-    """Get all payouts with optional status filter"""
+    """Get payouts, newest first and one page at a time, with optional status filter"""
     query = (
         db.query(Payout)
         .join(Payout.seller)
         .join(Payout.order)
-        .options(joinedload(Payout.seller))  # Eager load seller relationship
+        .options(*ADMIN_PAYOUT_OPTIONS)  # Seller, seller's bank details and order
     )
     
     if status and status.upper() in ['PENDING', 'PAID']:
         query = query.filter(Payout.status == status.upper())
     
-    payouts = query.order_by(Payout.created_at.desc()).all()
+    payouts = keyset_paginate(query, Payout, cursor, limit).all()
     
     # Enhance payout objects with additional info
-    payouts_with_details = []
-    for payout in payouts:
-        # Get bank details for each seller
-        bank_details = (
-            db.query(PayoutBankDetails)
-            .filter(PayoutBankDetails.user_id == payout.seller_id)
-            .first()
-        )
+    def payout_with_details(payout):
+        bank_details = payout.seller.payout_bank_details
         
-        payouts_with_details.append({
+        return {
             "id": payout.id,
             "seller_id": payout.seller_id,
             "order_id": payout.order_id,
@@ -416,9 +418,9 @@ async def get_payouts(
                 "account_name": bank_details.account_name,
                 "created_at": bank_details.created_at
             } if bank_details else None,
-        })
+        }
     
-    return payouts_with_details
+    return keyset_page(payouts, limit, payout_with_details)
 
 @router.put("/payouts/{payout_id}/complete")
 async def complete_payout(
@@ -486,7 +488,7 @@ async def get_marketplace_order_details(
     marketplace_order = (
         db.query(MarketplaceOrder)
         .filter(MarketplaceOrder.id == marketplace_order_id)
-        .options(joinedload(MarketplaceOrder.seller_orders).joinedload(Order.payout))
+        .options(*ADMIN_MARKETPLACE_ORDER_OPTIONS)
         .first()
     )
     
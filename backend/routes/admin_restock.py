@@ -36,7 +36,7 @@ class RestockRequestDetail(BaseModel):
     user_email: str  # Added to show who made the request
 
 @router.get("", response_model=List[RestockRequestDetail])
-@cache_response(expire=300, include_user_id=False)  # 5 minute cache, no user isolation
+@cache_response(expire=300, include_user_id=False, key=ADMIN_CACHE_KEYS["all_restock_requests"])  # 5 minute cache, no user isolation
 async def get_all_restock_requests(
     status: Optional[str] = None,
     db: Session = Depends(get_db),
@@ -67,7 +67,7 @@ async def get_all_restock_requests(
     return response_requests
 
 @router.get("/{request_id}", response_model=RestockRequestDetail)
-@cache_response(expire=300, include_user_id=False)
+@cache_response(expire=300, include_user_id=False, key=ADMIN_CACHE_KEYS["restock_detail"])
 async def get_restock_request_detail(
     request_id: int,
     db: Session = Depends(get_db),
@@ -1,15 +1,17 @@
 from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.responses import JSONResponse
 from fastapi.security import OAuth2PasswordBearer
+from starlette.concurrency import run_in_threadpool
 import pytz
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from jose import jwt, JWTError
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 from utils.notification_service import NotificationService
 from config import SECRET_KEY, ALGORITHM, SUPER_ADMIN_EMAIL, SUPER_ADMIN_PASSWORD
 
-from sql_database import get_db
+from sql_database import get_db, get_async_db
 from models import User, TokenBlacklist, OTPVerification
 from passlib.context import CryptContext
 
@@ -40,46 +42,72 @@ def create_access_token(data: dict, expires_delta: timedelta = timedelta(hours=2
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
-    credentials_exception = HTTPException(
+def _token_user_id(token: str) -> Optional[int]:
+    """The user id in a bearer token, or None if the token is invalid"""
+    try:
+        return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM]).get('user_id')
+    except JWTError:
+        return None
+
+# Each request resolves its user on the session its route uses (get_db or get_async_db, which
+# FastAPI shares between the route and its dependencies), so authenticating never holds a
+# second pooled connection alongside the route's.
+
+async def _load_user(db: Session, user_id: int) -> Optional[User]:
+    """Look the user up on the request's sync session, off the event loop"""
+    return await run_in_threadpool(db.get, User, user_id)
+
+async def _load_user_async(adb: AsyncSession, user_id: int) -> Optional[User]:
+    """
+    Look the user up on the request's async session. The read-only transaction is ended so a
+    route reading through another session (e.g. the read replica's) doesn't hold two connections.
+    """
+    user = await adb.get(User, user_id)
+    await adb.commit()
+    return user
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    try:
-        # Decode the token
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        
-        # Extract user ID or email from the token
-        user_id = payload.get('user_id')
-        if user_id is None:
-            raise credentials_exception
-        
-        # Find the user in the database
-        user = db.query(User).filter(User.id == user_id).first()
-        if user is None:
-            raise credentials_exception
-        
-        return user
-    
-    except JWTError:
-        raise credentials_exception
-    
+
+async def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db)
+):
+    """The authenticated user, attached to the request's get_db session for routes on it"""
+    user_id = _token_user_id(token)
+    user = await _load_user(db, user_id) if user_id is not None else None
+    if user is None:
+        raise _credentials_exception()
+    return user
+
+async def get_current_user_async(
+    token: str = Depends(oauth2_scheme),
+    adb: AsyncSession = Depends(get_async_db)
+):
+    """The authenticated user, loaded through the async session for routes on AsyncSession"""
+    user_id = _token_user_id(token)
+    user = await _load_user_async(adb, user_id) if user_id is not None else None
+    if user is None:
+        raise _credentials_exception()
+    return user
+
 async def get_optional_current_user(
     token: Optional[str] = Depends(oauth2_scheme_optional), 
     db: Session = Depends(get_db)
 ) -> Optional[User]:
-    if not token:
-        return None
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id = payload.get('user_id')
-        if user_id is None:
-            return None
-        user = db.query(User).filter(User.id == user_id).first()
-        return user
-    except JWTError:
-        return None
+    user_id = _token_user_id(token) if token else None
+    return await _load_user(db, user_id) if user_id is not None else None
+
+async def get_optional_current_user_async(
+    token: Optional[str] = Depends(oauth2_scheme_optional),
+    adb: AsyncSession = Depends(get_async_db)
+) -> Optional[User]:
+    user_id = _token_user_id(token) if token else None
+    return await _load_user_async(adb, user_id) if user_id is not None else None
 
 async def get_admin_user(
     current_user: User = Depends(get_current_user)
@@ -2,23 +2,29 @@
 from fastapi.encoders import jsonable_encoder
 import re
 from fastapi import APIRouter, Depends, HTTPException, Query, Body, Path
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session, joinedload
 from sqlalchemy.sql import func
 from typing import Optional, List
 from pydantic import BaseModel
 from datetime import datetime, timedelta
-from sql_database import get_db
-from routes.auth import get_current_user
+from sql_database import get_db, get_async_db
+from routes.auth import get_current_user, get_current_user_async
 from models import (AccountSource, AutomationSchedule, AutomationType, User, BankAccount, AccountType, Payment, ExternalAccount, 
                     Transaction, TransactionTag, TransactionType, MoneyRequest, 
                     Notification, Loan, NotificationType, BankingAutomation, Order,
                     FinancialPool, PaymentType, PaymentStatus, AccountSource, 
-                    RestockRequest, RestockRequestStatus, OrderStatus, AutomationScheduleDetails,
+                    RestockRequest, RestockRequestStatus, OrderStatus, AutomationScheduleDetails, AutomationRun,
                     AutomationType, AutomationSchedule)
 from utils.cache_decorators import cache_response, invalidate_cache
 from utils.cache_manager import cache_manager
+from utils.cache_write_through import transaction_row, snapshot_account_change, write_through_account_change
+from utils.pagination import keyset_paginate, keyset_page
+from utils.read_replica import get_async_read_db
 from banking_automations.automation_functions import calculate_next_run
-from config import BUSINESS_ACCOUNT_INITIAL_BALANCE, CACHE_EXPIRATION_TIME, MYAJE_BANK_ACCOUNT_ID, PERSONAL_ACCOUNT_INITIAL_BALANCE, PERSONAL_LOAN_TIERS, BUSINESS_LOAN_TIERS, BUSINESS_LOAN_EQUITY_PERCENTAGE
+from banking_automations.scheduler import automation_scheduler
+from config import BUSINESS_ACCOUNT_INITIAL_BALANCE, CACHE_EXPIRATION_TIME, MYAJE_BANK_ACCOUNT_ID, PERSONAL_ACCOUNT_INITIAL_BALANCE, PERSONAL_LOAN_TIERS, BUSINESS_LOAN_TIERS, BUSINESS_LOAN_EQUITY_PERCENTAGE, PAGE_SIZE_DEFAULT, PAGE_SIZE_MAX
 from enum import Enum
 import random
 import uuid
@@ -167,7 +173,7 @@ async def create_bank_account(
     return new_account
 
 @router.get("/accounts", response_model=List[BankAccountResponse])
-@cache_response(expire=CACHE_EXPIRATION_TIME)
+@cache_response(expire=CACHE_EXPIRATION_TIME, key=CACHE_KEYS["user_accounts"])
 async def get_user_accounts(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -180,7 +186,7 @@ async def get_user_accounts(
     return accounts
 
 @router.get("/accounts/{account_type}", response_model=Optional[BankAccountResponse])
-@cache_response(expire=CACHE_EXPIRATION_TIME)
+@cache_response(expire=CACHE_EXPIRATION_TIME, key=CACHE_KEYS["account_by_type"])
 async def get_account_by_type(
     account_type: AccountType,
     db: Session = Depends(get_db),
@@ -325,13 +331,12 @@ class MoneyRequestResponse(BaseModel):
         )
 
 @router.post("/transfer")
+# Accounts and transactions are patched in the cache by write-through, not invalidated
 @invalidate_cache(
-    namespaces=[CacheNamespace.ACCOUNT, CacheNamespace.TRANSACTION, CacheNamespace.PAYMENT],
+    namespaces=[CacheNamespace.PAYMENT, CacheNamespace.POOL],
     user_id_arg='current_user',
     custom_keys=[
-        lambda result: CACHE_KEYS["account_transactions"](result["from_account_id"]),
-        lambda result: CACHE_KEYS["account_payments"](result["from_account_id"]),
-        lambda result: CACHE_KEYS["user_accounts"](result["user_id"])
+        lambda result: CACHE_KEYS["account_payments"](result["from_account_id"])
     ]
 )
 async def transfer_money(
@@ -497,18 +502,25 @@ async def transfer_money(
             )
             db.add(notification)
     
-    # Add cache invalidation for recipient if it's a BAM account
-    if transfer_data.recipient_type == "bam":
-        recipient_user = db.query(User).filter(
-            User.phone == formatted_user_identifier
-        ).first()
-        if recipient_user:
-            cache_manager.invalidate_user_cache(
-                recipient_user.id, 
-                [CacheNamespace.ACCOUNT, CacheNamespace.TRANSACTION]
-            )
-            
+    db.flush()
+    account_changes = [snapshot_account_change(sender_account, [pool], debit_transaction, payment)]
+    if pool and transfer_data.recipient_type == "bam":
+        account_changes.append(
+            snapshot_account_change(recipient_account, [receiver_credit_pool], credit_transaction, payment)
+        )
+
     db.commit()
+
+    for change in account_changes:
+        await write_through_account_change(change)
+
+    # Pool balances and notifications of a BAM recipient changed too
+    if transfer_data.recipient_type == "bam":
+        await cache_manager.invalidate_user_cache(
+            recipient_user.id,
+            [CacheNamespace.POOL, CacheNamespace.NOTIFICATION]
+        )
+
     return {"status": "success", "reference": payment.reference_number, 
             "from_account_id": sender_account.id, "user_id": current_user.id}
 
@@ -593,7 +605,7 @@ async def request_money(
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/money-requests/sent", response_model=List[MoneyRequestResponse])
-@cache_response(expire=CACHE_EXPIRATION_TIME)
+@cache_response(expire=CACHE_EXPIRATION_TIME, key=CACHE_KEYS["user_notifications"])
 async def get_sent_money_requests(
     user_view: str = Query(...),
     db: Session = Depends(get_db),
@@ -608,7 +620,7 @@ async def get_sent_money_requests(
     return jsonable_encoder(response)
 
 @router.get("/money-requests/received", response_model=List[MoneyRequestResponse])
-@cache_response(expire=CACHE_EXPIRATION_TIME)
+@cache_response(expire=CACHE_EXPIRATION_TIME, key=CACHE_KEYS["user_notifications"])
 async def get_received_money_requests(
     user_view: str = Query(...),
     db: Session = Depends(get_db),
@@ -624,10 +636,13 @@ async def get_received_money_requests(
 
 @router.post("/money-requests/{request_id}/accept")
 @invalidate_cache(
-    namespaces=[CacheNamespace.ACCOUNT, CacheNamespace.TRANSACTION, CacheNamespace.NOTIFICATION],
+    namespaces=[CacheNamespace.ACCOUNT, CacheNamespace.TRANSACTION, CacheNamespace.NOTIFICATION, CacheNamespace.POOL],
     user_id_arg='current_user',
     custom_keys=[
-        lambda result: CACHE_KEYS["user_notifications"](result["requester_id"]) if "requester_id" in result else None
+        lambda result: CACHE_KEYS["user_notifications"](result["requester_id"]) if "requester_id" in result else None,
+        lambda result: CACHE_KEYS["user_accounts"](result["requester_id"]) if "requester_id" in result else None,
+        lambda result: CACHE_KEYS["user_pools"](result["requester_id"]) if "requester_id" in result else None,
+        lambda result: f"{CacheNamespace.TRANSACTION}:user:{result['requester_id']}" if "requester_id" in result else None
     ]
 )
 async def accept_money_request(
@@ -831,29 +846,33 @@ async def reject_money_request(
     }
 
 @router.get("/transactions")
-@cache_response(expire=CACHE_EXPIRATION_TIME)
+@cache_response(expire=CACHE_EXPIRATION_TIME, key=CACHE_KEYS["user_transactions"])
 async def get_transactions(
-    start_date: Optional[str] = None,
-    end_date: Optional[str] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
     transaction_type: Optional[str] = None,
     transaction_tag: Optional[str] = None,
     user_view: str = Query(..., regex="^(personal|business)$"),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    cursor: Optional[str] = None,
+    limit: int = Query(PAGE_SIZE_DEFAULT, gt=0, le=PAGE_SIZE_MAX),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: User = Depends(get_current_user_async)
 ):
     # Get the appropriate bank account based on user view
-    bank_account = db.query(BankAccount).filter(
+    bank_account = (await db.scalars(select(BankAccount).filter(
         BankAccount.user_id == current_user.id,
         BankAccount.account_type == (AccountType.BUSINESS if user_view == "business" else AccountType.PERSONAL)
-    ).first()
+    ))).first()
     
     if not bank_account:
         raise HTTPException(status_code=404, detail="Bank account not found")
     
     # Build the base query
-    query = db.query(Transaction).filter(Transaction.bank_account_id == bank_account.id)
+    query = select(Transaction).filter(Transaction.bank_account_id == bank_account.id)
     
     # Apply filters
+    # The dates arrive parsed (malformed ones are rejected with a 422): asyncpg compares
+    # timestamps against datetimes, not strings
     if start_date:
         query = query.filter(Transaction.created_at >= start_date)
     if end_date:
@@ -863,21 +882,10 @@ async def get_transactions(
     if transaction_tag and transaction_tag != 'all-tags':
         query = query.filter(Transaction.tag == transaction_tag.upper())
     
-    # Order by most recent first
-    query = query.order_by(Transaction.created_at.desc())
-    
-    transactions = query.all()
+    # Most recent first, one page at a time
+    transactions = (await db.scalars(keyset_paginate(query, Transaction, cursor, limit))).all()
     
-    return [{
-        "id": t.id,
-        "type": t.type.value.lower(),
-        "amount": t.amount,
-        "description": t.description,
-        "reference": t.reference,
-        "tag": t.tag.value.lower(),
-        "date": t.created_at.isoformat(),
-        "payment_id": t.payment_id
-    } for t in transactions]
+    return keyset_page(transactions, limit, transaction_row)
 
 ############### FINANCIAL POOL ROUTES ############################################
 class PoolUpdate(BaseModel):
@@ -890,7 +898,7 @@ class RedistributePoolsRequest(BaseModel):
     pools: List[PoolUpdate]
     
 @router.get("/pools/available", response_model=List[dict])
-@cache_response(expire=CACHE_EXPIRATION_TIME)
+@cache_response(expire=CACHE_EXPIRATION_TIME, key=CACHE_KEYS["user_pools"])
 async def get_available_pools(
     active_view: str = Query(..., regex="^(personal|business)$"),
     db: Session = Depends(get_db),
@@ -931,6 +939,10 @@ async def get_available_pools(
     ]
 
 @router.post("/pools/redistribute", response_model=dict)
+@invalidate_cache(
+    namespaces=[CacheNamespace.ACCOUNT, CacheNamespace.POOL],
+    user_id_arg='current_user'
+)
 async def redistribute_pools(
     request: RedistributePoolsRequest,
     db: Session = Depends(get_db),
@@ -1430,6 +1442,7 @@ async def create_automation(
         db.rollback()
         raise HTTPException(status_code=400, detail=str(e))
     
+    await automation_scheduler.schedule(new_automation.id, new_automation.next_run)
     return {"id": new_automation.id}
 
 @router.patch("/automations/{automation_id}")
@@ -1511,6 +1524,10 @@ async def update_automation(
         db.rollback()
         raise HTTPException(status_code=500, detail="Failed to update automation")
     
+    if automation.is_active:
+        await automation_scheduler.schedule(automation.id, automation.next_run)
+    else:
+        await automation_scheduler.unschedule(automation.id)
     return automation
 
 @router.delete("/automations/{automation_id}")
@@ -1533,6 +1550,7 @@ async def delete_automation(
         raise HTTPException(status_code=404, detail="Schedule details for automation not found")
     
     try:
+        db.query(AutomationRun).filter(AutomationRun.automation_id == automation_id).delete()
         db.delete(automation_schedule_details)
         db.delete(automation)
         db.commit()
@@ -1540,4 +1558,5 @@ async def delete_automation(
         db.rollback()
         raise HTTPException(status_code=500, detail="Failed to delete automation")
     
+    await automation_scheduler.unschedule(automation_id)
     return {"message": "Automation deleted successfully"}
\ No newline at end of file
@@ -1,18 +1,19 @@
 
 from fastapi import APIRouter, Depends, Query
-from routes.auth import get_current_user
+from routes.auth import get_current_user_async
 from utils.user_metrics_calculator import get_all_metrics
-from sqlalchemy.orm import Session
-from sql_database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from utils.read_replica import get_async_read_db
 from models import User
 from utils.cache_decorators import cache_response
+from utils.cache_constants import CacheNamespace
 
 router = APIRouter()
-@cache_response(expire=1800)  # Cache for 30 minutes
 @router.get("/metrics")
+@cache_response(expire=1800, namespace=CacheNamespace.DASHBOARD, stale_ttl=600)  # Cache for 30 minutes, serve stale for 10 more while refreshing
 async def get_dashboard_metrics(
     active_view: str = Query(..., regex="^(personal|business)$"),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: User = Depends(get_current_user_async)
 ):
     return await get_all_metrics(db, current_user.id, active_view=active_view)
\ No newline at end of file
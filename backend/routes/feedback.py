@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi import APIRouter, Depends, HTTPException, Request, Query
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from typing import Optional, List
@@ -9,6 +9,8 @@ from routes.auth import get_current_user, get_admin_user
 from sql_database import get_db
 from utils.cache_constants import CACHE_KEYS
 from utils.cache_decorators import cache_response, CacheNamespace, invalidate_cache
+from utils.pagination import keyset_paginate, keyset_page
+from config import PAGE_SIZE_DEFAULT, PAGE_SIZE_MAX
 
 router = APIRouter()
 
@@ -37,10 +39,15 @@ class FeedbackResponse(BaseModel):
     user_id: int
     admin_notes: Optional[str]
 
+class FeedbackPage(BaseModel):
+    items: List[FeedbackResponse]
+    next_cursor: Optional[str] = None
+
 @router.post("/submit")
 @invalidate_cache(
     namespaces=[CacheNamespace.FEEDBACK],
-    user_id_arg='current_user'
+    user_id_arg='current_user',
+    custom_keys=[lambda _: CACHE_KEYS["admin_feedback_list"]()]
 )
 async def submit_feedback(
     feedback: FeedbackCreate,
@@ -66,10 +73,12 @@ async def submit_feedback(
         db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.get("/admin/feedback", response_model=List[FeedbackResponse]) # only available in admin page
-@cache_response(expire=900)
+@router.get("/admin/feedback", response_model=FeedbackPage) # only available in admin page
+@cache_response(expire=900, key=CACHE_KEYS["admin_feedback_list"])
 async def get_all_feedback(
     status: Optional[FeedbackStatus] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(PAGE_SIZE_DEFAULT, gt=0, le=PAGE_SIZE_MAX),
     db: Session = Depends(get_db),
     admin: User = Depends(get_admin_user)
 ):
@@ -77,12 +86,15 @@ async def get_all_feedback(
     query = db.query(Feedback)
     if status:
         query = query.filter(Feedback.status == status)
-    return query.order_by(Feedback.created_at.desc()).all()
+    return keyset_page(keyset_paginate(query, Feedback, cursor, limit).all(), limit)
 
 @router.put("/admin/feedback/{feedback_id}") # only available in admin page
 @invalidate_cache(
     namespaces=[CacheNamespace.FEEDBACK],
-    custom_keys=[lambda result: CACHE_KEYS["feedback_detail"](result.id)]
+    custom_keys=[
+        lambda result: CACHE_KEYS["feedback_detail"](result.id),
+        lambda _: CACHE_KEYS["admin_feedback_list"]()
+    ]
 )
 async def update_feedback_status(
     feedback_id: int,
@@ -14,7 +14,7 @@ from utils.cache_decorators import cache_response, CacheNamespace, invalidate_ca
 router = APIRouter()
 
 @router.get("/get_inventory")
-@cache_response(expire=3600)  # Cache for 1 hour
+@cache_response(expire=3600, key=CACHE_KEYS["user_products"])  # Cache for 1 hour
 async def get_inventory(
     current_user: User = Depends(get_current_user), 
     db: Session = Depends(get_db)
@@ -152,7 +152,7 @@ async def delete_product_from_inventory(
     return {"message": "Product deleted successfully", "user_id": current_user.id, "id": product.id}
 
 @router.get("/is_low_stock")
-@cache_response(expire=1800)
+@cache_response(expire=1800, namespace=CacheNamespace.INVENTORY)
 async def get_low_stock(
     current_user: User = Depends(get_current_user), 
     db: Session = Depends(get_db)
@@ -1,7 +1,6 @@
 #invoice.py
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import desc
 from typing import List, Optional
 from datetime import datetime, timedelta
 from jinja2 import Environment, FileSystemLoader
@@ -17,10 +16,11 @@ from routes.auth import get_current_user
 import logging
 from typing import Dict
 from enum import Enum
-from config import SMTP_USERNAME, SMTP_PASSWORD, SMTP_SERVER, SMTP_PORT
+from config import SMTP_USERNAME, SMTP_PASSWORD, SMTP_SERVER, SMTP_PORT, PAGE_SIZE_DEFAULT, PAGE_SIZE_MAX
 from utils.cache_constants import CACHE_KEYS
 from utils.cache_decorators import cache_response, CacheNamespace, invalidate_cache
 from utils.helper_functions import serialize_datetime
+from utils.pagination import keyset_paginate, keyset_page
 
 router = APIRouter()
 
@@ -124,9 +124,11 @@ async def create_invoice_request(
         raise HTTPException(status_code=500, detail="Error processing invoice request")
 
 @router.get("/requests")
-@cache_response(expire=1800)
+@cache_response(expire=1800, key=CACHE_KEYS["user_invoices"])
 async def get_invoice_requests(
     status: Optional[InvoiceStatus] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(PAGE_SIZE_DEFAULT, gt=0, le=PAGE_SIZE_MAX),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -142,10 +144,10 @@ async def get_invoice_requests(
     if status:
         query = query.filter(InvoiceRequest.status == status)
     
-    # Order by creation date
-    requests = query.order_by(desc(InvoiceRequest.created_at)).all()
+    # Newest first, one page at a time
+    requests = keyset_paginate(query, InvoiceRequest, cursor, limit).all()
     
-    return [{
+    return keyset_page(requests, limit, lambda req: {
         "id": req.id,
         "customer_name": req.customer_name,
         "customer_email": req.customer_email,
@@ -157,10 +159,10 @@ async def get_invoice_requests(
         "invoice_number": req.invoice_number,
         "items": req.items,
         "order_id": req.order_id
-    } for req in requests]
+    })
 
 @router.get("/request/{request_id}")
-@cache_response(expire=3600)
+@cache_response(expire=3600, key=lambda request_id: CACHE_KEYS["invoice_detail"](request_id))
 async def get_invoice_request(
     request_id: int,
     current_user: User = Depends(get_current_user),
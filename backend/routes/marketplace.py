@@ -1,14 +1,18 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from sql_database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from sql_database import get_async_db
+from utils.read_replica import get_async_read_db
 from models import StorefrontProduct, User, Product, ProductReview, ProductView, ProductWishlist
 from pydantic import BaseModel
 from typing import Optional
-from routes.auth import get_current_user, get_optional_current_user
+from routes.auth import get_current_user_async, get_optional_current_user_async
 from utils.cache_decorators import cache_response
+from utils.cache_constants import CacheNamespace, CACHE_KEYS
 from utils.helper_functions import serialize_datetime
+from utils.eager_loading import MARKETPLACE_PRODUCT_OPTIONS, STOREFRONT_PRODUCT_OPTIONS, STORE_OPTIONS
 from datetime import datetime
-from sqlalchemy import func, desc
+from sqlalchemy import func, desc, select
 
 router = APIRouter()
 
@@ -17,11 +21,14 @@ class ReviewCreate(BaseModel):
     review_text: Optional[str]
 
 @router.get("/get_products")
-@cache_response(expire=3600)
+@cache_response(expire=3600, key=CACHE_KEYS["marketplace_products"], stale_ttl=600)
 async def fetch_storefront_products(
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
-    storefront_products = db.query(StorefrontProduct).all()
+    # Relationships can't lazy-load on an async session; load them with the listing
+    storefront_products = (await db.scalars(
+        select(StorefrontProduct).options(*MARKETPLACE_PRODUCT_OPTIONS)
+    )).all()
     return [
         {
             'id': sp.id,
@@ -39,13 +46,15 @@ async def fetch_storefront_products(
     ]
 
 @router.get("/store/{store_slug}")
-@cache_response(expire=3600)
+@cache_response(expire=3600, key=CACHE_KEYS["marketplace_stores"], stale_ttl=600)
 async def fetch_store_details(
     store_slug: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
-    # First get the store/user details
-    store = db.query(User).filter(User.store_slug == store_slug).first()
+    # First get the store/user details, with its settings
+    store = (await db.scalars(
+        select(User).options(*STORE_OPTIONS).filter(User.store_slug == store_slug)
+    )).first()
     if not store:
         raise HTTPException(status_code=404, detail="Store not found")
         
@@ -53,9 +62,10 @@ async def fetch_store_details(
     store_settings = store.store_settings
     
     # Get store products
-    storefront_products = db.query(StorefrontProduct).filter(
-        StorefrontProduct.user_id == store.id
-    ).all()
+    storefront_products = (await db.scalars(
+        select(StorefrontProduct).options(*STOREFRONT_PRODUCT_OPTIONS)
+        .filter(StorefrontProduct.user_id == store.id)
+    )).all()
     
     return {
         "store": {
@@ -86,11 +96,11 @@ async def fetch_store_details(
 async def create_product_review(
     product_id: int,
     review: ReviewCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     # Check if product exists
-    product = db.query(Product).filter(Product.id == product_id).first()
+    product = await db.get(Product, product_id)
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
     
@@ -98,10 +108,10 @@ async def create_product_review(
         raise HTTPException(status_code=404, detail="Sorry, you cannot review your own product!")
         
     # Check if user already reviewed this product
-    existing_review = db.query(ProductReview).filter(
+    existing_review = (await db.scalars(select(ProductReview).filter(
         ProductReview.user_id == current_user.id,
         ProductReview.product_id == product_id
-    ).first()
+    ))).first()
     
     if existing_review:
         # Update existing review
@@ -118,7 +128,7 @@ async def create_product_review(
         )
         db.add(new_review)
     
-    db.commit()
+    await db.commit()
     return {"message": "Review submitted successfully"}
 
 @router.get("/{product_id}/reviews")
@@ -126,19 +136,21 @@ async def get_product_reviews(
     product_id: int,
     skip: int = 0,
     limit: int = 10,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
-    reviews = db.query(ProductReview).filter(
-        ProductReview.product_id == product_id
-    ).order_by(desc(ProductReview.created_at)).offset(skip).limit(limit).all()
+    reviews = (await db.scalars(
+        select(ProductReview).options(selectinload(ProductReview.user)).filter(
+            ProductReview.product_id == product_id
+        ).order_by(desc(ProductReview.created_at)).offset(skip).limit(limit)
+    )).all()
     
-    total = db.query(func.count(ProductReview.id)).filter(
+    total = await db.scalar(select(func.count(ProductReview.id)).filter(
         ProductReview.product_id == product_id
-    ).scalar()
+    ))
     
-    avg_rating = db.query(func.avg(ProductReview.rating)).filter(
+    avg_rating = await db.scalar(select(func.avg(ProductReview.rating)).filter(
         ProductReview.product_id == product_id
-    ).scalar()
+    ))
     
     return {
         "reviews": [
@@ -158,24 +170,24 @@ async def get_product_reviews(
 @router.post("/{product_id}/wishlist")
 async def toggle_wishlist(
     product_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     # Check if product exists
-    product = db.query(Product).filter(Product.id == product_id).first()
+    product = await db.get(Product, product_id)
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
     
     if product.user_id == current_user.id:
         raise HTTPException(status_code=404, detail="Sorry, you cannot review your own product!")
 
-    existing_wishlist = db.query(ProductWishlist).filter(
+    existing_wishlist = (await db.scalars(select(ProductWishlist).filter(
         ProductWishlist.user_id == current_user.id,
         ProductWishlist.product_id == product_id
-    ).first()
+    ))).first()
     
     if existing_wishlist:
-        db.delete(existing_wishlist)
+        await db.delete(existing_wishlist)
         action = "removed from"
     else:
         new_wishlist = ProductWishlist(
@@ -185,23 +197,23 @@ async def toggle_wishlist(
         db.add(new_wishlist)
         action = "added to"
     
-    db.commit()
+    await db.commit()
     return {"message": f"Product {action} wishlist"}
 
 @router.get("/{product_id}/wishlist-count")
 async def get_wishlist_count(
     product_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_optional_current_user),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: User = Depends(get_optional_current_user_async),
 ):
-    count = db.query(func.count(ProductWishlist.id)).filter(
+    count = await db.scalar(select(func.count(ProductWishlist.id)).filter(
         ProductWishlist.product_id == product_id
-    ).scalar()
+    ))
 
-    existing_wishlist = db.query(ProductWishlist).filter(
+    existing_wishlist = (await db.scalars(select(ProductWishlist).filter(
         ProductWishlist.user_id == current_user.id,
         ProductWishlist.product_id == product_id
-    ).first()
+    ))).first()
     
     if existing_wishlist:
         return {"count": count, "wishlisted_by_current_user": True}
@@ -211,11 +223,11 @@ async def get_wishlist_count(
 @router.post("/{product_id}/view")
 async def record_product_view(
     product_id: int,
-    current_user: Optional[User] = Depends(get_optional_current_user),
-    db: Session = Depends(get_db)
+    current_user: Optional[User] = Depends(get_optional_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     # Check if product exists
-    product = db.query(Product).filter(Product.id == product_id).first()
+    product = await db.get(Product, product_id)
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
     
@@ -224,42 +236,42 @@ async def record_product_view(
         user_id=current_user.id if current_user else None
     )
     db.add(new_view)
-    db.commit()
+    await db.commit()
     return {"message": "View recorded"}
 
 @router.get("/{product_id}/stats")
-@cache_response(expire=3600)
+@cache_response(expire=3600, namespace=CacheNamespace.MARKETPLACE)
 async def get_product_stats(
     product_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_optional_current_user),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: User = Depends(get_optional_current_user_async),
 ):
     # Get view count
-    view_count = db.query(func.count(ProductView.id)).filter(
+    view_count = await db.scalar(select(func.count(ProductView.id)).filter(
         ProductView.product_id == product_id
-    ).scalar()
+    ))
     
     # Get average rating
-    avg_rating = db.query(func.avg(ProductReview.rating)).filter(
+    avg_rating = await db.scalar(select(func.avg(ProductReview.rating)).filter(
         ProductReview.product_id == product_id
-    ).scalar()
+    ))
     
     # Get review count
-    review_count = db.query(func.count(ProductReview.id)).filter(
+    review_count = await db.scalar(select(func.count(ProductReview.id)).filter(
         ProductReview.product_id == product_id
-    ).scalar()
+    ))
     
     # Get wishlist count
-    wishlist_count = db.query(func.count(ProductWishlist.id)).filter(
+    wishlist_count = await db.scalar(select(func.count(ProductWishlist.id)).filter(
         ProductWishlist.product_id == product_id
-    ).scalar()
+    ))
 
     existing_current_user_wishlist = None
     if current_user:
-        existing_current_user_wishlist = db.query(ProductWishlist).filter(
+        existing_current_user_wishlist = (await db.scalars(select(ProductWishlist).filter(
             ProductWishlist.user_id == current_user.id,
             ProductWishlist.product_id == product_id
-        ).first()
+        ))).first()
     
     return {
         "views": view_count,
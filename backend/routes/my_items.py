@@ -1,5 +1,4 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import desc, func
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
 from typing import Optional, List
@@ -9,6 +8,9 @@ from sql_database import get_db
 from models import User, Order, OrderItem, Product, ProductReview, ProductWishlist
 from .auth import get_current_user
 from utils.helper_functions import serialize_datetime
+from utils.eager_loading import BUYER_ORDER_OPTIONS, REVIEW_OPTIONS, WISHLIST_OPTIONS
+from utils.pagination import keyset_paginate, keyset_page
+from config import PAGE_SIZE_DEFAULT, PAGE_SIZE_MAX
 
 router = APIRouter()
 
@@ -25,8 +27,8 @@ async def get_my_orders(
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None,
     search: Optional[str] = None,
-    page: int = Query(1, gt=0),
-    limit: int = Query(10, gt=0),
+    cursor: Optional[str] = None,
+    limit: int = Query(PAGE_SIZE_DEFAULT, gt=0, le=PAGE_SIZE_MAX),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -42,57 +44,39 @@ async def get_my_orders(
     if end_date:
         query = query.filter(Order.created_at <= end_date)
     
-    # Apply category and search filters through join with OrderItem and Product
-    if category or search:
-        query = query.join(OrderItem).join(Product)
-        if category:
-            query = query.filter(Product.category == category)
-        if search:
-            query = query.filter(Product.name.ilike(f"%{search}%"))
-    
-    # Get total count before pagination
-    total_count = query.count()
-    
-    # Apply pagination
-    query = query.order_by(desc(Order.created_at))\
-                 .offset((page - 1) * limit)\
-                 .limit(limit)
+    # Apply category and search filters through the order's items; EXISTS keeps one row per order
+    if category:
+        query = query.filter(Order.items.any(OrderItem.product.has(Product.category == category)))
+    if search:
+        query = query.filter(Order.items.any(OrderItem.product.has(Product.name.ilike(f"%{search}%"))))
     
-    orders = query.all()
+    orders = keyset_paginate(query.options(*BUYER_ORDER_OPTIONS), Order, cursor, limit).all()
     
-    return {
+    return keyset_page(orders, limit, lambda order: {
+        "id": order.id,
+        "status": order.status.value,
+        "total_amount": order.total_amount,
+        "created_at": serialize_datetime(order.created_at),
         "items": [
             {
-                "id": order.id,
-                "status": order.status.value,
-                "total_amount": order.total_amount,
-                "created_at": serialize_datetime(order.created_at),
-                "items": [
-                    {
-                        "id": item.product.id,
-                        "name": item.product.name,
-                        "quantity": item.quantity,
-                        "price": item.price,
-                        "category": item.product.category,
-                        "images": [img.image_url for img in item.product.images],
-                    }
-                    for item in order.items
-                ]
+                "id": item.product.id,
+                "name": item.product.name,
+                "quantity": item.quantity,
+                "price": item.price,
+                "category": item.product.category,
+                "images": [img.image_url for img in item.product.images],
             }
-            for order in orders
-        ],
-        "total": total_count,
-        "page": page,
-        "pages": (total_count + limit - 1) // limit
-    }
+            for item in order.items
+        ]
+    })
 
 @router.get("/reviews")
 async def get_my_reviews(
     search: Optional[str] = None,
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None,
-    page: int = Query(1, gt=0),
-    limit: int = Query(10, gt=0),
+    cursor: Optional[str] = None,
+    limit: int = Query(PAGE_SIZE_DEFAULT, gt=0, le=PAGE_SIZE_MAX),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -108,45 +92,29 @@ async def get_my_reviews(
     if search:
         query = query.join(Product).filter(Product.name.ilike(f"%{search}%"))
     
-    # Get total count before pagination
-    total_count = query.count()
-    
-    # Apply pagination
-    query = query.order_by(desc(ProductReview.created_at))\
-                 .offset((page - 1) * limit)\
-                 .limit(limit)
-    
-    reviews = query.all()
-    
-    return {
-        "items": [
-            {
-                "id": review.id,
-                "product": {
-                    "id": review.product.id,
-                    "name": review.product.name,
-                    "price": review.product.price,
-                    "category": review.product.category,
-                    "images": [img.image_url for img in review.product.images],
-                },
-                "rating": review.rating,
-                "review_text": review.review_text,
-                "created_at": serialize_datetime(review.created_at)
-            }
-            for review in reviews
-        ],
-        "total": total_count,
-        "page": page,
-        "pages": (total_count + limit - 1) // limit
-    }
+    reviews = keyset_paginate(query.options(*REVIEW_OPTIONS), ProductReview, cursor, limit).all()
+    
+    return keyset_page(reviews, limit, lambda review: {
+        "id": review.id,
+        "product": {
+            "id": review.product.id,
+            "name": review.product.name,
+            "price": review.product.price,
+            "category": review.product.category,
+            "images": [img.image_url for img in review.product.images],
+        },
+        "rating": review.rating,
+        "review_text": review.review_text,
+        "created_at": serialize_datetime(review.created_at)
+    })
 
 @router.get("/wishlist")
 async def get_my_wishlist(
     search: Optional[str] = None,
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None,
-    page: int = Query(1, gt=0),
-    limit: int = Query(10, gt=0),
+    cursor: Optional[str] = None,
+    limit: int = Query(PAGE_SIZE_DEFAULT, gt=0, le=PAGE_SIZE_MAX),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -162,32 +130,16 @@ async def get_my_wishlist(
     if search:
         query = query.join(Product).filter(Product.name.ilike(f"%{search}%"))
     
-    # Get total count before pagination
-    total_count = query.count()
-    
-    # Apply pagination
-    query = query.order_by(desc(ProductWishlist.created_at))\
-                 .offset((page - 1) * limit)\
-                 .limit(limit)
-    
-    wishlist_items = query.all()
-    
-    return {
-        "items": [
-            {
-                "id": item.id,
-                "product": {
-                    "id": item.product.id,
-                    "name": item.product.name,
-                    "price": item.product.price,
-                    "category": item.product.category,
-                    "images": [img.image_url for img in item.product.images],
-                },
-                "created_at": serialize_datetime(item.created_at)
-            }
-            for item in wishlist_items
-        ],
-        "total": total_count,
-        "page": page,
-        "pages": (total_count + limit - 1) // limit
-    }
\ No newline at end of file
+    wishlist_items = keyset_paginate(query.options(*WISHLIST_OPTIONS), ProductWishlist, cursor, limit).all()
+    
+    return keyset_page(wishlist_items, limit, lambda item: {
+        "id": item.id,
+        "product": {
+            "id": item.product.id,
+            "name": item.product.name,
+            "price": item.product.price,
+            "category": item.product.category,
+            "images": [img.image_url for img in item.product.images],
+        },
+        "created_at": serialize_datetime(item.created_at)
+    })
\ No newline at end of file
@@ -1,7 +1,6 @@
 # notifications.py
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import desc
 from typing import List, Optional, Dict
 from datetime import datetime
 from models import Notification, NotificationType, User
@@ -10,6 +9,9 @@ from routes.auth import get_current_user
 from pydantic import BaseModel
 from utils.cache_constants import CACHE_KEYS
 from utils.cache_decorators import cache_response, CacheNamespace, invalidate_cache
+from utils.pagination import keyset_paginate, keyset_page
+from utils.read_replica import get_read_db
+from config import PAGE_SIZE_DEFAULT, PAGE_SIZE_MAX
 
 router = APIRouter()
 
@@ -23,6 +25,11 @@ class NotificationRead(BaseModel):
     reference_type: Optional[str]
     notification_metadata: Optional[Dict] = None
 
+class NotificationPage(BaseModel):
+    items: List[NotificationRead]
+    next_cursor: Optional[str] = None
+    unread_count: int = 0  # across all pages, for the badge
+
 class NotificationCreate(BaseModel):
     user_id: int
     type: str
@@ -53,19 +60,18 @@ async def create_notification(
     db.refresh(notification)
     return notification
 
-@router.get("/get_notifications", response_model=List[NotificationRead])
-@cache_response(expire=300)
+@router.get("/get_notifications", response_model=NotificationPage)
+@cache_response(expire=300, key=CACHE_KEYS["user_notifications"])
 async def get_notifications(
     unread_only: bool = False,
     user_view: Optional[str] = None,
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = None,
+    limit: int = Query(PAGE_SIZE_DEFAULT, gt=0, le=PAGE_SIZE_MAX),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Get all notifications for the current user"""
+    """Get the current user's notifications, newest first, one page at a time"""
     query = db.query(Notification).filter(Notification.user_id == current_user.id)
-    
-    if unread_only:
-        query = query.filter(Notification.is_read == False)
 
     if user_view:
         # Filter based on user_view in notification_metadata
@@ -74,10 +80,14 @@ async def get_notifications(
             Notification.notification_metadata["user_view"].astext == user_view
         )
 
-    
-    
-    notifications = query.order_by(desc(Notification.created_at)).all()
-    return notifications
+    unread = query.filter(Notification.is_read == False)
+    if unread_only:
+        query = unread
+
+    notifications = keyset_paginate(query, Notification, cursor, limit).all()
+    page = keyset_page(notifications, limit)
+    page["unread_count"] = unread.count()
+    return page
 
 @router.post("/{notification_id}/mark-read")
 @invalidate_cache(
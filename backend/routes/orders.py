@@ -1,7 +1,6 @@
 # routes/orders.py
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import desc
 from typing import List, Optional, Dict, Literal
 from datetime import datetime
 from models import MarketplaceOrder, Order, OrderItem, User, Product, OrderStatus, StorefrontProduct, InvoiceRequest, InvoiceStatus, Payment
@@ -14,7 +13,9 @@ import logging
 from utils.cache_constants import CACHE_KEYS
 from utils.cache_decorators import cache_response, CacheNamespace, invalidate_cache
 from utils.helper_functions import serialize_datetime
-from config import CACHE_EXPIRATION_TIME
+from utils.eager_loading import MARKETPLACE_ORDER_OPTIONS, SELLER_ORDER_OPTIONS
+from utils.pagination import keyset_paginate, keyset_page
+from config import CACHE_EXPIRATION_TIME, PAGE_SIZE_DEFAULT, PAGE_SIZE_MAX
 
 router = APIRouter()
 
@@ -225,12 +226,12 @@ async def submit_marketplace_order(
         raise HTTPException(status_code=500, detail="Error processing order")
 
 @router.get("/marketplace/{marketplace_order_id}")
-@cache_response(expire=CACHE_EXPIRATION_TIME)
+@cache_response(expire=CACHE_EXPIRATION_TIME, key=lambda marketplace_order_id: CACHE_KEYS["marketplace_order"](marketplace_order_id))
 async def get_marketplace_order(
     marketplace_order_id: int,
     db: Session = Depends(get_db)
 ):
-    order = db.query(MarketplaceOrder).filter(
+    order = db.query(MarketplaceOrder).options(*MARKETPLACE_ORDER_OPTIONS).filter(
         MarketplaceOrder.id == marketplace_order_id
     ).first()
     
@@ -260,20 +261,22 @@ async def get_marketplace_order(
     }
 
 @router.get("/seller/list")
-@cache_response(expire=CACHE_EXPIRATION_TIME)
+@cache_response(expire=CACHE_EXPIRATION_TIME, key=CACHE_KEYS["user_orders"])
 async def get_seller_orders(
     status: Optional[OrderStatus] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(PAGE_SIZE_DEFAULT, gt=0, le=PAGE_SIZE_MAX),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    query = db.query(Order).filter(Order.seller_id == current_user.id)
+    query = db.query(Order).options(*SELLER_ORDER_OPTIONS).filter(Order.seller_id == current_user.id)
     
     if status:
         query = query.filter(Order.status == status)
     
-    orders = query.order_by(desc(Order.created_at)).all()
+    orders = keyset_paginate(query, Order, cursor, limit).all()
     
-    return [{
+    return keyset_page(orders, limit, lambda order: {
         "id": order.id,
         "marketplace_order_id": order.marketplace_order_id,
         "customer_name": order.customer_name,
@@ -289,7 +292,7 @@ async def get_seller_orders(
             "quantity": item.quantity,
             "price": item.price
         } for item in order.items]
-    } for order in orders]
+    })
 
 @router.put("/seller/{order_id}/fulfill")
 @invalidate_cache(
@@ -9,6 +9,7 @@ from pydantic import BaseModel
 from utils.cache_constants import CACHE_KEYS
 from utils.cache_decorators import cache_response, CacheNamespace, invalidate_cache
 from utils.helper_functions import serialize_datetime
+from utils.eager_loading import SELLER_PAYOUT_OPTIONS
 from config import CACHE_EXPIRATION_TIME
 
 router = APIRouter()
@@ -54,7 +55,12 @@ async def get_user_payouts(
     current_user: User = Depends(get_current_user)
 ):
     """Get all payouts for the current user with optional status filter"""
-    query = db.query(Payout).join(Payout.order).filter(Payout.seller_id == current_user.id)
+    query = (
+        db.query(Payout)
+        .join(Payout.order)
+        .options(*SELLER_PAYOUT_OPTIONS)
+        .filter(Payout.seller_id == current_user.id)
+    )
     
     if status and status.upper() in ['PENDING', 'PAID']:
         query = query.filter(Payout.status == status.upper())
@@ -83,7 +83,7 @@ async def create_restock_request(
     return new_request
 
 @router.get("/requests", response_model=List[RestockRequestResponse])
-@cache_response(expire=1800)  # 30 minute cache
+@cache_response(expire=1800, key=CACHE_KEYS["restock_requests"])  # 30 minute cache
 async def get_restock_requests(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -92,7 +92,7 @@ async def get_restock_requests(
     return requests
 
 @router.get("/requests/{request_id}", response_model=RestockRequestResponse)
-@cache_response(expire=1800)  # 30 minute cache
+@cache_response(expire=1800, key=CACHE_KEYS["restock_detail"])  # 30 minute cache
 async def get_restock_request(
     request_id: int,
     current_user: User = Depends(get_current_user),
@@ -8,6 +8,7 @@ from typing import List
 from pydantic import BaseModel
 from utils.cache_constants import CACHE_KEYS
 from utils.cache_decorators import cache_response, CacheNamespace, invalidate_cache
+from utils.eager_loading import STOREFRONT_PRODUCT_OPTIONS
 
 router = APIRouter()
 
@@ -19,13 +20,14 @@ class StorefrontProductUpdate(BaseModel):
     storefront_price: float
 
 @router.get("/get_products")
-@cache_response(expire=3600)  # 1 hour cache
+@cache_response(expire=3600, key=CACHE_KEYS["store_products"])  # 1 hour cache
 async def get_storefront_products(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     storefront_products = (
         db.query(StorefrontProduct)
+        .options(*STOREFRONT_PRODUCT_OPTIONS)
         .filter_by(user_id=current_user.id)
         .all()
     )
@@ -51,7 +53,9 @@ async def get_storefront_products(
     user_id_arg='current_user',
     custom_keys=[
         lambda result: CACHE_KEYS["store_products"](result["user_id"]) if isinstance(result, dict) else (result.user_id),
-        lambda result: CACHE_KEYS["user_products"](result["user_id"]) if isinstance(result, dict) else (result.user_id)
+        lambda result: CACHE_KEYS["user_products"](result["user_id"]) if isinstance(result, dict) else (result.user_id),
+        lambda _: CACHE_KEYS["marketplace_products"](),
+        lambda _: CACHE_KEYS["marketplace_stores"]()
     ]
 )
 async def add_to_storefront(
@@ -96,7 +100,9 @@ async def add_to_storefront(
     namespaces=[CacheNamespace.STOREFRONT],
     user_id_arg='current_user',
     custom_keys=[
-        lambda result: CACHE_KEYS["store_products"](result["user_id"]) if isinstance(result, dict) else (result.user_id)
+        lambda result: CACHE_KEYS["store_products"](result["user_id"]) if isinstance(result, dict) else (result.user_id),
+        lambda _: CACHE_KEYS["marketplace_products"](),
+        lambda _: CACHE_KEYS["marketplace_stores"]()
     ]
 )
 async def update_storefront_product(
@@ -123,7 +129,7 @@ async def update_storefront_product(
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/storefront_preview/{user_id}")
-@cache_response(expire=1800)  # 30 minute cache for public preview
+@cache_response(expire=1800, key=CACHE_KEYS["store_products"])  # 30 minute cache for public preview
 async def get_storefront_preview(
     user_id: int,
     db: Session = Depends(get_db)
@@ -134,6 +140,7 @@ async def get_storefront_preview(
     
     storefront_products = (
         db.query(StorefrontProduct)
+        .options(*STOREFRONT_PRODUCT_OPTIONS)
         .filter_by(user_id=user_id)
         .all()
     )
@@ -164,7 +171,9 @@ async def get_storefront_preview(
     user_id_arg='current_user',
     custom_keys=[
         lambda result: CACHE_KEYS["store_products"](result["user_id"]) if isinstance(result, dict) else (result.user_id),
-        lambda result: CACHE_KEYS["user_products"](result["user_id"]) if isinstance(result, dict) else None(result.user_id)
+        lambda result: CACHE_KEYS["user_products"](result["user_id"]) if isinstance(result, dict) else None(result.user_id),
+        lambda _: CACHE_KEYS["marketplace_products"](),
+        lambda _: CACHE_KEYS["marketplace_stores"]()
     ]
 )
 async def remove_from_storefront(
@@ -193,7 +202,8 @@ async def remove_from_storefront(
     namespaces=[CacheNamespace.STOREFRONT],
     user_id_arg='current_user',
     custom_keys=[
-        lambda result: CACHE_KEYS["store_settings"](result["user_id"]) if isinstance(result, dict) else (result.user_id)
+        lambda result: CACHE_KEYS["store_settings"](result["user_id"]) if isinstance(result, dict) else (result.user_id),
+        lambda _: CACHE_KEYS["marketplace_stores"]()
     ]
 )
 async def update_store_details(
@@ -219,7 +229,7 @@ async def update_store_details(
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/get_store_details")
-@cache_response(expire=3600)  # 1 hour cache
+@cache_response(expire=3600, key=CACHE_KEYS["store_settings"])  # 1 hour cache
 async def get_store_details(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -0,0 +1,30 @@
+# tests/conftest.py
+import asyncio
+import os
+import tempfile
+import pytest
+import support
+
+DATABASE_PATH = os.path.join(tempfile.mkdtemp(prefix="myaje-tests-"), "test.db")
+support.configure(DATABASE_PATH)
+
+import config
+from sql_database import engine
+from models import Base
+
+@pytest.fixture
+def database_path():
+    return DATABASE_PATH
+
+@pytest.fixture
+def tables():
+    """Fresh tables for the test"""
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    yield
+    engine.dispose()
+
+@pytest.fixture(autouse=True)
+def empty_redis():
+    asyncio.run(config.REDIS_ASYNC_CLIENT.flushall())
+    yield
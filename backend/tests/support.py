@@ -0,0 +1,61 @@
+# tests/support.py
+import os
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# A scratch PostgreSQL database (its tables are dropped) for the tests SQLite can't stand in for
+TEST_POSTGRES_URL = os.getenv("TEST_POSTGRES_URL")
+
+def configure(database: str) -> None:
+    """
+    Point the app at a database (a SQLite file path, or a PostgreSQL URL) and an in-memory Redis.
+    Must run before anything imports the database or cache modules; worker processes spawned by
+    tests call it too.
+    """
+    sqlite = "://" not in database
+    os.environ["DB_STATEMENT_TIMEOUT_MS"] = "0"
+    os.environ["ASYNC_DATABASE_URL"] = (f"sqlite+aiosqlite:///{database}" if sqlite
+                                        else database.replace("postgresql://", "postgresql+asyncpg://", 1))
+    if BACKEND_DIR not in sys.path:
+        sys.path.insert(0, BACKEND_DIR)
+
+    import fakeredis
+    import config
+    config.SQLALCHEMY_DATABASE_URL = f"sqlite:///{database}" if sqlite else database
+    config.REDIS_ASYNC_CLIENT = fakeredis.FakeAsyncRedis()
+    if not sqlite:
+        return
+
+    # The PostgreSQL-only column types the models use, as their SQLite equivalents
+    from sqlalchemy.dialects.postgresql import JSONB
+    from sqlalchemy.ext.compiler import compiles
+
+    @compiles(JSONB, "sqlite")
+    def _jsonb_as_json(type_, compiler, **kw):
+        return "JSON"
+
+    from sqlalchemy import event
+    from sql_database import engine
+
+    @event.listens_for(engine, "connect")
+    def _wait_for_writers(dbapi_connection, connection_record):
+        # SQLite has one writer at a time: wait for it like PostgreSQL waits for row locks
+        dbapi_connection.execute("PRAGMA busy_timeout = 30000")
+        dbapi_connection.execute("PRAGMA journal_mode = WAL")
+
+def run_due_automations_in_process(database: str, automation_ids, barrier) -> None:
+    """Entry point of a spawned process: run the automations once every process is ready"""
+    configure(database)
+    import asyncio
+    from banking_automations.automation_processor import run_due_automations
+    barrier.wait()
+    asyncio.run(run_due_automations(automation_ids))
+
+def record_metrics_in_process(database_path: str, checked_out: int) -> None:
+    """Entry point of a spawned worker: serve one cache hit while holding `checked_out` connections"""
+    configure(database_path)
+    from utils.cache_metrics import CACHE_RESPONSES
+    from utils.db_pool import DB_POOL_CHECKED_OUT
+    CACHE_RESPONSES.labels("dashboard", "hit").inc()
+    DB_POOL_CHECKED_OUT.labels("sync").inc(checked_out)
@@ -0,0 +1,77 @@
+# tests/test_async_route_concurrency.py
+"""
+Throughput of an AsyncSession route as concurrent requests grow. Needs a scratch PostgreSQL
+database in TEST_POSTGRES_URL (its tables are dropped afterwards): SQLite runs one statement at
+a time, so there is no concurrency to measure and the benchmark is skipped there.
+"""
+import asyncio
+import os
+import time
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+from models import (Base, Order, OrderStatus, Product, ProductReview, ProductView, ProductWishlist, User)
+from routes.auth import _load_user_async
+from routes.dashboard import get_dashboard_metrics
+from utils.db_pool import async_engine_options
+
+POSTGRES_URL = os.getenv("TEST_POSTGRES_URL")
+POSTGRES_ASYNC_URL = os.getenv("TEST_POSTGRES_ASYNC_URL", POSTGRES_URL and POSTGRES_URL.replace("postgresql://", "postgresql+asyncpg://", 1))
+REQUESTS = 400
+
+pytestmark = pytest.mark.skipif(not POSTGRES_URL, reason="TEST_POSTGRES_URL is not set")
+
+def seed(engine) -> int:
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        buyer = User(email="buyer@example.com", password="x")
+        seller = User(email="seller@example.com", password="x")
+        db.add_all([buyer, seller])
+        db.flush()
+        for n in range(200):
+            product = Product(owner=seller, name=f"p{n}", sku=f"s{n}", price=1, quantity=n % 7)
+            db.add_all([product, ProductView(product=product, user_id=buyer.id),
+                        ProductWishlist(product=product, user_id=buyer.id),
+                        ProductReview(product=product, user_id=buyer.id, rating=4),
+                        Order(seller_id=seller.id, buyer_id=buyer.id, status=OrderStatus.fulfilled, total_amount=1)])
+        db.commit()
+        return buyer.id
+
+async def requests_per_second(sessions: async_sessionmaker, user_id: int, concurrency: int) -> float:
+    """Serve REQUESTS personal dashboards, `concurrency` at a time, as the route would (cache bypassed)"""
+    pending = iter(range(REQUESTS))
+
+    async def client():
+        for _ in pending:
+            async with sessions() as db:
+                user = await _load_user_async(db, user_id)
+                await get_dashboard_metrics.__wrapped__(active_view="personal", db=db, current_user=user)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return REQUESTS / (time.perf_counter() - started)
+
+def test_async_route_throughput_scales_with_concurrency():
+    engine = create_engine(POSTGRES_URL)
+    user_id = seed(engine)
+
+    async def benchmark():
+        async_engine = create_async_engine(POSTGRES_ASYNC_URL, **async_engine_options())
+        sessions = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+        try:
+            await requests_per_second(sessions, user_id, 4)  # warm the pool
+            return {concurrency: await requests_per_second(sessions, user_id, concurrency)
+                    for concurrency in (1, 4, 16)}
+        finally:
+            await async_engine.dispose()
+
+    try:
+        throughput = asyncio.run(benchmark())
+    finally:
+        Base.metadata.drop_all(engine)
+        engine.dispose()
+    print("personal dashboard requests/sec by concurrency:", {c: round(rps) for c, rps in throughput.items()})
+    # A route blocking the event loop serves one request at a time however many are waiting
+    assert throughput[16] > 1.5 * throughput[1]
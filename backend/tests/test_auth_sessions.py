@@ -0,0 +1,83 @@
+# tests/test_auth_sessions.py
+import asyncio
+from contextlib import contextmanager
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event, select
+from sqlalchemy.orm import selectinload
+from sqlalchemy.exc import InvalidRequestError
+import config
+from app import app
+from models import Product, User
+from routes.auth import create_access_token
+from sql_database import SessionLocal, AsyncSessionLocal, engine, async_engine
+from utils.redis_cache import ModelSerializer
+
+@contextmanager
+def connections_held():
+    """Track the most pooled connections held at once, across the sync and async engines"""
+    held = {"now": 0, "peak": 0}
+    def checkout(*args):
+        held["now"] += 1
+        held["peak"] = max(held["peak"], held["now"])
+    def checkin(*args):
+        held["now"] -= 1
+    pools = (engine.pool, async_engine.sync_engine.pool)
+    for pool in pools:
+        event.listen(pool, "checkout", checkout)
+        event.listen(pool, "checkin", checkin)
+    try:
+        yield held
+    finally:
+        for pool in pools:
+            event.remove(pool, "checkout", checkout)
+            event.remove(pool, "checkin", checkin)
+
+@pytest.fixture
+def user_token(tables):
+    db = SessionLocal()
+    user = User(email="user@example.com", password="x")
+    db.add(user)
+    db.commit()
+    token = create_access_token({"user_id": user.id})
+    db.close()
+    return token
+
+@pytest.mark.parametrize("path", [
+    "/notifications/get_notifications",  # get_db with get_current_user
+    "/dashboard/metrics?active_view=personal",  # AsyncSession with get_current_user_async
+])
+def test_authenticated_request_holds_one_connection(user_token, monkeypatch, path):
+    monkeypatch.setattr(app.router, "on_startup", [])
+    with TestClient(app) as client:
+        with connections_held() as held:
+            response = client.get(config.BASE_API_PREFIX + path, headers={"Authorization": f"Bearer {user_token}"})
+    asyncio.run(async_engine.dispose())
+    assert response.status_code == 200, response.text
+    assert held["peak"] == 1
+
+def test_bad_token_is_rejected(tables, monkeypatch):
+    monkeypatch.setattr(app.router, "on_startup", [])
+    with TestClient(app) as client:
+        response = client.get(config.BASE_API_PREFIX + "/dashboard/metrics?active_view=personal",
+                              headers={"Authorization": "Bearer nonsense"})
+    assert response.status_code == 401
+
+def test_serializer_refuses_lazy_loads_on_async_objects(tables):
+    db = SessionLocal()
+    user = User(email="seller@example.com", password="x")
+    db.add(Product(owner=user, name="p", sku="s", price=1))
+    db.commit()
+    db.close()
+
+    async def scenario():
+        try:
+            async with AsyncSessionLocal() as session:
+                # Images are embedded in full and loaded; the latest restock request is fetched
+                # on demand, which an async session can't do from inside the serializer
+                product = (await session.scalars(select(Product).options(selectinload(Product.images)))).one()
+                with pytest.raises(InvalidRequestError, match="Product.restock_requests"):
+                    ModelSerializer._serialize_model(product)
+        finally:
+            await async_engine.dispose()
+    asyncio.run(scenario())
@@ -0,0 +1,106 @@
+# tests/test_automation_claiming.py
+import multiprocessing
+from collections import Counter
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import create_engine, func
+from sqlalchemy.orm import sessionmaker
+import support
+from models import (Base, User, BankAccount, AccountType, FinancialPool, BankingAutomation, AutomationType,
+                    AutomationSchedule, AutomationScheduleDetails, AutomationRun, Payment)
+from sql_database import SessionLocal
+
+PROCESSES = 3
+AUTOMATIONS_PER_TYPE = 40
+AMOUNT = 5.0
+
+def _account(db, user, number):
+    account = BankAccount(user_id=user.id, account_type=AccountType.PERSONAL, account_name="Main",
+                          account_number=number, bank_name="BAM", balance=10_000.0)
+    db.add(account)
+    db.flush()
+    pools = [FinancialPool(user_id=user.id, bank_account_id=account.id, name=name, percentage=50,
+                           balance=5_000.0, is_credit_pool=name == "Credit")
+             for name in ("Credit", "Savings")]
+    db.add_all(pools)
+    db.flush()
+    return account, pools
+
+def _create_due_automations(db):
+    sender = User(email="sender@example.com", password="x")
+    recipient = User(email="recipient@example.com", password="x")
+    db.add_all([sender, recipient])
+    db.flush()
+    account, (credit, savings) = _account(db, sender, "0000000001")
+    recipient_account, _ = _account(db, recipient, "0000000002")
+
+    due = datetime.utcnow() - timedelta(minutes=1)
+    automations = []
+    for i in range(AUTOMATIONS_PER_TYPE):
+        automations.append(BankingAutomation(
+            user_id=sender.id, bank_account_id=account.id, name=f"Save {i}", type=AutomationType.POOL_TRANSFER,
+            schedule=AutomationSchedule.DAILY, amount=AMOUNT, source_pool_id=credit.id,
+            destination_pool_id=savings.id, next_run=due
+        ))
+        automations.append(BankingAutomation(
+            user_id=sender.id, bank_account_id=account.id, name=f"Send {i}", type=AutomationType.TRANSFER,
+            schedule=AutomationSchedule.DAILY, amount=AMOUNT, source_pool_id=credit.id,
+            destination_bam_account_id=recipient_account.id, next_run=due
+        ))
+    db.add_all(automations)
+    db.flush()
+    db.add_all([AutomationScheduleDetails(automation_id=automation.id) for automation in automations])
+    db.commit()
+    return [automation.id for automation in automations], due
+
+@pytest.fixture(params=["sqlite", "postgresql"])
+def shared_database(request, database_path):
+    """
+    The database the processes share, and a session factory on it.
+
+    SQLite has no row locks: FOR UPDATE SKIP LOCKED compiles to nothing there and a writer locks
+    the whole file, so that run only shows the AutomationRun claims keeping the processes apart.
+    SKIP LOCKED itself is only exercised on PostgreSQL, with TEST_POSTGRES_URL set.
+    """
+    if request.param == "sqlite":
+        request.getfixturevalue("tables")
+        yield database_path, SessionLocal
+        return
+
+    if not support.TEST_POSTGRES_URL:
+        pytest.skip("TEST_POSTGRES_URL is not set")
+    engine = create_engine(support.TEST_POSTGRES_URL)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    try:
+        yield support.TEST_POSTGRES_URL, sessionmaker(bind=engine)
+    finally:
+        Base.metadata.drop_all(engine)
+        engine.dispose()
+
+def test_concurrent_processes_run_each_automation_once(shared_database):
+    database, session_factory = shared_database
+    db = session_factory()
+    automation_ids, scheduled_run = _create_due_automations(db)
+
+    context = multiprocessing.get_context("spawn")
+    barrier = context.Barrier(PROCESSES)
+    processes = [
+        context.Process(target=support.run_due_automations_in_process, args=(database, automation_ids, barrier))
+        for _ in range(PROCESSES)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(timeout=120)
+        assert process.exitcode == 0
+
+    runs = Counter(db.query(AutomationRun.automation_id, AutomationRun.scheduled_run))
+    assert runs == Counter({(automation_id, scheduled_run): 1 for automation_id in automation_ids})
+
+    payments = db.query(func.count(Payment.id), func.sum(Payment.amount)).one()
+    assert payments == (len(automation_ids), AMOUNT * len(automation_ids))
+
+    automations = db.query(BankingAutomation).filter(BankingAutomation.id.in_(automation_ids)).all()
+    assert all(automation.next_run > scheduled_run for automation in automations)
+    db.close()
@@ -0,0 +1,49 @@
+# tests/test_automation_scheduler.py
+import asyncio
+import random
+from datetime import datetime, timedelta
+import config
+import banking_automations.scheduler as scheduler_module
+from banking_automations.scheduler import AutomationScheduler
+
+class FakeClock:
+    def __init__(self, now: datetime):
+        self.now = now
+
+    def __call__(self) -> datetime:
+        return self.now
+
+class FakeClockScheduler(AutomationScheduler):
+    """Sleeps by moving the fake clock forward instead of waiting"""
+
+    async def wait(self, timeout: float) -> None:
+        self.clock.now += timedelta(seconds=max(timeout, 0))
+        await asyncio.sleep(0)
+
+def test_100k_automations_fire_on_time(monkeypatch):
+    start = datetime(2026, 1, 1)
+    rng = random.Random(21)
+    due = {automation_id: start + timedelta(seconds=rng.randrange(3600)) for automation_id in range(100_000)}
+    fired = {}
+
+    # The database's view: each automation runs once, then is no longer active
+    monkeypatch.setattr(scheduler_module, "active_automation_runs",
+                        lambda: [(automation_id, next_run) for automation_id, next_run in due.items()
+                                 if automation_id not in fired])
+
+    clock = FakeClock(start)
+    scheduler = FakeClockScheduler(config.REDIS_ASYNC_CLIENT, clock)
+
+    async def run_due(automation_ids):
+        for automation_id in automation_ids:
+            assert automation_id not in fired, f"automation {automation_id} fired twice"
+            fired[automation_id] = clock()
+        if len(fired) == len(due):
+            scheduler.stop()
+        return dict.fromkeys(automation_ids)
+
+    asyncio.run(asyncio.wait_for(scheduler.run(run_due), timeout=300))
+
+    assert len(fired) == len(due)
+    late = [automation_id for automation_id, fired_at in fired.items() if fired_at != due[automation_id]]
+    assert not late, f"{len(late)} automations fired early or late, e.g. {late[:5]}"
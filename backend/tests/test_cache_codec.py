@@ -0,0 +1,103 @@
+# tests/test_cache_codec.py
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta
+import pytest
+import config
+from models import Product, ProductImage, Transaction, TransactionTag, TransactionType
+from utils.cache_codec import CODEC_IDS, COMPRESSION_IDS, CacheCodec, _available_codecs, _available_compressors, _default
+from utils.redis_cache import RedisCache
+
+CODECS = list(CODEC_IDS)
+COMPRESSIONS = list(COMPRESSION_IDS)
+
+def transactions(count: int = 1000) -> list:
+    """A /banking/transactions page worth of rows, as the cache stores them"""
+    start = datetime(2026, 1, 1)
+    return RedisCache.serialize([
+        Transaction(id=n, bank_account_id=1, type=TransactionType.CREDIT if n % 3 else TransactionType.DEBIT,
+                    amount=n * 1.25, description=f"Order #{n} settlement", reference=f"TX-{n:08d}",
+                    tag=TransactionTag.SALES, created_at=start + timedelta(minutes=n))
+        for n in range(count)
+    ])
+
+def catalog(count: int = 500) -> list:
+    """A marketplace catalog page with images, as the cache stores it"""
+    return RedisCache.serialize([
+        Product(id=n, user_id=n % 20, name=f"Product {n}", sku=f"SKU-{n}", price=9.99 + n, quantity=n % 40,
+                category="food", description="Fresh and locally sourced " * 4, created_at=datetime(2026, 1, 1),
+                images=[ProductImage(id=n * 2 + i, product_id=n, image_url=f"/uploaded_images/{n}-{i}.png")
+                        for i in range(2)])
+        for n in range(count)
+    ])
+
+def codec_or_skip(codec: str, compression: str = "none", threshold: int = 4096) -> CacheCodec:
+    if codec not in _available_codecs():
+        pytest.skip(f"{codec} is not installed")
+    if compression != "none" and compression not in _available_compressors():
+        pytest.skip(f"{compression} is not installed")
+    return CacheCodec(codec, compression, threshold)
+
+def as_json(value):
+    """What the stdlib json path made of a value, which every codec has to reproduce"""
+    return json.loads(json.dumps(value, default=_default))
+
+@pytest.mark.parametrize("compression", COMPRESSIONS)
+@pytest.mark.parametrize("codec", CODECS)
+def test_payloads_round_trip(codec, compression):
+    cache_codec = codec_or_skip(codec, compression, threshold=1024)
+    for value in (transactions(), catalog(), {"items": catalog(3), "next_cursor": None, "total": 3}, [], "x", 1.5):
+        payload = cache_codec.encode(value)
+        assert cache_codec.decode(payload) == as_json(value)
+        # Small payloads aren't worth compressing
+        compressed = len(payload) >= 1024 and compression != "none"
+        assert payload[0] == CODEC_IDS[codec] | (COMPRESSION_IDS[compression if compressed else "none"] << 2)
+
+@pytest.mark.parametrize("compression", COMPRESSIONS[1:])
+def test_compression_shrinks_large_payloads(compression):
+    plain, compressed = CacheCodec("json"), codec_or_skip("json", compression)
+    value = transactions()
+    assert len(compressed.encode(value)) < len(plain.encode(value)) / 3
+
+def test_any_worker_reads_any_codecs_payloads():
+    # Switching CACHE_CODEC doesn't need a flush: the header says how each entry was written
+    writers = [CacheCodec(codec) for codec in _available_codecs()]
+    value = catalog(20)
+    for writer in writers:
+        for reader in writers:
+            assert reader.decode(writer.encode(value)) == as_json(value)
+    # Entries written before the header existed are bare JSON text
+    assert writers[0].decode(json.dumps(value).encode()) == as_json(value)
+
+def test_cache_round_trip_through_redis():
+    cache = RedisCache(config.REDIS_ASYNC_CLIENT, local_cache=None, codec=codec_or_skip("orjson"))
+    value = {"items": transactions(50), "next_cursor": "abc"}
+
+    async def scenario():
+        stored = await cache.set("transaction:user:1:list", value)
+        return stored, await cache.get("transaction:user:1:list")
+
+    stored, cached = asyncio.run(scenario())
+    assert cached == stored == as_json(value)
+
+def test_encode_decode_cost_and_size():
+    """Microbenchmark of each installed codec against stdlib json (printed with pytest -s)"""
+    fixtures = {"transactions": transactions(), "catalog": catalog()}
+    results = {}
+    for name, value in fixtures.items():
+        for codec in _available_codecs():
+            cache_codec = CacheCodec(codec)
+            timings = []
+            for _ in range(20):
+                started = time.perf_counter()
+                payload = cache_codec.encode(value)
+                cache_codec.decode(payload)
+                timings.append(time.perf_counter() - started)
+            results[name, codec] = (min(timings) * 1000, len(payload))
+    for (name, codec), (ms, size) in results.items():
+        print(f"{name:>12} {codec:>8}: {ms:7.2f} ms encode+decode, {size:>8} bytes")
+
+    if "orjson" in _available_codecs():
+        for name in fixtures:
+            assert results[name, "orjson"][0] < results[name, "json"][0]
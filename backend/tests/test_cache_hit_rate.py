@@ -0,0 +1,47 @@
+# tests/test_cache_hit_rate.py
+import asyncio
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+import config
+from app import app
+from models import User
+from routes.auth import create_access_token
+from sql_database import SessionLocal
+from utils.cache_constants import CACHE_KEYS
+from utils.cache_manager import cache_manager
+
+NOTIFICATIONS = config.BASE_API_PREFIX + "/notifications/get_notifications"
+
+def responses(outcome: str) -> float:
+    return REGISTRY.get_sample_value("cache_responses_total", {"namespace": "notification", "outcome": outcome}) or 0
+
+def test_authenticated_responses_are_cached_per_user_and_parameters(tables, monkeypatch):
+    monkeypatch.setattr(app.router, "on_startup", [])
+    db = SessionLocal()
+    users = [User(email=f"user{n}@example.com", password="x") for n in range(2)]
+    db.add_all(users)
+    db.commit()
+    user_ids = [user.id for user in users]
+    db.close()
+    headers = [{"Authorization": f"Bearer {create_access_token({'user_id': user_id})}"} for user_id in user_ids]
+
+    outcomes = []
+    with TestClient(app) as client:
+        def get(user: int, **params) -> str:
+            before = {outcome: responses(outcome) for outcome in ("hit", "miss")}
+            assert client.get(NOTIFICATIONS, params=params, headers=headers[user]).status_code == 200
+            return next(outcome for outcome, count in before.items() if responses(outcome) > count)
+
+        # Every request opens its own session and loads its own User, yet repeats still hit
+        outcomes += [get(0), get(0), get(0)]
+        outcomes += [get(0, unread_only=True), get(0, unread_only=True)]
+        outcomes += [get(1), get(1)]
+
+        # The CACHE_KEYS entry the route is keyed on reaches every variant of it, for that user only
+        asyncio.run(cache_manager.invalidate_tag(CACHE_KEYS["user_notifications"](user_ids[0])))
+        outcomes += [get(0), get(0, unread_only=True), get(1)]
+
+    assert outcomes == ["miss", "hit", "hit",
+                        "miss", "hit",
+                        "miss", "hit",
+                        "miss", "miss", "hit"]
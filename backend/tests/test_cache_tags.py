@@ -0,0 +1,71 @@
+# tests/test_cache_tags.py
+import asyncio
+from types import SimpleNamespace
+import pytest
+import config
+import utils.redis_cache as redis_cache_module
+from utils.redis_cache import redis_cache
+from utils.cache_manager import cache_manager
+from utils.cache_constants import cache_tag_key
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Drive the expiry scores in the tag index from a settable clock"""
+    now = SimpleNamespace(value=1_000_000.0)
+    monkeypatch.setattr(redis_cache_module, "time", SimpleNamespace(time=lambda: now.value))
+    return now
+
+def test_set_prunes_expired_tag_members(clock):
+    async def scenario():
+        for i in range(50):
+            await redis_cache.set(f"account:user:1:id:{i}", {"id": i}, expire=60)
+        tag_key = cache_tag_key("account:user:1")
+        assert await config.REDIS_ASYNC_CLIENT.zcard(tag_key) == 50
+
+        clock.value += 61
+        await redis_cache.set("account:user:1:id:50", {"id": 50}, expire=60)
+        assert await config.REDIS_ASYNC_CLIENT.zcard(tag_key) == 1
+        assert await redis_cache.tag_members(tag_key) == ["account:user:1:id:50"]
+
+    asyncio.run(scenario())
+
+def test_invalidate_tag_skips_expired_members(clock):
+    async def scenario():
+        await redis_cache.set("account:user:2:id:1", {"id": 1}, expire=10)
+        await redis_cache.set("account:user:2:id:2", {"id": 2}, expire=100)
+
+        clock.value += 11
+        assert await redis_cache.tag_members(cache_tag_key("account:user:2")) == ["account:user:2:id:2"]
+        await cache_manager.invalidate_tag("account:user:2")
+        assert await config.REDIS_ASYNC_CLIENT.get("account:user:2:id:2") is None
+
+    asyncio.run(scenario())
+
+async def _fill(count: int, start: int = 0) -> None:
+    """Unrelated keys that a pattern scan would have to walk past"""
+    for offset in range(start, count, 10_000):
+        await config.REDIS_ASYNC_CLIENT.mset({f"product:id:{i}": b"x" for i in range(offset, min(offset + 10_000, count))})
+
+async def _invalidation_seconds(runs: int = 20) -> float:
+    """Median time to invalidate a tag of 100 keys"""
+    loop = asyncio.get_running_loop()
+    timings = []
+    for _ in range(runs):
+        for i in range(100):
+            await redis_cache.set(f"account:user:9:id:{i}", {"id": i}, expire=600)
+        started = loop.time()
+        await cache_manager.invalidate_tag("account:user:9")
+        timings.append(loop.time() - started)
+    return sorted(timings)[len(timings) // 2]
+
+def test_invalidation_latency_is_flat_in_keyspace_size():
+    async def scenario():
+        await _fill(10_000)
+        small = await _invalidation_seconds()
+        await _fill(1_000_000, start=10_000)
+        assert await config.REDIS_ASYNC_CLIENT.dbsize() > 1_000_000
+        large = await _invalidation_seconds()
+        # A KEYS/SCAN based invalidation grows ~100x here; the tag index doesn't grow at all
+        assert large < small * 3, (small, large)
+
+    asyncio.run(scenario())
@@ -0,0 +1,63 @@
+# tests/test_cache_write_through.py
+import asyncio
+from models import AccountType, BankAccount
+from utils.cache_constants import CACHE_KEYS
+from utils.cache_write_through import snapshot_account_change, write_through_account_change
+from utils.redis_cache import redis_cache
+
+USER_ID = 5
+ACCOUNTS_KEY = CACHE_KEYS["user_accounts"](USER_ID)
+
+def _change(version: int, balance: float) -> dict:
+    return {
+        "user_id": USER_ID, "account_id": 1, "account_type": AccountType.PERSONAL,
+        "version": version, "balance": balance, "pools": {10: balance},
+        "transactions": None, "transaction_row": None,
+        "outgoing_payments": None, "incoming_payments": None,
+    }
+
+async def _cache_accounts(version: int, balance: float) -> None:
+    account = {"id": 1, "version": version, "balance": balance, "pools": [{"id": 10, "balance": balance}]}
+    await redis_cache.set(ACCOUNTS_KEY, [account], tags=[ACCOUNTS_KEY])
+
+def test_snapshot_bumps_account_version():
+    account = BankAccount(id=1, user_id=USER_ID, account_type=AccountType.PERSONAL, balance=50.0, version=3)
+    change = snapshot_account_change(account)
+    assert account.version == 4
+    assert change["version"] == 4
+
+def test_patches_apply_in_version_order():
+    async def scenario():
+        await _cache_accounts(version=3, balance=100.0)
+        await write_through_account_change(_change(4, 80.0))
+        await write_through_account_change(_change(5, 60.0))
+        return await redis_cache.get(ACCOUNTS_KEY)
+
+    [account] = asyncio.run(scenario())
+    assert account["version"] == 5
+    assert account["balance"] == 60.0
+    assert account["pools"] == [{"id": 10, "balance": 60.0}]
+
+def test_late_patch_drops_newer_entry():
+    async def scenario():
+        await _cache_accounts(version=5, balance=60.0)
+        await write_through_account_change(_change(4, 80.0))
+        return await redis_cache.get(ACCOUNTS_KEY)
+
+    assert asyncio.run(scenario()) is None
+
+def test_patch_after_missed_change_drops_entry():
+    async def scenario():
+        await _cache_accounts(version=3, balance=100.0)
+        await write_through_account_change(_change(5, 60.0))
+        return await redis_cache.get(ACCOUNTS_KEY)
+
+    assert asyncio.run(scenario()) is None
+
+def test_unversioned_entry_is_dropped():
+    async def scenario():
+        await redis_cache.set(ACCOUNTS_KEY, [{"id": 1, "balance": 100.0, "pools": []}], tags=[ACCOUNTS_KEY])
+        await write_through_account_change(_change(1, 80.0))
+        return await redis_cache.get(ACCOUNTS_KEY)
+
+    assert asyncio.run(scenario()) is None
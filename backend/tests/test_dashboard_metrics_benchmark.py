@@ -0,0 +1,119 @@
+# tests/test_dashboard_metrics_benchmark.py
+"""
+Round trips and latency of the business dashboard on a seeded seller: the per-metric COUNT
+queries it used to run against the counters and single-aggregate queries it runs now (printed
+with pytest -s). DASHBOARD_BENCHMARK_ROWS sets the seller's products and orders; the default
+keeps the SQLite seed quick.
+"""
+import asyncio
+import os
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import event, func, insert
+from models import InvoiceRequest, InvoiceStatus, Order, OrderStatus, Product, User
+from sql_database import SessionLocal, AsyncSessionLocal, engine, async_engine
+from utils.metric_counters import _reconcile
+from utils.user_metrics_calculator import get_all_metrics
+
+ROWS = int(os.getenv("DASHBOARD_BENCHMARK_ROWS", 20_000))
+HISTORY_HOURS = 2 * 365 * 24  # the seller's rows are spread over two years
+INVOICE_STATUSES = [InvoiceStatus.pending, InvoiceStatus.sent, InvoiceStatus.paid, InvoiceStatus.overdue]
+
+def seed() -> int:
+    db = SessionLocal()
+    seller = User(email="seller@example.com", password="x")
+    db.add(seller)
+    db.commit()
+    now = datetime.utcnow()
+    # Bulk inserts skip the counter listeners; the reconciliation below builds the counters
+    db.execute(insert(Product), [
+        {"user_id": seller.id, "name": f"p{n}", "sku": f"s{n}", "price": 1, "quantity": n % 50,
+         "low_stock_threshold": 5, "category": f"c{n % 12}", "created_at": now - timedelta(hours=n % HISTORY_HOURS)}
+        for n in range(ROWS)
+    ])
+    db.execute(insert(Order), [
+        {"seller_id": seller.id, "status": list(OrderStatus)[n % 3], "total_amount": n % 100,
+         "created_at": now - timedelta(hours=n % HISTORY_HOURS), "updated_at": now - timedelta(hours=max(n % HISTORY_HOURS - 24, 0))}
+        for n in range(ROWS)
+    ])
+    order_ids = [order_id for (order_id,) in db.query(Order.id).filter(Order.seller_id == seller.id)]
+    db.execute(insert(InvoiceRequest), [
+        {"order_id": order_id, "customer_name": "c", "customer_email": "c@example.com", "shipping_address": "a",
+         "amount": 1, "items": [], "status": INVOICE_STATUSES[n % 4], "created_at": now - timedelta(hours=n * 10 % HISTORY_HOURS)}
+        for n, order_id in enumerate(order_ids[::10])
+    ])
+    db.commit()
+    seller_id = seller.id
+    db.close()
+    _reconcile()
+    return seller_id
+
+def per_metric_counts(db, user_id: int) -> dict:
+    """The business totals as they used to be computed: one COUNT or SUM round trip each"""
+    now = datetime.utcnow()
+    start_of_month = datetime(now.year, now.month, 1)
+    start_of_prev_month = (start_of_month - timedelta(days=1)).replace(day=1)
+    products = db.query(Product).filter(Product.user_id == user_id)
+    orders = db.query(Order).filter(Order.seller_id == user_id)
+    invoices = db.query(InvoiceRequest).join(Order, InvoiceRequest.order_id == Order.id).filter(Order.seller_id == user_id)
+    gmv = db.query(func.sum(Order.total_amount)).filter(Order.seller_id == user_id, Order.status != OrderStatus.cancelled)
+    return {
+        "total_items": products.count(),
+        "low_stock": products.filter(Product.quantity <= Product.low_stock_threshold).count(),
+        "out_of_stock": products.filter(Product.quantity == 0).count(),
+        "categories": db.query(Product.category).filter(Product.user_id == user_id, Product.category != None).distinct().count(),
+        "new_orders": orders.filter(Order.created_at >= now - timedelta(days=1)).count(),
+        "processing": orders.filter(Order.status == OrderStatus.pending).count(),
+        "shipped": orders.filter(Order.status == OrderStatus.fulfilled, Order.updated_at >= now - timedelta(days=30)).count(),
+        **{status: invoices.filter(InvoiceRequest.status == status).count() for status in INVOICE_STATUSES},
+        "current_month_gmv": float(gmv.filter(Order.created_at >= start_of_month).scalar() or 0),
+        "prev_month_gmv": float(gmv.filter(Order.created_at >= start_of_prev_month,
+                                           Order.created_at < start_of_month).scalar() or 0),
+    }
+
+def dashboard_totals(metrics: dict) -> dict:
+    return {
+        **{name: metrics["inventory"][name]["value"] for name in ("total_items", "low_stock", "out_of_stock", "categories")},
+        **{name: metrics["orders"][name]["value"] for name in ("new_orders", "processing", "shipped")},
+        **{status: metrics["invoicing"][status]["value"] for status in INVOICE_STATUSES},
+        **{name: metrics["gmv"][name] for name in ("current_month_gmv", "prev_month_gmv")},
+    }
+
+def timed(run, sync_engine) -> tuple:
+    """The result, statements issued and best latency of three runs"""
+    statements, timings = [], []
+    listener = lambda *args: statements.append(args[2])
+    for _ in range(3):
+        statements.clear()
+        event.listen(sync_engine, "before_cursor_execute", listener)
+        started = time.perf_counter()
+        try:
+            result = run()
+        finally:
+            timings.append(time.perf_counter() - started)
+            event.remove(sync_engine, "before_cursor_execute", listener)
+    return result, len(statements), min(timings)
+
+def test_business_dashboard_round_trips_and_latency(tables):
+    seller_id = seed()
+
+    db = SessionLocal()
+    before, before_statements, before_seconds = timed(lambda: per_metric_counts(db, seller_id), engine)
+    db.close()
+
+    async def dashboard():
+        async with AsyncSessionLocal() as session:
+            return await get_all_metrics(session, seller_id, active_view="business")
+    loop = asyncio.new_event_loop()
+    try:
+        after, after_statements, after_seconds = timed(lambda: loop.run_until_complete(dashboard()), async_engine.sync_engine)
+        loop.run_until_complete(async_engine.dispose())
+    finally:
+        loop.close()
+
+    print(f"business dashboard over {ROWS} products and orders: "
+          f"{before_statements} round trips in {before_seconds * 1000:.0f} ms before, "
+          f"{after_statements} in {after_seconds * 1000:.0f} ms after")
+    assert dashboard_totals(after) == before
+    assert after_statements == 5 < before_statements
+    assert after_seconds < before_seconds
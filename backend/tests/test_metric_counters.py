@@ -0,0 +1,108 @@
+# tests/test_metric_counters.py
+from sqlalchemy import select
+from models import (BuyerMetrics, InvoiceRequest, InvoiceStatus, Order, OrderStatus, Product, ProductReview,
+                    ProductView, ProductWishlist, SellerCategoryMetrics, SellerMetrics, User)
+from sql_database import SessionLocal
+from utils import metric_counters
+from utils.metric_counters import _expected_counters, _reconcile
+
+COUNTER_MODELS = (SellerMetrics, SellerCategoryMetrics, BuyerMetrics)
+
+def stored_counters(db, model):
+    """The non-zero counter rows of `model`, in the shape _expected_counters recounts them"""
+    table = model.__table__
+    key_columns = list(table.primary_key.columns)
+    counters = [column.name for column in table.columns if not column.primary_key and column.name != "updated_at"]
+    stored = {}
+    for row in db.scalars(select(model)):
+        counts = {name: getattr(row, name) for name in counters if getattr(row, name)}
+        if counts:
+            stored[tuple(getattr(row, column.name) for column in key_columns)] = counts
+    return stored
+
+def recounted(db, model, user_ids):
+    return {key: {name: count for name, count in counts.items() if count}
+            for key, counts in _expected_counters(db, user_ids)[model].items()
+            if any(counts.values())}
+
+def assert_counters_match_recount(db, user_ids):
+    db.expire_all()
+    for model in COUNTER_MODELS:
+        assert stored_counters(db, model) == recounted(db, model, user_ids), model.__tablename__
+
+def invoice(order, status):
+    return InvoiceRequest(order_id=order.id, customer_name="c", customer_email="c@example.com",
+                          shipping_address="a", amount=10, items=[], status=status)
+
+def test_counters_follow_inserts_updates_and_deletes(tables):
+    db = SessionLocal()
+    sellers = [User(email=f"seller{n}@example.com", password="x") for n in range(3)]
+    buyers = [User(email=f"buyer{n}@example.com", password="x") for n in range(3)]
+    db.add_all(sellers + buyers)
+    db.commit()
+    user_ids = [user.id for user in sellers + buyers]
+
+    products = [
+        Product(user_id=seller.id, name=f"p{n}", sku=f"s{seller.id}-{n}", price=1, quantity=quantity,
+                low_stock_threshold=5, category=category)
+        for seller in sellers
+        for n, (quantity, category) in enumerate([(0, "food"), (3, "food"), (50, "toys"), (20, None)])
+    ]
+    db.add_all(products)
+    db.commit()
+    orders = [Order(seller_id=seller.id, buyer_id=buyer.id, status=OrderStatus.pending, total_amount=10)
+              for seller in sellers for buyer in buyers]
+    db.add_all(orders)
+    db.commit()
+    db.add_all([invoice(order, status) for order, status in zip(orders, [InvoiceStatus.pending, InvoiceStatus.sent,
+                                                                         InvoiceStatus.paid, InvoiceStatus.overdue] * 2)])
+    for buyer in buyers:
+        for product in products[::2]:
+            db.add_all([ProductView(product_id=product.id, user_id=buyer.id),
+                        ProductWishlist(product_id=product.id, user_id=buyer.id),
+                        ProductReview(product_id=product.id, user_id=buyer.id, rating=4)])
+    db.commit()
+    assert_counters_match_recount(db, user_ids)
+
+    # Updates: stock moving across thresholds, recategorised and reassigned products, order and invoice status
+    products[0].quantity = 40
+    products[2].quantity = 0
+    products[1].category = "toys"
+    products[3].user_id = sellers[1].id
+    orders[0].status = OrderStatus.fulfilled
+    orders[1].status = OrderStatus.cancelled
+    orders[2].buyer_id = buyers[0].id
+    for request in db.scalars(select(InvoiceRequest).where(InvoiceRequest.status == InvoiceStatus.sent)):
+        request.status = InvoiceStatus.paid
+    db.commit()
+    assert_counters_match_recount(db, user_ids)
+
+    # Deletes, including the views, wishlists and reviews that go with a deleted product
+    db.delete(products[4])
+    db.delete(orders[8])
+    db.delete(db.scalars(select(ProductReview)).first())
+    db.commit()
+    assert_counters_match_recount(db, user_ids)
+
+    assert _reconcile() == {table: 0 for table in ("seller_metrics", "seller_category_metrics", "buyer_metrics")}
+    db.close()
+
+def test_reconciliation_repairs_drift_in_batches(tables, monkeypatch):
+    monkeypatch.setattr(metric_counters, "METRIC_COUNTERS_RECONCILE_BATCH_SIZE", 2)
+    db = SessionLocal()
+    sellers = [User(email=f"seller{n}@example.com", password="x") for n in range(5)]
+    db.add_all(sellers)
+    db.commit()
+    db.add_all([Product(user_id=seller.id, name="p", sku="s", price=1, quantity=1, category="food")
+                for seller in sellers])
+    db.commit()
+
+    # Bulk updates skip the mapper events, so the counters drift
+    db.query(Product).update({Product.quantity: 0}, synchronize_session=False)
+    db.query(SellerCategoryMetrics).delete()
+    db.commit()
+
+    drift = _reconcile()
+    assert drift == {"seller_metrics": 5, "seller_category_metrics": 5, "buyer_metrics": 0}
+    assert_counters_match_recount(db, [seller.id for seller in sellers])
+    db.close()
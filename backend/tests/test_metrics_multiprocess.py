@@ -0,0 +1,32 @@
+# tests/test_metrics_multiprocess.py
+import multiprocessing
+import os
+import runpy
+from types import SimpleNamespace
+import support
+from utils import cache_metrics
+from utils.cache_metrics import scrape_registry
+
+def test_metrics_are_summed_across_workers(tmp_path, database_path, monkeypatch):
+    # Workers spawned with PROMETHEUS_MULTIPROC_DIR set, as gunicorn's are in production
+    monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path))
+    monkeypatch.setattr(cache_metrics, "PROMETHEUS_MULTIPROC_DIR", str(tmp_path))
+    context = multiprocessing.get_context("spawn")
+    workers = [context.Process(target=support.record_metrics_in_process, args=(database_path, held))
+               for held in (1, 2)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(timeout=60)
+        assert worker.exitcode == 0
+
+    hits = lambda: scrape_registry().get_sample_value("cache_responses_total", {"namespace": "dashboard", "outcome": "hit"})
+    checked_out = lambda: scrape_registry().get_sample_value("db_pool_checked_out", {"pool": "sync"})
+    assert hits() == 2
+    assert checked_out() == 3
+
+    # Once gunicorn reaps a worker its gauges leave the sum; its counts stay
+    hooks = runpy.run_path(os.path.join(support.BACKEND_DIR, "gunicorn.conf.py"))
+    hooks["child_exit"](None, SimpleNamespace(pid=workers[1].pid))
+    assert checked_out() == 1
+    assert hits() == 2
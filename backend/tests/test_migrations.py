@@ -0,0 +1,127 @@
+# tests/test_migrations.py
+import os
+from datetime import datetime, timedelta, date, time
+import pytest
+import sqlalchemy as sa
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+from alembic.runtime.environment import EnvironmentContext
+from alembic.migration import MigrationContext
+from alembic.autogenerate import compare_metadata
+import support
+from models import Base
+
+ALEMBIC_DIR = os.path.join(os.path.dirname(support.BACKEND_DIR), "alembic")
+ROWS_PER_KEY = 25
+KEYS = 200
+
+def upgrade(engine, target="head"):
+    """Run the versioned migrations on an engine, as `alembic upgrade` does"""
+    cfg = Config()
+    cfg.set_main_option("script_location", ALEMBIC_DIR)
+    script = ScriptDirectory.from_config(cfg)
+    with engine.connect() as connection:
+        with EnvironmentContext(cfg, script, fn=lambda rev, context: script._upgrade_revs(target, rev),
+                                destination_rev=target) as environment:
+            environment.configure(connection=connection, target_metadata=Base.metadata)
+            with environment.begin_transaction():
+                environment.run_migrations()
+        connection.commit()
+
+def filler(column):
+    """A value for a NOT NULL column the test doesn't care about"""
+    for kind, value in ((sa.Boolean, False), (sa.Integer, 1), (sa.Numeric, 0), (sa.Float, 0),
+                        (sa.DateTime, datetime(2024, 1, 1)), (sa.Date, date(2024, 1, 1)),
+                        (sa.Time, time(0, 0)), (sa.JSON, {})):
+        if isinstance(column.type, kind):
+            return value
+    return "x"
+
+def seed(connection, table_name, rows):
+    """Insert rows into the migrated table, filling its remaining NOT NULL columns"""
+    table = sa.Table(table_name, sa.MetaData(), autoload_with=connection)
+    required = {
+        column.name: filler(column) for column in table.columns
+        if not column.nullable and not column.primary_key
+    }
+    connection.execute(table.insert(), [{**required, **row} for row in rows])
+
+@pytest.fixture
+def migrated(tmp_path):
+    engine = sa.create_engine(f"sqlite:///{tmp_path / 'migrated.db'}")
+    upgrade(engine)
+    yield engine
+    engine.dispose()
+
+def test_upgrade_creates_hot_filter_indexes(migrated):
+    cfg = Config()
+    cfg.set_main_option("script_location", ALEMBIC_DIR)
+    module = ScriptDirectory.from_config(cfg).get_revision("0002_hot_filter_indexes").module
+    inspector = sa.inspect(migrated)
+    for name, table, columns, _ in module.INDEXES:
+        indexes = {index["name"]: index["column_names"] for index in inspector.get_indexes(table)}
+        # Later revisions widen some of these with a trailing id
+        assert any(found.startswith(name) and cols[:len(columns)] == columns for found, cols in indexes.items()), name
+
+def test_head_matches_the_models(migrated):
+    with migrated.connect() as connection:
+        assert compare_metadata(MigrationContext.configure(connection), Base.metadata) == []
+
+def test_upgrade_over_tables_made_by_create_all(tmp_path):
+    engine = sa.create_engine(f"sqlite:///{tmp_path / 'existing.db'}")
+    Base.metadata.create_all(engine)
+    upgrade(engine)
+    with engine.connect() as connection:
+        assert connection.execute(sa.text("SELECT version_num FROM alembic_version")).scalar()
+    engine.dispose()
+
+# The hot filters and the index each should be answered from. SQLite can't check the GIN index
+# on notification metadata or the partial unread index, which only exist on PostgreSQL.
+NOW = datetime(2024, 6, 1)
+QUERIES = [
+    ("SELECT * FROM transactions WHERE bank_account_id = 7 ORDER BY created_at DESC LIMIT 20",
+     "ix_transactions_bank_account_id_created_at"),
+    ("SELECT * FROM orders WHERE seller_id = 7 AND status = 'pending' ORDER BY created_at DESC",
+     "ix_orders_seller_id_status_created_at"),
+    ("SELECT * FROM orders WHERE buyer_id = 7 ORDER BY created_at DESC",
+     "ix_orders_buyer_id_created_at"),
+    ("SELECT * FROM notifications WHERE user_id = 7 AND is_read = 0 ORDER BY created_at DESC",
+     "ix_notifications_user_id_"),
+    ("SELECT * FROM banking_automations WHERE is_active = 1 AND next_run <= '2024-06-01 00:00:00'",
+     "ix_banking_automations_is_active_next_run"),
+    ("SELECT count(*) FROM product_views WHERE product_id = 7 AND viewed_at >= '2024-05-01 00:00:00'",
+     "ix_product_views_product_id_viewed_at"),
+    ("SELECT * FROM storefront_products WHERE product_id = 7",
+     "ix_storefront_products_product_id"),
+    ("SELECT * FROM bank_accounts WHERE user_id = 7 AND account_type = 'BUSINESS'",
+     "ix_bank_accounts_user_id_account_type"),
+    ("SELECT * FROM financial_pools WHERE bank_account_id = 7 AND is_credit_pool = 1",
+     "ix_financial_pools_bank_account_id_is_credit_pool"),
+]
+
+def test_hot_filters_use_their_indexes(migrated):
+    keyed = [(key, n) for key in range(1, KEYS + 1) for n in range(ROWS_PER_KEY)]
+    with migrated.begin() as connection:
+        seed(connection, "transactions", [
+            {"bank_account_id": key, "created_at": NOW - timedelta(hours=n)} for key, n in keyed])
+        seed(connection, "orders", [
+            {"seller_id": key, "buyer_id": KEYS - key + 1, "status": ("pending", "fulfilled")[n % 2],
+             "created_at": NOW - timedelta(hours=n)} for key, n in keyed])
+        seed(connection, "notifications", [
+            {"user_id": key, "is_read": n % 3 == 0, "created_at": NOW - timedelta(hours=n)} for key, n in keyed])
+        seed(connection, "banking_automations", [
+            {"is_active": n % 5 != 0, "next_run": NOW + timedelta(days=n - 1)} for key, n in keyed])
+        seed(connection, "product_views", [
+            {"product_id": key, "user_id": n, "viewed_at": NOW - timedelta(days=n * 2)} for key, n in keyed])
+        seed(connection, "storefront_products", [{"product_id": key, "user_id": n} for key, n in keyed])
+        seed(connection, "bank_accounts", [
+            {"user_id": key, "account_type": ("PERSONAL", "BUSINESS")[n % 2], "account_number": f"{key}-{n}"}
+            for key, n in keyed])
+        seed(connection, "financial_pools", [
+            {"bank_account_id": key, "is_credit_pool": n == 0} for key, n in keyed])
+        connection.execute(sa.text("ANALYZE"))
+
+    with migrated.connect() as connection:
+        for query, index in QUERIES:
+            plan = " ".join(row[-1] for row in connection.execute(sa.text(f"EXPLAIN QUERY PLAN {query}")))
+            assert f"INDEX {index}" in plan, (query, plan)
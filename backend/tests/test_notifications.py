@@ -0,0 +1,28 @@
+# tests/test_notifications.py
+import asyncio
+from datetime import datetime, timedelta
+from models import Notification, User
+from routes.notifications import get_notifications
+from sql_database import SessionLocal
+
+def test_unread_count_covers_every_page(tables):
+    db = SessionLocal()
+    user = User(email="reader@example.com", password="x")
+    db.add(user)
+    db.flush()
+    start = datetime(2026, 1, 1)
+    db.add_all([
+        Notification(user_id=user.id, type="new_order", text=f"Order {i}", is_read=i % 6 == 0,
+                     created_at=start + timedelta(minutes=i))
+        for i in range(30)
+    ])
+    db.commit()
+
+    first = asyncio.run(get_notifications(limit=10, db=db, current_user=user))
+    assert len(first["items"]) == 10
+    assert first["unread_count"] == 25
+
+    second = asyncio.run(get_notifications(cursor=first["next_cursor"], limit=10, db=db, current_user=user))
+    assert second["items"][0].id == first["items"][-1].id - 1
+    assert second["unread_count"] == 25
+    db.close()
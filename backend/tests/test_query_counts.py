@@ -0,0 +1,107 @@
+# tests/test_query_counts.py
+import asyncio
+from contextlib import contextmanager
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+import config
+from app import app
+from models import (Base, MarketplaceOrder, Order, OrderItem, OrderStatus, Payout, PayoutBankDetails, Product,
+                    ProductImage, ProductReview, ProductView, ProductWishlist, StoreSettings, StorefrontProduct, User)
+from routes.auth import create_access_token
+from sql_database import SessionLocal, engine, async_engine
+from utils.redis_cache import redis_cache
+
+API = config.BASE_API_PREFIX
+
+# Each converted list endpoint, as (path, whose token) with the ids filled in by seed()
+ENDPOINTS = [
+    ("/marketplace/get_products", None),
+    ("/marketplace/store/{store_slug}", None),
+    ("/storefront/get_products", "seller"),
+    ("/storefront/storefront_preview/{seller_id}", None),
+    ("/my_items/orders", "buyer"),
+    ("/my_items/reviews", "buyer"),
+    ("/my_items/wishlist", "buyer"),
+    ("/orders/marketplace/{marketplace_order_id}", None),
+    ("/orders/seller/list", "seller"),
+    ("/payouts/get_payouts", "seller"),
+    ("/admin/payouts", "admin"),
+    ("/admin/payouts/marketplace-orders/{marketplace_order_id}", "admin"),
+    ("/dashboard/metrics?active_view=business", "seller"),
+    ("/dashboard/metrics?active_view=personal", "buyer"),
+]
+
+def seed(rows: int) -> dict:
+    """A store with `rows` products, orders, payouts, reviews and wishlist entries, each with its own parents"""
+    db = SessionLocal()
+    seller = User(email="seller@example.com", password="x", phone="1", business_name="Shop", store_slug="shop")
+    buyer = User(email="buyer@example.com", password="x")
+    admin = User(email="admin@example.com", password="x", is_admin=True, admin_role="super_admin")
+    db.add_all([seller, buyer, admin, StoreSettings(owner=seller)])
+    db.flush()
+
+    marketplace_order = MarketplaceOrder(customer_name="b", customer_email="b@example.com", customer_phone="3",
+                                         shipping_address="a", total_amount=rows)
+    db.add(marketplace_order)
+    for n in range(rows):
+        # Every row gets a distinct product and, where it has one, a distinct other seller
+        other_seller = User(email=f"seller{n}@example.com", password="x", phone=f"2{n}", business_name=f"Shop {n}")
+        products = [Product(owner=owner, name=f"p{n}", sku=f"s{n}", price=1)
+                    for owner in (seller, other_seller)]
+        db.add_all([other_seller, PayoutBankDetails(user=other_seller, bank_name="b", account_number="1",
+                                                     account_name="a")] + products)
+        for product in products:
+            db.add_all([ProductImage(product=product, image_url=f"{product.name}-{i}.png") for i in range(2)])
+            db.add(StorefrontProduct(owner=product.owner, product=product, storefront_price=2))
+            db.add(ProductView(product=product, user_id=buyer.id))
+        db.add_all([ProductReview(product=products[0], user_id=buyer.id, rating=5),
+                    ProductWishlist(product=products[1], user_id=buyer.id)])
+        for order_seller, product in zip((seller, other_seller), products):
+            order = Order(seller=order_seller, buyer_id=buyer.id, marketplace_order=marketplace_order,
+                          status=OrderStatus.pending, total_amount=1)
+            db.add_all([order, OrderItem(order=order, product=product, quantity=1, price=1),
+                        Payout(seller=order_seller, order=order, amount=1)])
+    db.commit()
+    ids = {"store_slug": seller.store_slug, "seller_id": seller.id, "marketplace_order_id": marketplace_order.id}
+    tokens = {role: create_access_token({"user_id": user.id}) for role, user in
+              (("seller", seller), ("buyer", buyer), ("admin", admin))}
+    db.close()
+    return ids, tokens
+
+@contextmanager
+def counting_statements():
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    engines = (engine, async_engine.sync_engine)
+    for each in engines:
+        event.listen(each, "before_cursor_execute", listener)
+    try:
+        yield statements
+    finally:
+        for each in engines:
+            event.remove(each, "before_cursor_execute", listener)
+
+def statements_per_endpoint(rows: int) -> dict:
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    asyncio.run(config.REDIS_ASYNC_CLIENT.flushall())
+    if redis_cache.local_cache is not None:
+        redis_cache.local_cache.clear()
+    ids, tokens = seed(rows)
+
+    counts = {}
+    with TestClient(app) as client:
+        for path, role in ENDPOINTS:
+            headers = {"Authorization": f"Bearer {tokens[role]}"} if role else {}
+            with counting_statements() as statements:
+                response = client.get(API + path.format(**ids), headers=headers)
+            assert response.status_code == 200, (path, response.text)
+            counts[path] = len(statements)
+    asyncio.run(async_engine.dispose())
+    return counts
+
+def test_list_endpoints_issue_a_bounded_number_of_statements(tables, monkeypatch):
+    # The startup hook seeds admins and starts background jobs; the endpoints don't need them
+    monkeypatch.setattr(app.router, "on_startup", [])
+    small, large = statements_per_endpoint(2), statements_per_endpoint(12)
+    assert small == large
@@ -0,0 +1,51 @@
+# tests/test_read_your_writes.py
+import asyncio
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+import config
+from app import app
+from models import Base, Notification, User
+from routes.auth import create_access_token
+from sql_database import SessionLocal
+from utils import read_replica
+
+NOTIFICATIONS = config.BASE_API_PREFIX + "/notifications"
+
+def seed(db) -> None:
+    db.add_all([User(id=1, email="writer@example.com", password="x"), User(id=2, email="other@example.com", password="x"),
+                Notification(user_id=1, type="info", text="hello"), Notification(user_id=2, type="info", text="hello")])
+    db.commit()
+    db.close()
+
+def test_reads_go_to_the_primary_after_the_users_own_write(tables, tmp_path, monkeypatch):
+    monkeypatch.setattr(app.router, "on_startup", [])
+    # A replica that stopped replicating after the seed: it never sees the writes below
+    replica_engine = create_engine(f"sqlite:///{tmp_path / 'replica.db'}")
+    Base.metadata.create_all(replica_engine)
+    seed(sessionmaker(bind=replica_engine)())
+    seed(SessionLocal())
+    monkeypatch.setattr(read_replica, "REPLICA_ENABLED", True)
+    monkeypatch.setattr(read_replica, "ReadSessionLocal", sessionmaker(autocommit=False, autoflush=False, bind=replica_engine))
+
+    writer, other = ({"Authorization": f"Bearer {create_access_token({'user_id': user_id})}"} for user_id in (1, 2))
+    unread = lambda client, headers: client.get(NOTIFICATIONS + "/get_notifications", headers=headers).json()["unread_count"]
+
+    with TestClient(app) as client:
+        assert unread(client, writer) == 1
+        assert client.post(NOTIFICATIONS + "/mark-all-read", headers=writer).status_code == 200
+        assert client.post(NOTIFICATIONS + "/mark-all-read", headers=other).status_code == 200
+        marker = read_replica._write_marker_key(1)
+        assert 0 < asyncio.run(config.REDIS_ASYNC_CLIENT.ttl(marker)) <= config.READ_YOUR_WRITES_WINDOW
+
+        # Within the window the writer reads the primary and sees their change
+        assert unread(client, writer) == 0
+
+        # Without the marker (another user's reads, or once the window is over) reads go to the replica
+        asyncio.run(config.REDIS_ASYNC_CLIENT.delete(read_replica._write_marker_key(2)))
+        assert unread(client, other) == 1
+        asyncio.run(config.REDIS_ASYNC_CLIENT.delete(marker))
+        # (a query the writer hasn't cached yet, so it reaches the database)
+        assert client.get(NOTIFICATIONS + "/get_notifications", params={"unread_only": True},
+                          headers=writer).json()["unread_count"] == 1
+    replica_engine.dispose()
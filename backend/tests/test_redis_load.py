@@ -0,0 +1,63 @@
+# tests/test_redis_load.py
+"""
+Latency of cache hits under concurrent requests: the blocking round trip RedisCache.get used to
+make on the event loop, against the awaited one it makes through redis.asyncio now. Both clients
+are fakeredis with a simulated network round trip, so the comparison runs anywhere.
+"""
+import asyncio
+import time
+import fakeredis
+from utils.cache_codec import cache_codec
+from utils.redis_cache import RedisCache
+
+ROUND_TRIP = 0.002  # seconds
+REQUESTS = 200
+ARRIVAL_INTERVAL = 0.0005  # a request every half millisecond
+
+class SlowRedis(fakeredis.FakeRedis):
+    def execute_command(self, *args, **options):
+        time.sleep(ROUND_TRIP)  # waiting on the socket, holding the event loop
+        return super().execute_command(*args, **options)
+
+class SlowAsyncRedis(fakeredis.FakeAsyncRedis):
+    async def execute_command(self, *args, **options):
+        await asyncio.sleep(ROUND_TRIP)  # waiting on the socket, other requests run meanwhile
+        return await super().execute_command(*args, **options)
+
+async def blocking_get(client: fakeredis.FakeRedis, key: str):
+    """RedisCache.get as it was: declared async, but a synchronous client underneath"""
+    data = client.get(key)
+    return cache_codec.decode(data) if data else None
+
+def p99(latencies: list) -> float:
+    return sorted(latencies)[int(len(latencies) * 0.99) - 1]
+
+async def serve(get, key: str) -> list:
+    """Latency of each of REQUESTS cache hits arriving at a steady rate, from its arrival"""
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+
+    async def request(n: int) -> float:
+        arrival = started + n * ARRIVAL_INTERVAL
+        await asyncio.sleep(max(arrival - loop.time(), 0))
+        assert await get(key) == {"items": list(range(20))}
+        return loop.time() - arrival
+
+    return await asyncio.gather(*(request(n) for n in range(REQUESTS)))
+
+def test_async_client_keeps_tail_latency_at_one_round_trip():
+    server = fakeredis.FakeServer()
+    key = "marketplace:get_products:abc"
+    fakeredis.FakeRedis(server=server).set(key, cache_codec.encode({"items": list(range(20))}))
+
+    cache = RedisCache(SlowAsyncRedis(server=server), local_cache=None)
+    blocking_client = SlowRedis(server=server)
+
+    blocking = asyncio.run(serve(lambda key: blocking_get(blocking_client, key), key))
+    awaited = asyncio.run(serve(cache.get, key))
+    print(f"p99 of {REQUESTS} concurrent cache hits: blocking {p99(blocking) * 1000:.1f} ms, "
+          f"async {p99(awaited) * 1000:.1f} ms")
+
+    # Blocked, each request queues behind every round trip before it; awaited, they overlap
+    assert p99(blocking) > REQUESTS * (ROUND_TRIP - ARRIVAL_INTERVAL) / 2
+    assert p99(awaited) < p99(blocking) / 5
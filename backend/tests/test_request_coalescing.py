@@ -0,0 +1,71 @@
+# tests/test_request_coalescing.py
+import asyncio
+from sqlalchemy import inspect
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from models import User
+from sql_database import SessionLocal, AsyncSessionLocal, async_engine
+from utils.cache_constants import CacheNamespace
+from utils.cache_decorators import _refresh, cache_response
+
+def _counted_handler(delay: float):
+    calls = []
+
+    @cache_response(expire=60, include_user_id=False, namespace=CacheNamespace.DASHBOARD)
+    async def handler(page: int = 1):
+        calls.append(page)
+        await asyncio.sleep(delay)
+        return {"page": page, "items": [1, 2, 3]}
+
+    return handler, calls
+
+def test_cold_key_is_computed_once():
+    handler, calls = _counted_handler(0.05)
+
+    async def scenario():
+        return await asyncio.gather(*(handler(page=1) for _ in range(100)))
+
+    responses = asyncio.run(scenario())
+    assert calls == [1]
+    assert all(response == {"page": 1, "items": [1, 2, 3]} for response in responses)
+
+def test_waiters_survive_a_cancelled_leader():
+    handler, calls = _counted_handler(0.05)
+
+    async def scenario():
+        leader = asyncio.create_task(handler(page=2))
+        await asyncio.sleep(0.01)
+        waiters = [asyncio.create_task(handler(page=2)) for _ in range(20)]
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        return await asyncio.gather(*waiters)
+
+    responses = asyncio.run(scenario())
+    # The cancelled leader's computation and one waiter's takeover
+    assert calls == [2, 2]
+    assert all(response == {"page": 2, "items": [1, 2, 3]} for response in responses)
+
+def test_refresh_runs_on_its_own_session_and_user(tables):
+    db = SessionLocal()
+    user = User(email="user@example.com", password="x")
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    db.close()
+    seen = []
+
+    async def handler(db, current_user):
+        seen.append((db, current_user, inspect(current_user).session))
+        return {"email": current_user.email}
+
+    async def scenario():
+        for request_db in (SessionLocal(), AsyncSessionLocal()):
+            await _refresh("dashboard:refresh", 60, 60, [], handler, (), {"db": request_db, "current_user": user})
+        await async_engine.dispose()
+
+    asyncio.run(scenario())
+    # The request's session and its detached user are swapped for the refresh session's copy
+    assert [isinstance(refresh_db, kind) for (refresh_db, _, _), kind in zip(seen, (Session, AsyncSession))] == [True, True]
+    for refresh_db, refreshed_user, bound_to in seen:
+        assert refreshed_user is not user and refreshed_user.id == user.id
+        assert bound_to is (refresh_db.sync_session if isinstance(refresh_db, AsyncSession) else refresh_db)
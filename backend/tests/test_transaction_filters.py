@@ -0,0 +1,41 @@
+# tests/test_transaction_filters.py
+from datetime import datetime, timedelta
+from fastapi.testclient import TestClient
+import config
+from app import app
+from models import AccountType, BankAccount, Transaction, TransactionTag, TransactionType, User
+from routes.auth import create_access_token
+from sql_database import SessionLocal
+
+TRANSACTIONS = config.BASE_API_PREFIX + "/banking/transactions"
+
+def test_transactions_are_filtered_by_date(tables, monkeypatch):
+    monkeypatch.setattr(app.router, "on_startup", [])
+    db = SessionLocal()
+    user = User(email="user@example.com", password="x")
+    db.add(user)
+    db.flush()
+    db.add(BankAccount(user_id=user.id, account_type=AccountType.PERSONAL, account_name="Main",
+                       account_number="0000000001", bank_name="BAM", transactions=[
+        Transaction(type=TransactionType.CREDIT, amount=day, reference=f"TX-{day}", tag=TransactionTag.SALES,
+                    created_at=datetime(2026, 1, 1) + timedelta(days=day, hours=12))
+        for day in range(5)
+    ]))
+    db.commit()
+    headers = {"Authorization": f"Bearer {create_access_token({'user_id': user.id})}"}
+    db.close()
+
+    with TestClient(app) as client:
+        def amounts(**params):
+            response = client.get(TRANSACTIONS, params={"user_view": "personal", **params}, headers=headers)
+            assert response.status_code == 200, response.text
+            return sorted(row["amount"] for row in response.json()["items"])
+
+        # The dates the frontend's date inputs send, and full timestamps
+        assert amounts(start_date="2026-01-02", end_date="2026-01-04") == [1, 2]
+        assert amounts(start_date="2026-01-03T12:00:00") == [2, 3, 4]
+
+        # Malformed dates are the client's error, not the server's
+        for params in ({"start_date": "yesterday"}, {"end_date": "2026-13-01"}):
+            response = client.get(TRANSACTIONS, params={"user_view": "personal", **params}, headers=headers)
+            assert response.status_code == 422
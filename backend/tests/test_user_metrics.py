@@ -0,0 +1,85 @@
+# tests/test_user_metrics.py
+import asyncio
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import event
+from models import Order, OrderStatus, Product, User
+from sql_database import SessionLocal, AsyncSessionLocal, async_engine
+from utils.user_metrics_calculator import get_all_metrics
+import utils.metric_counters  # registers the counter listeners
+
+@pytest.mark.parametrize("active_view", ["business", "personal"])
+def test_dashboard_metrics_hold_one_connection(tables, active_view):
+    db = SessionLocal()
+    user = User(email=f"{active_view}@example.com", password="x")
+    db.add(user)
+    db.commit()
+    user_id = user.id
+    db.close()
+
+    checkouts = []
+    listener = lambda *args: checkouts.append(args)
+
+    async def scenario():
+        event.listen(async_engine.sync_engine, "checkout", listener)
+        try:
+            async with AsyncSessionLocal() as session:
+                return await get_all_metrics(session, user_id, active_view=active_view)
+        finally:
+            event.remove(async_engine.sync_engine, "checkout", listener)
+            await async_engine.dispose()
+
+    metrics = asyncio.run(scenario())
+    assert len(checkouts) == 1
+    assert metrics
+
+def business_metrics(user_id):
+    async def scenario():
+        try:
+            async with AsyncSessionLocal() as session:
+                return await get_all_metrics(session, user_id, active_view="business")
+        finally:
+            await async_engine.dispose()
+    return asyncio.run(scenario())
+
+def test_every_business_metric_has_a_trend_string(tables):
+    db = SessionLocal()
+    seller = User(email="seller@example.com", password="x")
+    db.add(seller)
+    db.commit()
+    db.add_all([Product(user_id=seller.id, name="low", sku="low", price=1, quantity=2, low_stock_threshold=5),
+                Product(user_id=seller.id, name="out", sku="out", price=1, quantity=0, low_stock_threshold=5)])
+    db.commit()
+    user_id = seller.id
+    db.close()
+
+    metrics = business_metrics(user_id)
+    assert metrics["inventory"]["low_stock"] == {"value": 2, "trend": "0%", "status": "warning"}
+    assert metrics["inventory"]["out_of_stock"] == {"value": 1, "trend": "0%", "status": "danger"}
+    # GMV is a set of figures rather than metric cards
+    for group in (metrics[name] for name in ("inventory", "orders", "restock", "invoicing")):
+        for name, metric in group.items():
+            assert isinstance(metric["trend"], str), name
+
+def test_returns_count_orders_cancelled_in_the_last_30_days(tables):
+    db = SessionLocal()
+    seller = User(email="seller@example.com", password="x")
+    db.add(seller)
+    db.commit()
+    now = datetime.utcnow()
+    db.add_all([
+        Order(seller_id=seller.id, status=status, total_amount=1, created_at=updated_at, updated_at=updated_at)
+        for status, updated_at in [
+            (OrderStatus.cancelled, now - timedelta(days=1)),
+            (OrderStatus.cancelled, now - timedelta(days=10)),
+            (OrderStatus.cancelled, now - timedelta(days=45)),  # the previous window
+            (OrderStatus.fulfilled, now - timedelta(days=1)),
+            (OrderStatus.pending, now - timedelta(days=1)),
+        ]
+    ])
+    db.commit()
+    user_id = seller.id
+    db.close()
+
+    returns = business_metrics(user_id)["orders"]["returns"]
+    assert returns == {"value": 2, "trend": "+100.0%", "status": "normal"}
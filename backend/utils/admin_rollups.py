@@ -0,0 +1,173 @@
+#utils/admin_rollups.py
+import asyncio
+import logging
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Optional
+from sqlalchemy import distinct, func, select, true
+from sqlalchemy.orm import Session
+from models import (User, Product, Order, OrderStatus, Payment, PaymentStatus, InvoiceRequest, InvoiceStatus,
+                    StorefrontProduct, RestockRequest, RestockRequestStatus, RestockRequestUrgency,
+                    PlatformDailyMetrics)
+from sql_database import SessionLocal
+from utils.redis_cache import redis_cache
+from config import ADMIN_ROLLUP_REFRESH_INTERVAL, ADMIN_ROLLUP_LOOKBACK_DAYS
+
+logger = logging.getLogger(__name__)
+
+# The admin dashboard reads platform_daily_metrics instead of scanning the platform tables.
+# Each refresh takes today's snapshot (full aggregates, but off the request path) and recomputes
+# the daily flows of the trailing ADMIN_ROLLUP_LOOKBACK_DAYS, so late status changes are picked up
+# for the month-to-date window. Snapshots accumulate into history; the one 30 days back, which the
+# trends compare against, is backfilled from created_at when it was never taken.
+
+ROLLUP_LOCK = "admin_rollups:refresh"
+TREND_DAYS = 30
+
+FLOW_COLUMNS = ("gmv", "payment_volume", "invoice_volume")
+
+def _before(column, as_of: Optional[datetime]):
+    """Rows that existed at `as_of`; everything for the current snapshot"""
+    return column < as_of if as_of else true()
+
+def _snapshot(db: Session, as_of: Optional[datetime] = None) -> Dict:
+    """
+    Platform totals as of `as_of` (now when None). Past snapshots count the rows created
+    before `as_of` in their current state, which is the best that can be recovered afterwards.
+    """
+    now = as_of or datetime.utcnow()
+    window_start = now - timedelta(days=TREND_DAYS)
+    snapshot = {}
+
+    snapshot.update(db.execute(select(
+        func.count().label("total_users"),
+        func.count().filter(User.created_at >= window_start).label("new_users"),
+        func.count().filter(User.last_login >= window_start, User.last_login < now).label("active_users"),
+        func.count().filter(User.is_verified == True).label("verified_users")
+    ).where(_before(User.created_at, as_of))).one()._asdict())
+
+    snapshot.update(db.execute(select(
+        func.count().label("total_products"),
+        func.count().filter(Product.quantity <= Product.low_stock_threshold).label("low_stock_products"),
+        func.count().filter(
+            Product.quantity <= Product.low_stock_threshold,
+            Product.quantity > 0
+        ).label("low_stock_in_stock_products"),
+        func.count().filter(Product.quantity == 0).label("out_of_stock_products")
+    ).where(_before(Product.created_at, as_of))).one()._asdict())
+
+    # Products listed in any storefront
+    snapshot["active_products"] = db.execute(
+        select(func.count(distinct(StorefrontProduct.product_id)))
+        .where(_before(StorefrontProduct.created_at, as_of))
+    ).scalar()
+
+    snapshot.update(db.execute(select(
+        func.count().filter(RestockRequest.status == RestockRequestStatus.PENDING).label("pending_restock_requests"),
+        func.count().filter(
+            RestockRequest.status == RestockRequestStatus.PENDING,
+            RestockRequest.urgency == RestockRequestUrgency.HIGH
+        ).label("high_priority_restock_requests")
+    ).where(_before(RestockRequest.request_date, as_of))).one()._asdict())
+
+    snapshot.update(db.execute(select(
+        func.count().label("total_orders"),
+        func.count().filter(Order.status == OrderStatus.pending).label("pending_orders"),
+        func.count().filter(Order.status == OrderStatus.fulfilled).label("fulfilled_orders"),
+        func.count().filter(Order.status == OrderStatus.cancelled).label("cancelled_orders"),
+        func.coalesce(func.sum(Order.total_amount).filter(Order.status != OrderStatus.cancelled), 0).label("total_gmv")
+    ).where(_before(Order.created_at, as_of))).one()._asdict())
+
+    snapshot.update(db.execute(select(
+        func.count().label("total_payments"),
+        func.count().filter(Payment.status == PaymentStatus.PENDING).label("pending_payments"),
+        func.count().filter(Payment.status == PaymentStatus.COMPLETED).label("completed_payments"),
+        func.count().filter(Payment.status == PaymentStatus.FAILED).label("failed_payments"),
+        func.coalesce(func.sum(Payment.amount).filter(Payment.status == PaymentStatus.PENDING), 0).label("pending_payment_amount")
+    ).where(_before(Payment.created_at, as_of))).one()._asdict())
+
+    snapshot.update(db.execute(select(
+        func.count().label("total_invoices"),
+        func.count().filter(InvoiceRequest.status == InvoiceStatus.pending).label("pending_invoices"),
+        func.count().filter(InvoiceRequest.status == InvoiceStatus.paid).label("paid_invoices"),
+        func.count().filter(
+            InvoiceRequest.status != InvoiceStatus.paid,
+            InvoiceRequest.due_date < now
+        ).label("overdue_invoices")
+    ).where(_before(InvoiceRequest.created_at, as_of))).one()._asdict())
+
+    return snapshot
+
+def _daily_flows(db: Session, since: date) -> Dict[date, Dict]:
+    """Per-day amounts created since `since`, from range scans on the created_at indexes"""
+    flows = {}
+    for column, amount, criteria in (
+        ("gmv", Order.total_amount, (Order.status != OrderStatus.cancelled,)),
+        ("payment_volume", Payment.amount, (Payment.status == PaymentStatus.COMPLETED,)),
+        ("invoice_volume", InvoiceRequest.amount, ()),
+    ):
+        created_at = amount.class_.created_at
+        day = func.date(created_at)
+        for row_day, total in db.execute(
+            select(day, func.sum(amount))
+            .where(created_at >= datetime.combine(since, time()), *criteria)
+            .group_by(day)
+        ):
+            # SQLite returns date() as a string
+            row_day = date.fromisoformat(row_day) if isinstance(row_day, str) else row_day
+            flows.setdefault(row_day, dict.fromkeys(FLOW_COLUMNS, 0))[column] = total or 0
+    return flows
+
+def refresh_admin_rollups(db: Session) -> PlatformDailyMetrics:
+    """Take today's snapshot and recompute the trailing days' flows; the caller commits"""
+    now = datetime.utcnow()
+    today = now.date()
+    since = today - timedelta(days=ADMIN_ROLLUP_LOOKBACK_DAYS)
+
+    rows = {row.day: row for row in db.query(PlatformDailyMetrics).filter(PlatformDailyMetrics.day >= since)}
+    flows = _daily_flows(db, since)
+    for offset in range(ADMIN_ROLLUP_LOOKBACK_DAYS + 1):
+        day = since + timedelta(days=offset)
+        row = rows.get(day)
+        if row is None:
+            row = rows[day] = PlatformDailyMetrics(day=day)
+            db.add(row)
+        for column, value in flows.get(day, dict.fromkeys(FLOW_COLUMNS, 0)).items():
+            setattr(row, column, value)
+
+    snapshots = {today: (None, now)}
+    baseline = rows.get(today - timedelta(days=TREND_DAYS))
+    if baseline is not None and baseline.snapshot_at is None:
+        end_of_day = datetime.combine(baseline.day + timedelta(days=1), time())
+        snapshots[baseline.day] = (end_of_day, end_of_day)
+    for day, (as_of, taken_at) in snapshots.items():
+        for column, value in _snapshot(db, as_of).items():
+            setattr(rows[day], column, value)
+        rows[day].snapshot_at = taken_at
+
+    return rows[today]
+
+def _refresh() -> None:
+    db = SessionLocal()
+    try:
+        refresh_admin_rollups(db)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+async def run_admin_rollup_refresher() -> None:
+    """Refresh the rollups at startup and then every ADMIN_ROLLUP_REFRESH_INTERVAL, on one worker at a time"""
+    while True:
+        # Held (not released) for the whole interval, so other workers skip this round
+        if await redis_cache.acquire_lock(ROLLUP_LOCK, ADMIN_ROLLUP_REFRESH_INTERVAL):
+            try:
+                await asyncio.to_thread(_refresh)
+            except Exception as e:
+                logger.error(f"Admin rollup refresh failed: {e}")
+        await asyncio.sleep(ADMIN_ROLLUP_REFRESH_INTERVAL)
+
+if __name__ == "__main__":
+    # One-off refresh: python -m utils.admin_rollups
+    _refresh()
@@ -1,17 +1,38 @@
 from sqlalchemy import func
 from sqlalchemy.orm import Session
-from datetime import datetime, timedelta
+from datetime import timedelta
 from typing import Dict
-from decimal import Decimal
-from models import (
-    User, Product, Order, OrderStatus, Payment, PaymentStatus,
-    InvoiceRequest, InvoiceStatus, StorefrontProduct, RestockRequest, 
-    RestockRequestStatus, RestockRequestUrgency
-)
+from models import PlatformDailyMetrics
+from utils.admin_rollups import refresh_admin_rollups, TREND_DAYS
+from utils.trends import calculate_trend
 
 class AdminMetricsCalculator:
     def __init__(self, db: Session):
+        """Load the rollup rows every metric is read from (see utils/admin_rollups)"""
         self.db = db
+        self.current = db.query(PlatformDailyMetrics)\
+            .filter(PlatformDailyMetrics.snapshot_at != None)\
+            .order_by(PlatformDailyMetrics.day.desc())\
+            .first()
+        if self.current is None:
+            # First request before the refresher has run
+            self.current = refresh_admin_rollups(db)
+            db.commit()
+
+        self.previous = db.query(PlatformDailyMetrics).filter(
+            PlatformDailyMetrics.day == self.current.day - timedelta(days=TREND_DAYS),
+            PlatformDailyMetrics.snapshot_at != None
+        ).first()
+
+        start_of_month = self.current.day.replace(day=1)
+        self.month = db.query(
+            func.coalesce(func.sum(PlatformDailyMetrics.gmv), 0).label("gmv"),
+            func.coalesce(func.sum(PlatformDailyMetrics.payment_volume), 0).label("payment_volume"),
+            func.coalesce(func.sum(PlatformDailyMetrics.invoice_volume), 0).label("invoice_volume")
+        ).filter(
+            PlatformDailyMetrics.day >= start_of_month,
+            PlatformDailyMetrics.day <= self.current.day
+        ).one()
         
     def get_user_metrics(self) -> Dict:
         """
@@ -21,23 +42,8 @@ class AdminMetricsCalculator:
         Returns:
             Dict: Dictionary containing metrics with their values and trends
         """
-        now = datetime.utcnow()
-        thirty_days_ago = now - timedelta(days=30)
-        
-        # Basic user counts
-        total_users = self.db.query(User).count()
-        
-        new_users = self.db.query(User).filter(
-            User.created_at >= thirty_days_ago
-        ).count()
-        
-        active_users = self.db.query(User.id).filter(
-            User.last_login >= thirty_days_ago
-        ).distinct().count()
-        
-        verified_users = self.db.query(User).filter(
-            User.is_verified == True
-        ).count()
+        total_users = self.current.total_users
+        active_users = self.current.active_users
         
         # Calculate engagement rate
         engagement_rate = (active_users / total_users * 100) if total_users > 0 else 0
@@ -45,21 +51,19 @@ class AdminMetricsCalculator:
         return {
             "total_users": {
                 "value": total_users,
-                "trend": self._calculate_trend(total_users, thirty_days_ago, User)
+                "trend": self._calculate_trend("total_users")
             },
             "new_users": {
-                "value": new_users,
-                "trend": self._calculate_trend(new_users, thirty_days_ago, User)
+                "value": self.current.new_users,
+                "trend": self._calculate_trend("new_users")
             },
             "active_users": {
                 "value": active_users,
-                "trend": self._calculate_trend(active_users, thirty_days_ago, User, 
-                                            filter_by_login=True)  # Added parameter for login-based trend
+                "trend": self._calculate_trend("active_users")
             },
             "verified_users": {
-                "value": verified_users,
-                "trend": self._calculate_trend(verified_users, thirty_days_ago, User, 
-                                            verified_only=True)
+                "value": self.current.verified_users,
+                "trend": self._calculate_trend("verified_users")
             },
             "engagement_rate": {
                 "value": round(engagement_rate, 2),
@@ -69,28 +73,12 @@ class AdminMetricsCalculator:
     
     def get_platform_metrics(self) -> Dict:
         """Calculate platform-wide metrics"""
-        now = datetime.utcnow()
-        start_of_month = datetime(now.year, now.month, 1)
-        
-        total_gmv = self.db.query(func.sum(Order.total_amount)).filter(
-            Order.status != OrderStatus.cancelled
-        ).scalar() or Decimal('0')
-        
-        monthly_gmv = self.db.query(func.sum(Order.total_amount)).filter(
-            Order.created_at >= start_of_month,
-            Order.status != OrderStatus.cancelled
-        ).scalar() or Decimal('0')
-        
-        total_orders = self.db.query(Order).count()
-        successful_orders = self.db.query(Order).filter(
-            Order.status == OrderStatus.fulfilled
-        ).count()
-        
-        conversion_rate = (successful_orders / total_orders * 100) if total_orders > 0 else 0
+        total_orders = self.current.total_orders
+        conversion_rate = (self.current.fulfilled_orders / total_orders * 100) if total_orders > 0 else 0
         
         return {
-            "total_gmv": float(total_gmv),
-            "monthly_gmv": float(monthly_gmv),
+            "total_gmv": float(self.current.total_gmv),
+            "monthly_gmv": float(self.month.gmv),
             "total_orders": total_orders,
             "conversion_rate": round(conversion_rate, 2)
         }
@@ -100,51 +88,18 @@ class AdminMetricsCalculator:
         Calculate platform-wide inventory metrics including total products,
         products in storefronts, low stock products, and out of stock products
         """
-        now = datetime.utcnow()
-        thirty_days_ago = now - timedelta(days=30)
-        
-        # Total products count
-        total_products = self.db.query(Product).count()
-        
-        # Active (storefront) products count - products that are listed in any storefront
-        active_products = self.db.query(Product)\
-            .join(StorefrontProduct)\
-            .distinct()\
-            .count()
-        
-        # Low stock products
-        low_stock_products = self.db.query(Product).filter(
-            Product.quantity <= Product.low_stock_threshold
-        ).count()
-        
-        # Out of stock products
-        out_of_stock = self.db.query(Product).filter(
-            Product.quantity == 0
-        ).count()
-        
-        # Calculate trends
-        # For active products, we need to compare with products in storefront 30 days ago
-        previous_active = self.db.query(Product)\
-            .join(StorefrontProduct)\
-            .filter(StorefrontProduct.created_at < thirty_days_ago)\
-            .distinct()\
-            .count()
-        
-        active_trend = self._calculate_trend(
-            active_products, 
-            thirty_days_ago, 
-            Product,
-            custom_previous_value=previous_active
-        )
+        total_products = self.current.total_products
+        low_stock_products = self.current.low_stock_products
+        out_of_stock = self.current.out_of_stock_products
         
         return {
             "total_products": {
                 "value": total_products,
-                "trend": self._calculate_trend(total_products, thirty_days_ago, Product)
+                "trend": self._calculate_trend("total_products")
             },
             "active_products": {
-                "value": active_products,
-                "trend": active_trend
+                "value": self.current.active_products,
+                "trend": self._calculate_trend("active_products")
             },
             "low_stock_products": {
                 "value": low_stock_products,
@@ -158,29 +113,12 @@ class AdminMetricsCalculator:
     
     def get_financial_metrics(self) -> Dict:
         """Calculate financial metrics"""
-        now = datetime.utcnow()
-        start_of_month = datetime(now.year, now.month, 1)
-        
-        monthly_revenue = self.db.query(func.sum(Payment.amount)).filter(
-            Payment.status == PaymentStatus.COMPLETED,
-            Payment.created_at >= start_of_month
-        ).scalar() or Decimal('0')
-        
-        pending_payouts = self.db.query(func.sum(Payment.amount)).filter(
-            Payment.status == PaymentStatus.PENDING
-        ).scalar() or Decimal('0')
-        
-        successful_transactions = self.db.query(Payment).filter(
-            Payment.status == PaymentStatus.COMPLETED
-        ).count()
-        
-        failed_transactions = self.db.query(Payment).filter(
-            Payment.status == PaymentStatus.FAILED
-        ).count()
+        successful_transactions = self.current.completed_payments
+        failed_transactions = self.current.failed_payments
         
         return {
-            "monthly_revenue": float(monthly_revenue),
-            "pending_payouts": float(pending_payouts),
+            "monthly_revenue": float(self.month.payment_volume),
+            "pending_payouts": float(self.current.pending_payment_amount),
             "successful_transactions": successful_transactions,
             "failed_transactions": {
                 "value": failed_transactions,
@@ -188,79 +126,31 @@ class AdminMetricsCalculator:
             }
         }
     
-    def _calculate_trend(self, current_value: int, compare_date: datetime, model, 
-                    verified_only: bool = False, active_only: bool = False, 
-                    filter_by_login: bool = False, custom_previous_value: int = None) -> str:
+    def _calculate_trend(self, column: str) -> str:
         """
         Helper method to calculate actual trends
         
         Args:
-            current_value: Current value of the metric
-            compare_date: Date to compare against
-            model: Database model to query
-            verified_only: Filter for verified users only
-            active_only: Filter for active users only
-            filter_by_login: Filter by last login date instead of created_at
-            custom_previous_value: Optional custom previous value to use instead of querying
+            column: Snapshot column of the rollup to compare with its value 30 days earlier
         
         Returns:
             str: Formatted percentage change with sign (e.g. "+10.5%" or "-5.2%")
         """
-        if custom_previous_value is not None:
-            previous_value = custom_previous_value
-        else:
-            base_query = self.db.query(model)
-            
-            if verified_only:
-                base_query = base_query.filter(model.is_verified == True)
-            if active_only:
-                base_query = base_query.join(StorefrontProduct)
-            
-            if filter_by_login:
-                previous_value = base_query.filter(
-                    model.last_login < compare_date
-                ).distinct().count()
-            else:
-                previous_value = base_query.filter(
-                    model.created_at < compare_date
-                ).count()
-        
-        if previous_value == 0:
-            return "+100%" if current_value > 0 else "0%"
-        
-        change = ((current_value - previous_value) / previous_value) * 100
-        return f"+{change:.1f}%" if change >= 0 else f"{change:.1f}%"
+        previous_value = getattr(self.previous, column) if self.previous else 0
+        return calculate_trend(getattr(self.current, column), previous_value)
     
     def get_invoice_metrics(self) -> Dict:
         """Calculate invoice-related metrics"""
-        now = datetime.utcnow()
-        start_of_month = datetime(now.year, now.month, 1)
-        thirty_days_ago = now - timedelta(days=30)
-        
-        total_invoices = self.db.query(InvoiceRequest).count()
-        pending_invoices = self.db.query(InvoiceRequest).filter(
-            InvoiceRequest.status == InvoiceStatus.pending
-        ).count()
+        total_invoices = self.current.total_invoices
+        pending_invoices = self.current.pending_invoices
+        overdue_invoices = self.current.overdue_invoices
         
-        overdue_invoices = self.db.query(InvoiceRequest).filter(
-            InvoiceRequest.status != InvoiceStatus.paid,
-            InvoiceRequest.due_date < now
-        ).count()
-        
-        monthly_invoice_volume = self.db.query(func.sum(InvoiceRequest.amount)).filter(
-            InvoiceRequest.created_at >= start_of_month
-        ).scalar() or Decimal('0')
-        
-        paid_invoices = self.db.query(InvoiceRequest).filter(
-            InvoiceRequest.status == InvoiceStatus.paid
-        ).count()
-        
-        invoice_success_rate = (paid_invoices / total_invoices * 100) if total_invoices > 0 else 0
+        invoice_success_rate = (self.current.paid_invoices / total_invoices * 100) if total_invoices > 0 else 0
         
         return {
             "total_invoices": {
                 "value": total_invoices,
-                "trend": self._calculate_trend(total_invoices, thirty_days_ago, InvoiceRequest)
+                "trend": self._calculate_trend("total_invoices")
             },
             "pending_invoices": {
                 "value": pending_invoices,
@@ -270,7 +160,7 @@ class AdminMetricsCalculator:
                 "value": overdue_invoices,
                 "status": "danger" if overdue_invoices > 0 else "normal"
             },
-            "monthly_invoice_volume": float(monthly_invoice_volume),
+            "monthly_invoice_volume": float(self.month.invoice_volume),
             "invoice_success_rate": {
                 "value": round(invoice_success_rate, 2),
                 "status": "normal" if invoice_success_rate >= 70 else "warning"
@@ -279,33 +169,17 @@ class AdminMetricsCalculator:
     
     def get_payment_metrics(self) -> Dict:
         """Calculate payment-related metrics"""
-        now = datetime.utcnow()
-        start_of_month = datetime(now.year, now.month, 1)
-        
-        total_payments = self.db.query(Payment).count()
-        successful_payments = self.db.query(Payment).filter(
-            Payment.status == PaymentStatus.COMPLETED
-        ).count()
-        
-        failed_payments = self.db.query(Payment).filter(
-            Payment.status == PaymentStatus.FAILED
-        ).count()
-        
-        monthly_payment_volume = self.db.query(func.sum(Payment.amount)).filter(
-            Payment.created_at >= start_of_month,
-            Payment.status == PaymentStatus.COMPLETED
-        ).scalar() or Decimal('0')
-        
-        pending_payments = self.db.query(Payment).filter(
-            Payment.status == PaymentStatus.PENDING
-        ).count()
+        total_payments = self.current.total_payments
+        successful_payments = self.current.completed_payments
+        failed_payments = self.current.failed_payments
+        pending_payments = self.current.pending_payments
         
         payment_success_rate = (successful_payments / total_payments * 100) if total_payments > 0 else 0
         
         return {
             "total_payments": {
                 "value": total_payments,
-                "trend": self._calculate_trend(total_payments, now - timedelta(days=30), Payment)
+                "trend": self._calculate_trend("total_payments")
             },
             "successful_payments": {
                 "value": successful_payments,
@@ -315,7 +189,7 @@ class AdminMetricsCalculator:
                 "value": failed_payments,
                 "status": "danger" if failed_payments > total_payments * 0.1 else "normal"
             },
-            "monthly_payment_volume": float(monthly_payment_volume),
+            "monthly_payment_volume": float(self.month.payment_volume),
             "pending_payments": {
                 "value": pending_payments,
                 "status": "warning" if pending_payments > total_payments * 0.2 else "normal"
@@ -328,39 +202,16 @@ class AdminMetricsCalculator:
     
     def get_restock_metrics(self) -> Dict:
         """Calculate restock and inventory management metrics"""
-        
-        # Get total products
-        total_products = self.db.query(Product).count()
-        
-        # Get pending restock requests
-        pending_requests = self.db.query(RestockRequest).filter(
-            RestockRequest.status == RestockRequestStatus.PENDING
-        ).count()
-        
-        # Get high priority requests
-        high_priority_requests = self.db.query(RestockRequest).filter(
-            RestockRequest.urgency == RestockRequestUrgency.HIGH,
-            RestockRequest.status == RestockRequestStatus.PENDING
-        ).count()
-        
-        # Get products with low stock
-        low_stock_items = self.db.query(Product).filter(
-            Product.quantity <= Product.low_stock_threshold,
-            Product.quantity > 0
-        ).count()
-        
-        # Get out of stock products
-        out_of_stock_items = self.db.query(Product).filter(
-            Product.quantity == 0
-        ).count()
-        
-        # Calculate trends comparing to 30 days ago
-        compare_date = datetime.utcnow() - timedelta(days=30)
+        total_products = self.current.total_products
+        pending_requests = self.current.pending_restock_requests
+        high_priority_requests = self.current.high_priority_restock_requests
+        low_stock_items = self.current.low_stock_in_stock_products
+        out_of_stock_items = self.current.out_of_stock_products
         
         return {
             "total_products": {
                 "value": total_products,
-                "trend": self._calculate_trend(total_products, compare_date, Product)
+                "trend": self._calculate_trend("total_products")
             },
             "pending_requests": {
                 "value": pending_requests,
@@ -381,7 +232,7 @@ class AdminMetricsCalculator:
         }
 
 async def get_all_metrics(db: Session) -> Dict:
-    """Get all metrics for the admin dashboard"""
+    """Get all metrics for the admin dashboard, read from the daily rollups"""
     calculator = AdminMetricsCalculator(db)
     
     return {
@@ -0,0 +1,139 @@
+#utils/cache_codec.py
+import enum
+import json
+import logging
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from config import CACHE_CODEC, CACHE_COMPRESSION, CACHE_COMPRESSION_THRESHOLD
+
+# Optional fast codecs/compressors; the cache falls back to stdlib json without them
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:
+    lz4_frame = None
+
+logger = logging.getLogger(__name__)
+
+# Every payload starts with one header byte: the codec id in the low two bits and the
+# compression id in the next two. All headers are ASCII control bytes, so entries written
+# before the header existed (plain JSON text) can still be told apart and read.
+CODEC_IDS = {"json": 1, "orjson": 2, "msgpack": 3}
+COMPRESSION_IDS = {"none": 0, "zstd": 1, "lz4": 2}
+
+class CacheCodecError(Exception):
+    """Raised when a cached payload cannot be decoded by this worker"""
+
+def _default(obj: Any) -> Any:
+    """Encode the non-native types that show up in route responses"""
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, enum.Enum):
+        return obj.value
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if hasattr(obj, 'model_dump'):
+        return obj.model_dump(mode='json')
+    raise TypeError(f"Object of type {type(obj).__name__} is not cacheable")
+
+def _json_dumps(value: Any) -> bytes:
+    return json.dumps(value, default=_default, separators=(',', ':')).encode()
+
+def _orjson_dumps(value: Any) -> bytes:
+    return orjson.dumps(value, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+def _msgpack_dumps(value: Any) -> bytes:
+    # datetime=False keeps datetimes going through _default, matching the JSON codecs
+    return msgpack.packb(value, default=_default, use_bin_type=True, datetime=False)
+
+def _msgpack_loads(data: bytes) -> Any:
+    return msgpack.unpackb(data, raw=False, strict_map_key=False)
+
+def _available_codecs() -> Dict[str, Tuple[Callable[[Any], bytes], Callable[[bytes], Any]]]:
+    codecs = {"json": (_json_dumps, json.loads)}
+    if orjson is not None:
+        codecs["orjson"] = (_orjson_dumps, orjson.loads)
+    if msgpack is not None:
+        codecs["msgpack"] = (_msgpack_dumps, _msgpack_loads)
+    return codecs
+
+def _available_compressors() -> Dict[str, Tuple[Callable[[bytes], bytes], Callable[[bytes], bytes]]]:
+    compressors = {}
+    if zstandard is not None:
+        compressors["zstd"] = (zstandard.ZstdCompressor(level=3).compress,
+                               zstandard.ZstdDecompressor().decompress)
+    if lz4_frame is not None:
+        compressors["lz4"] = (lz4_frame.compress, lz4_frame.decompress)
+    return compressors
+
+class CacheCodec:
+    """Encodes cached values to versioned, optionally compressed bytes and back"""
+
+    def __init__(self, codec: str = "orjson", compression: str = "none", threshold: int = 4096):
+        self.codecs = _available_codecs()
+        self.compressors = _available_compressors()
+
+        if codec not in CODEC_IDS:
+            raise ValueError(f"Unknown cache codec: {codec}")
+        if codec not in self.codecs:
+            logger.warning(f"Cache codec '{codec}' is not installed, falling back to json")
+            codec = "json"
+        if compression not in COMPRESSION_IDS:
+            raise ValueError(f"Unknown cache compression: {compression}")
+        if compression != "none" and compression not in self.compressors:
+            logger.warning(f"Cache compression '{compression}' is not installed, storing uncompressed")
+            compression = "none"
+
+        self.codec = codec
+        self.compression = compression
+        self.threshold = threshold
+
+    def encode(self, value: Any) -> bytes:
+        dumps, _ = self.codecs[self.codec]
+        body = dumps(value)
+        compression = "none"
+        if self.compression != "none" and len(body) >= self.threshold:
+            compress, _ = self.compressors[self.compression]
+            body = compress(body)
+            compression = self.compression
+        header = CODEC_IDS[self.codec] | (COMPRESSION_IDS[compression] << 2)
+        return bytes((header,)) + body
+
+    def decode(self, data: bytes) -> Any:
+        header = data[0]
+        if header >= 0x20:
+            # Legacy entry stored as bare JSON text
+            return json.loads(data)
+
+        codec = _name_for(CODEC_IDS, header & 0b11)
+        compression = _name_for(COMPRESSION_IDS, (header >> 2) & 0b11)
+        if codec not in self.codecs or (compression != "none" and compression not in self.compressors):
+            raise CacheCodecError(f"Cannot decode cache payload with header {header:#04x}")
+
+        body = data[1:]
+        if compression != "none":
+            _, decompress = self.compressors[compression]
+            body = decompress(body)
+        _, loads = self.codecs[codec]
+        return loads(body)
+
+def _name_for(ids: Dict[str, int], value: int) -> Optional[str]:
+    return next((name for name, id_ in ids.items() if id_ == value), None)
+
+cache_codec = CacheCodec(CACHE_CODEC, CACHE_COMPRESSION, CACHE_COMPRESSION_THRESHOLD)
@@ -1,5 +1,6 @@
 #utils/cache_constants.py
 from enum import Enum
+from typing import List
 
 class CacheNamespace(str, Enum):
     ACCOUNT = "account"
@@ -17,6 +18,10 @@ class CacheNamespace(str, Enum):
     FEEDBACK = "feedback"
     RESTOCK = "restock"
 
+    def __str__(self) -> str:
+        # Format as the bare value so keys read "account:user:5:list" on every Python version
+        return self.value
+
 CACHE_KEYS = {
     # Account related keys
     "user_accounts": lambda user_id: f"{CacheNamespace.ACCOUNT}:user:{user_id}:list",
@@ -24,6 +29,7 @@ CACHE_KEYS = {
     "account_by_type": lambda user_id, account_type: f"{CacheNamespace.ACCOUNT}:user:{user_id}:type:{account_type}",
     
     # Transaction related keys
+    "user_transactions": lambda user_id, user_view: f"{CacheNamespace.TRANSACTION}:user:{user_id}:view:{user_view}",
     "account_transactions": lambda account_id: f"{CacheNamespace.TRANSACTION}:account:{account_id}:list",
     "transaction_detail": lambda transaction_id: f"{CacheNamespace.TRANSACTION}:id:{transaction_id}",
     
@@ -62,6 +68,8 @@ CACHE_KEYS = {
     # Marketplace related keys
     "marketplace_orders": lambda: f"{CacheNamespace.MARKETPLACE}:orders",
     "marketplace_order": lambda order_id: f"{CacheNamespace.MARKETPLACE}:order:{order_id}",
+    "marketplace_products": lambda: f"{CacheNamespace.MARKETPLACE}:products",
+    "marketplace_stores": lambda: f"{CacheNamespace.MARKETPLACE}:stores",
     
     # Dashboard related keys
     "user_dashboard": lambda user_id: f"{CacheNamespace.DASHBOARD}:user:{user_id}:stats",
@@ -70,6 +78,7 @@ CACHE_KEYS = {
     # Feedback related keys
     "user_feedback": lambda user_id: f"{CacheNamespace.FEEDBACK}:user:{user_id}:list",
     "feedback_detail": lambda feedback_id: f"{CacheNamespace.FEEDBACK}:id:{feedback_id}",
+    "admin_feedback_list": lambda: f"{CacheNamespace.FEEDBACK}:admin:list",
     
     # Restock related keys
     "restock_requests": lambda user_id: f"{CacheNamespace.RESTOCK}:user:{user_id}:list",
@@ -86,3 +95,40 @@ ADMIN_CACHE_KEYS = {
     "all_restock_requests": lambda status=None: f"admin:restock:all:{status or 'all'}",
     "restock_detail": lambda request_id: f"admin:restock:detail:{request_id}"
 }
+
+# Tag index: every cached key is registered in a Redis sorted set per tag, scored by when the
+# key expires, so that invalidation reads the set instead of scanning the keyspace with KEYS
+# and expired members can be pruned as new ones are added.
+CACHE_TAG_PREFIX = "tags"
+
+def cache_tag_key(tag: str) -> str:
+    """Redis key of the sorted set that indexes all cache keys carrying `tag`"""
+    return f"{CACHE_TAG_PREFIX}:{tag}"
+
+def cache_tags_for_key(key: str) -> List[str]:
+    """
+    Derive the tags a cache key is indexed under from the CACHE_KEYS scheme
+    `{namespace}:{kind}:{id}:...`, e.g. "account:user:5:id:7" is tagged
+    "account", "account:user:5" and "account:id:7".
+    """
+    parts = key.split(":")
+    namespace = parts[0]
+    tags = [namespace]
+    for i in range(1, len(parts) - 1, 2):
+        tags.append(f"{namespace}:{parts[i]}:{parts[i + 1]}")
+    return tags
+
+def cache_tag_for_pattern(pattern: str) -> str:
+    """
+    Map a glob-style invalidation pattern onto the tag that indexes the same
+    keys: trailing wildcards are stripped and wildcard segments dropped, so
+    "account:user:5:*" -> "account:user:5" and "account:*:id:7" -> "account:id:7".
+    """
+    parts = [part for part in pattern.rstrip("*").rstrip(":").split(":") if part != "*"]
+    return ":".join(parts)
+
+# Short-lived Redis locks that let one worker recompute a missed key while the others wait
+CACHE_LOCK_PREFIX = "lock"
+
+def cache_lock_key(key: str) -> str:
+    return f"{CACHE_LOCK_PREFIX}:{key}"
@@ -1,13 +1,226 @@
 #utils/cache_decorators.py
+import asyncio
+import enum
+import hashlib
+import inspect
+import json
+import logging
+import math
+import random
+import time
+from datetime import date, datetime
 from functools import wraps
-from typing import List, Optional, Callable
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from fastapi import params as fastapi_params
 from utils.cache_constants import CacheNamespace
 from utils.cache_manager import cache_manager
+from utils.cache_metrics import CACHE_RESPONSES, namespace_of
 from utils.redis_cache import redis_cache
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+from models import User
+from sql_database import SessionLocal, AsyncSessionLocal
+from utils.read_replica import REPLICA_ENABLED
+from config import CACHE_LOCK_TIMEOUT, CACHE_LOCK_POLL_INTERVAL, READ_YOUR_WRITES_WINDOW
 
-def cache_response(expire: int = 3600, include_user_id: bool = True):
-    """Enhanced caching decorator with user isolation"""
+logger = logging.getLogger(__name__)
+
+# Cache keys currently being recomputed in this worker, so concurrent misses share one computation
+_inflight_requests: Dict[str, asyncio.Future] = {}
+# Background stale-while-revalidate refreshes running in this worker
+_refresh_tasks: Dict[str, asyncio.Task] = {}
+# Repeat invalidations waiting out the read replica's lag
+_delayed_invalidations = set()
+
+class _LeaderCancelled(Exception):
+    """The request computing an in-flight key was cancelled before it finished"""
+
+def _canonical(value: Any) -> Any:
+    """JSON fallback that renders parameter values identically across requests and workers"""
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+def build_cache_key(func_name: str, bound_params: Dict[str, Any], user_id: Optional[int],
+                    namespace: Optional[CacheNamespace] = None,
+                    key: Optional[Callable[..., str]] = None) -> Tuple[str, str]:
+    """
+    Build a deterministic cache key from the route's cacheable parameters.
+
+    The key is `{base}:{digest}`, where `base` follows the CACHE_KEYS scheme so that
+    CacheManager invalidations reach it:
+      - with `key` (a CACHE_KEYS entry), its required arguments are filled by name from
+        the route parameters, `user_id` falling back to the current user;
+      - otherwise `{namespace}:user:{user_id}:{func_name}`, or `{namespace}:{func_name}`
+        for anonymous/shared responses.
+    The digest hashes the function name and the parameters not already in `base`.
+    Returns the cache key and its base, which is also registered as a tag.
+    """
+    remaining = {name: value for name, value in bound_params.items() if value is not None}
+
+    if key is not None:
+        key_args = []
+        for name, param in inspect.signature(key).parameters.items():
+            if param.default is not inspect.Parameter.empty:
+                continue
+            if name in remaining:
+                key_args.append(remaining.pop(name))
+            elif name == 'user_id':
+                key_args.append(user_id)
+                user_id = None
+        base = key(*key_args)
+        # Entity keys (e.g. invoice:id:5) are shared across users; keep responses per user
+        if user_id is not None:
+            remaining['user_id'] = user_id
+    elif user_id is not None:
+        base = f"{namespace}:user:{user_id}:{func_name}"
+    else:
+        base = f"{namespace}:{func_name}"
+
+    material = json.dumps([func_name, remaining], sort_keys=True, default=_canonical)
+    digest = hashlib.sha1(material.encode()).hexdigest()[:16]
+    return f"{base}:{digest}", base
+
+async def _compute_and_store(cache_key: str, expire: int, stale_ttl: Optional[int], tags: List[str],
+                             compute: Callable[[], Awaitable[Any]]) -> Tuple[Any, Any]:
+    """
+    Run the handler and cache its result. Stale-while-revalidate entries are stored as
+    {"value", "created_at", "compute_time"} and kept `stale_ttl` seconds past `expire`.
+    """
+    started = time.monotonic()
+    response = await compute()
+    compute_time = time.monotonic() - started
+
+    if stale_ttl is None:
+        return response, await redis_cache.set(cache_key, response, expire, tags=tags)
+
+    value = redis_cache.serialize(response)
+    entry = {"value": value, "created_at": time.time(), "compute_time": compute_time}
+    await redis_cache.set(cache_key, entry, expire + stale_ttl, tags=tags)
+    return response, value
+
+def _needs_refresh(entry: Dict, expire: int, beta: float) -> bool:
+    """
+    XFetch early expiry: refresh with a probability that grows as the entry nears expiry,
+    scaled by how long it took to compute. Always true once the entry is stale.
+    """
+    gap = -entry["compute_time"] * beta * math.log(1.0 - random.random())
+    return time.time() + gap >= entry["created_at"] + expire
+
+async def _refresh(cache_key: str, expire: int, stale_ttl: int, tags: List[str],
+                   func: Callable, args: tuple, kwargs: dict) -> None:
+    """Recompute a stale entry in the background on a session of its own"""
+    token = await redis_cache.acquire_lock(cache_key, CACHE_LOCK_TIMEOUT)
+    if token is None:
+        return  # another worker is already refreshing this key
+
+    # The request's session is closed once its response is sent
+    db = None
+    if isinstance(kwargs.get('db'), AsyncSession):
+        db = AsyncSessionLocal()
+    elif 'db' in kwargs:
+        db = SessionLocal()
+    try:
+        if db is not None:
+            kwargs = {**kwargs, 'db': db}
+            # The request's user went with its session: run the handler on this session's copy
+            for name, value in list(kwargs.items()):
+                if isinstance(value, User):
+                    user = (await db.get(User, value.id) if isinstance(db, AsyncSession)
+                            else await run_in_threadpool(db.get, User, value.id))
+                    if user is None:
+                        return  # deleted since the request; let the entry expire
+                    kwargs[name] = user
+        await _compute_and_store(cache_key, expire, stale_ttl, tags, lambda: func(*args, **kwargs))
+    except Exception as e:
+        logger.error(f"Error refreshing cache key {cache_key}: {str(e)}")
+    finally:
+        if isinstance(db, AsyncSession):
+            await db.close()
+        elif db is not None:
+            db.close()
+        await redis_cache.release_lock(cache_key, token)
+
+def _schedule_refresh(cache_key: str, expire: int, stale_ttl: int, tags: List[str],
+                      func: Callable, args: tuple, kwargs: dict) -> None:
+    if cache_key in _refresh_tasks or cache_key in _inflight_requests:
+        return
+    task = asyncio.create_task(_refresh(cache_key, expire, stale_ttl, tags, func, args, kwargs))
+    _refresh_tasks[cache_key] = task
+    task.add_done_callback(lambda _: _refresh_tasks.pop(cache_key, None))
+
+async def _wait_for_fill(cache_key: str) -> Optional[Any]:
+    """Poll until the worker holding the recompute lock fills the key, or the lock goes away"""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + CACHE_LOCK_TIMEOUT
+    while loop.time() < deadline:
+        await asyncio.sleep(CACHE_LOCK_POLL_INTERVAL)
+        cached_response = await redis_cache.get(cache_key)
+        if cached_response is not None:
+            return cached_response
+        if not await redis_cache.is_locked(cache_key):
+            return None
+    return None
+
+async def _fill_cache(cache_key: str, expire: int, stale_ttl: Optional[int], tags: List[str],
+                      compute: Callable[[], Awaitable[Any]]) -> Tuple[Any, Any]:
+    """
+    Compute and cache a missed key, letting only one worker across the fleet do the work.
+    Returns the handler response and its cached (JSON-compatible) form.
+    """
+    token = await redis_cache.acquire_lock(cache_key, CACHE_LOCK_TIMEOUT)
+    if token is None:
+        cached_response = await _wait_for_fill(cache_key)
+        if cached_response is not None:
+            if stale_ttl is not None:
+                cached_response = cached_response["value"]
+            return cached_response, cached_response
+        # The lock holder failed or timed out; take over (or compute unlocked as a last resort)
+        token = await redis_cache.acquire_lock(cache_key, CACHE_LOCK_TIMEOUT)
+
+    try:
+        return await _compute_and_store(cache_key, expire, stale_ttl, tags, compute)
+    finally:
+        if token is not None:
+            await redis_cache.release_lock(cache_key, token)
+
+def cache_response(expire: int = 3600, include_user_id: bool = True,
+                   namespace: Optional[CacheNamespace] = None,
+                   key: Optional[Callable[..., str]] = None,
+                   key_params: Optional[List[str]] = None,
+                   stale_ttl: Optional[int] = None, early_refresh_beta: float = 1.0):
+    """
+    Enhanced caching decorator with user isolation
+
+    Args:
+        expire: Seconds a cached response is fresh
+        include_user_id: Scope the cache key to the current user
+        namespace: CacheNamespace the key lives in (when no `key` is given)
+        key: CACHE_KEYS entry used as the key base, so its invalidations reach this cache
+        key_params: Route parameters that vary the response; defaults to every parameter
+            that is not a dependency (db sessions and users are never part of the key)
+        stale_ttl: Opt-in stale-while-revalidate window; expired responses are served for
+            this many extra seconds while a background task recomputes them
+        early_refresh_beta: XFetch weight for refreshing before expiry (stale_ttl mode only);
+            higher values refresh earlier
+    """
     def decorator(func):
+        signature = inspect.signature(func)
+        if key is not None:
+            unresolved = [
+                name for name, param in inspect.signature(key).parameters.items()
+                if param.default is inspect.Parameter.empty
+                and name not in signature.parameters and name != 'user_id'
+            ]
+            if unresolved:
+                raise ValueError(f"Cache key for {func.__name__} needs unknown parameters: {unresolved}")
+        cacheable_params = key_params if key_params is not None else [
+            name for name, param in signature.parameters.items()
+            if not isinstance(param.default, fastapi_params.Depends)
+        ]
+
         @wraps(func)
         async def wrapper(*args, **kwargs):
             # Extract user_id from current_user if present
@@ -18,19 +231,59 @@ def cache_response(expire: int = 3600, include_user_id: bool = True):
                     user_id = getattr(current_user, 'id', None)
             
             # Generate cache key
-            base_key = f"{func.__name__}:{str(args)}:{str(kwargs)}"
-            cache_key = f"user:{user_id}:{base_key}" if user_id else base_key
+            arguments = signature.bind_partial(*args, **kwargs).arguments
+            bound_params = {name: arguments.get(name) for name in cacheable_params}
+            cache_key, base_key = build_cache_key(func.__name__, bound_params, user_id, namespace, key)
+            tags = [base_key]
             
+            cache_namespace = namespace_of(cache_key)
+
             # Try to get cached response
             cached_response = await redis_cache.get(cache_key)
             if cached_response is not None:
-                return cached_response
+                if stale_ttl is None:
+                    CACHE_RESPONSES.labels(cache_namespace, "hit").inc()
+                    return cached_response
+                stale = time.time() >= cached_response["created_at"] + expire
+                CACHE_RESPONSES.labels(cache_namespace, "stale" if stale else "hit").inc()
+                if _needs_refresh(cached_response, expire, early_refresh_beta):
+                    _schedule_refresh(cache_key, expire, stale_ttl, tags, func, args, kwargs)
+                return cached_response["value"]
             
-            # Execute function and cache response
-            response = await func(*args, **kwargs)
-            await redis_cache.set(cache_key, response, expire)
-            
-            return response
+            # Join an in-flight computation of the same key in this worker. If the request
+            # computing it is cancelled, the first waiter to wake takes over the computation
+            # and the others join that one instead of failing with it.
+            inflight = _inflight_requests.get(cache_key)
+            if inflight is not None:
+                CACHE_RESPONSES.labels(cache_namespace, "coalesced").inc()
+            while inflight is not None:
+                try:
+                    return await asyncio.shield(inflight)
+                except _LeaderCancelled:
+                    inflight = _inflight_requests.get(cache_key)
+
+            CACHE_RESPONSES.labels(cache_namespace, "miss").inc()
+
+            future = asyncio.get_running_loop().create_future()
+            _inflight_requests[cache_key] = future
+            try:
+                # Execute function and cache response
+                response, cached_response = await _fill_cache(
+                    cache_key, expire, stale_ttl, tags, lambda: func(*args, **kwargs)
+                )
+                future.set_result(cached_response)
+                return response
+            except asyncio.CancelledError:
+                future.set_exception(_LeaderCancelled())
+                future.exception()
+                raise
+            except Exception as e:
+                future.set_exception(e)
+                # Mark the exception retrieved in case no request was waiting on it
+                future.exception()
+                raise
+            finally:
+                del _inflight_requests[cache_key]
             
         return wrapper
     return decorator
@@ -58,17 +311,37 @@ def invalidate_cache(namespaces: List[CacheNamespace],
                 user = kwargs[user_id_arg]
                 user_id = user.id if hasattr(user, 'id') else user
             
-            # Invalidate cache for specified namespaces
-            if user_id:
-                cache_manager.invalidate_user_cache(user_id, namespaces)
-            
-            # Invalidate any custom cache keys
-            if custom_keys:
-                for key_func in custom_keys:
-                    key = key_func(result) if result else None
-                    if key:
-                        cache_manager.invalidate_by_pattern(key)
+            # Any custom cache keys, from the result
+            keys = []
+            for key_func in custom_keys or []:
+                key = key_func(result) if result else None
+                if key:
+                    keys.append(key)
+
+            await _invalidate(user_id, namespaces, keys)
+
+            # A read served by a lagging replica in the meantime could have cached the old
+            # data again; repeat once the replica has caught up
+            if REPLICA_ENABLED:
+                task = asyncio.create_task(_invalidate_later(user_id, namespaces, keys))
+                _delayed_invalidations.add(task)
+                task.add_done_callback(_delayed_invalidations.discard)
             
             return result
         return wrapper
-    return decorator
\ No newline at end of file
+    return decorator
+
+async def _invalidate(user_id: Optional[int], namespaces: List[CacheNamespace], keys: List[str]) -> None:
+    # Invalidate cache for specified namespaces
+    if user_id:
+        await cache_manager.invalidate_user_cache(user_id, namespaces)
+    
+    for key in keys:
+        await cache_manager.invalidate_by_pattern(key)
+
+async def _invalidate_later(user_id: Optional[int], namespaces: List[CacheNamespace], keys: List[str]) -> None:
+    await asyncio.sleep(READ_YOUR_WRITES_WINDOW)
+    try:
+        await _invalidate(user_id, namespaces, keys)
+    except Exception as e:
+        logger.warning(f"Delayed cache invalidation failed: {e}")
\ No newline at end of file
@@ -1,39 +1,60 @@
 #utils/cache_manager.py
-import redis
 from typing import List, Optional
-import os
-from utils.cache_constants import CacheNamespace
-from config import REDIS_CLIENT
+from utils.cache_constants import CacheNamespace, cache_tag_key, cache_tag_for_pattern
+from utils.redis_cache import redis_cache
+from utils.cache_metrics import CACHE_INVALIDATIONS, CACHE_INVALIDATED_KEYS, CACHE_LATENCY, namespace_of
+from config import REDIS_ASYNC_CLIENT
+
+# Number of keys deleted per pipelined DEL when flushing a tag
+INVALIDATION_BATCH_SIZE = 500
 
 class CacheManager:
     def __init__(self):
-        self.redis_client = REDIS_CLIENT
+        self.redis_client = REDIS_ASYNC_CLIENT
+
+    async def invalidate_tag(self, tag: str) -> int:
+        """Delete every key indexed under `tag` (and a key literally named `tag`)"""
+        tag_key = cache_tag_key(tag)
+        with CACHE_LATENCY.labels("invalidate").time():
+            keys = await redis_cache.tag_members(tag_key)
+            # Exact-key patterns map onto a tag equal to the key itself
+            deleted = await self.redis_client.delete(tag)
+
+            for i in range(0, len(keys), INVALIDATION_BATCH_SIZE):
+                batch = keys[i:i + INVALIDATION_BATCH_SIZE]
+                async with self.redis_client.pipeline(transaction=False) as pipe:
+                    pipe.delete(*batch)
+                    # Only drop the members we deleted so keys tagged concurrently stay indexed
+                    pipe.zrem(tag_key, *batch)
+                    deleted += (await pipe.execute())[0]
+
+            # Evict the same keys from every worker's in-process cache
+            await redis_cache.publish_invalidation(keys + [tag])
+
+        namespace = namespace_of(tag)
+        CACHE_INVALIDATIONS.labels(namespace).inc()
+        CACHE_INVALIDATED_KEYS.labels(namespace).observe(deleted)
+        return deleted
 
-    def invalidate_by_pattern(self, pattern: str) -> int:
-        """Delete all keys matching the pattern or a list of patterns"""
+    async def invalidate_by_pattern(self, pattern: str) -> int:
+        """Delete all keys matching the pattern or a list of patterns via the tag index"""
         if isinstance(pattern, list):
             total_deleted = 0
             for pat in pattern:
-                keys = self.redis_client.keys(pat)
-                if keys:
-                    total_deleted += self.redis_client.delete(*keys)
+                total_deleted += await self.invalidate_tag(cache_tag_for_pattern(pat))
             return total_deleted
-        else:
-            keys = self.redis_client.keys(pattern)
-            if keys:
-                return self.redis_client.delete(*keys)
-            return 0
+        return await self.invalidate_tag(cache_tag_for_pattern(pattern))
 
-    def invalidate_user_cache(self, user_id: int, namespaces: Optional[List[CacheNamespace]] = None) -> None:
+    async def invalidate_user_cache(self, user_id: int, namespaces: Optional[List[CacheNamespace]] = None) -> None:
         """Invalidate all cache entries for a specific user"""
         if namespaces is None:
             namespaces = list(CacheNamespace)
         
         for namespace in namespaces:
             pattern = f"{namespace}:user:{user_id}:*"
-            self.invalidate_by_pattern(pattern)
+            await self.invalidate_by_pattern(pattern)
 
-    def invalidate_account_cache(self, account_id: int) -> None:
+    async def invalidate_account_cache(self, account_id: int) -> None:
         """Invalidate all cache entries related to an account"""
         patterns = [
             f"{CacheNamespace.ACCOUNT}:*:id:{account_id}",
@@ -41,9 +62,9 @@ class CacheManager:
             f"{CacheNamespace.PAYMENT}:account:{account_id}:*"
         ]
         for pattern in patterns:
-            self.invalidate_by_pattern(pattern)
+            await self.invalidate_by_pattern(pattern)
 
-    def invalidate_transaction_cache(self, transaction_id: int, account_id: int) -> None:
+    async def invalidate_transaction_cache(self, transaction_id: int, account_id: int) -> None:
         """Invalidate transaction-related caches"""
         patterns = [
             f"{CacheNamespace.TRANSACTION}:id:{transaction_id}",
@@ -51,18 +72,18 @@ class CacheManager:
             f"{CacheNamespace.ACCOUNT}:*"  # Invalidate account caches as balance changes
         ]
         for pattern in patterns:
-            self.invalidate_by_pattern(pattern)
+            await self.invalidate_by_pattern(pattern)
 
-    def invalidate_pool_cache(self, pool_id: int, user_id: int) -> None:
+    async def invalidate_pool_cache(self, pool_id: int, user_id: int) -> None:
         """Invalidate pool-related caches"""
         patterns = [
             f"{CacheNamespace.POOL}:id:{pool_id}",
             f"{CacheNamespace.POOL}:user:{user_id}:*"
         ]
         for pattern in patterns:
-            self.invalidate_by_pattern(pattern)
+            await self.invalidate_by_pattern(pattern)
 
-    def invalidate_product_cache(self, product_id: int, user_id: int) -> None:
+    async def invalidate_product_cache(self, product_id: int, user_id: int) -> None:
         """Invalidate all cache entries related to a product"""
         patterns = [
             f"{CacheNamespace.INVENTORY}:product:{product_id}*",
@@ -70,9 +91,9 @@ class CacheManager:
             f"{CacheNamespace.STOREFRONT}:user:{user_id}:products"
         ]
         for pattern in patterns:
-            self.invalidate_by_pattern(pattern)
+            await self.invalidate_by_pattern(pattern)
 
-    def invalidate_order_cache(self, order_id: int, user_id: int) -> None:
+    async def invalidate_order_cache(self, order_id: int, user_id: int) -> None:
         """Invalidate order-related caches"""
         patterns = [
             f"{CacheNamespace.ORDER}:id:{order_id}*",
@@ -80,9 +101,9 @@ class CacheManager:
             f"{CacheNamespace.DASHBOARD}:user:{user_id}:*"
         ]
         for pattern in patterns:
-            self.invalidate_by_pattern(pattern)
+            await self.invalidate_by_pattern(pattern)
 
-    def invalidate_invoice_cache(self, invoice_id: int, user_id: int) -> None:
+    async def invalidate_invoice_cache(self, invoice_id: int, user_id: int) -> None:
         """Invalidate invoice-related caches"""
         patterns = [
             f"{CacheNamespace.INVOICE}:id:{invoice_id}*",
@@ -90,17 +111,17 @@ class CacheManager:
             f"{CacheNamespace.DASHBOARD}:user:{user_id}:*"
         ]
         for pattern in patterns:
-            self.invalidate_by_pattern(pattern)
+            await self.invalidate_by_pattern(pattern)
 
-    def invalidate_marketplace_cache(self, order_id: Optional[int] = None) -> None:
+    async def invalidate_marketplace_cache(self, order_id: Optional[int] = None) -> None:
         """Invalidate marketplace-related caches"""
         patterns = [f"{CacheNamespace.MARKETPLACE}:orders"]
         if order_id:
             patterns.append(f"{CacheNamespace.MARKETPLACE}:order:{order_id}")
         for pattern in patterns:
-            self.invalidate_by_pattern(pattern)
+            await self.invalidate_by_pattern(pattern)
 
-    def invalidate_restock_cache(self, request_id: int, user_id: int) -> None:
+    async def invalidate_restock_cache(self, request_id: int, user_id: int) -> None:
         """Invalidate restock-related caches"""
         patterns = [
             f"{CacheNamespace.RESTOCK}:id:{request_id}",
@@ -108,6 +129,6 @@ class CacheManager:
             f"{CacheNamespace.INVENTORY}:user:{user_id}:products"
         ]
         for pattern in patterns:
-            self.invalidate_by_pattern(pattern)
+            await self.invalidate_by_pattern(pattern)
 
 cache_manager = CacheManager()
\ No newline at end of file
@@ -0,0 +1,80 @@
+#utils/cache_metrics.py
+import random
+from typing import Dict, List, Tuple
+from prometheus_client import CollectorRegistry, Counter, Histogram, multiprocess
+from prometheus_client.core import GaugeMetricFamily, REGISTRY
+from utils.cache_constants import CacheNamespace
+from config import CACHE_HOT_KEY_SAMPLE_RATE, CACHE_HOT_KEY_TOP_N, PROMETHEUS_MULTIPROC_DIR
+
+# Label values are limited to the known namespaces so a bad key can't explode cardinality
+_NAMESPACES = {namespace.value for namespace in CacheNamespace} | {"admin"}
+
+def namespace_of(key: str) -> str:
+    namespace = key.split(":", 1)[0]
+    return namespace if namespace in _NAMESPACES else "other"
+
+CACHE_HITS = Counter("cache_hits_total", "Cache hits", ["namespace", "tier"])
+CACHE_MISSES = Counter("cache_misses_total", "Cache misses (after both tiers)", ["namespace"])
+CACHE_SETS = Counter("cache_sets_total", "Cache writes", ["namespace"])
+CACHE_SET_BYTES = Counter("cache_set_bytes_total", "Encoded bytes written to the cache", ["namespace"])
+CACHE_INVALIDATIONS = Counter("cache_invalidations_total", "Tag invalidations", ["namespace"])
+CACHE_INVALIDATED_KEYS = Histogram(
+    "cache_invalidated_keys", "Keys deleted per tag invalidation", ["namespace"],
+    buckets=(0, 1, 5, 10, 50, 100, 500, 1000, 5000)
+)
+CACHE_LATENCY = Histogram(
+    "cache_operation_seconds", "Latency of cache operations", ["operation"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+)
+# How cache_response served each request: hit, stale, coalesced (joined another computation) or miss
+CACHE_RESPONSES = Counter("cache_responses_total", "Cached route responses by outcome", ["namespace", "outcome"])
+
+class HotKeyTracker:
+    """Counts a random sample of cache reads to report the most requested keys"""
+
+    def __init__(self, sample_rate: float, top_n: int):
+        self.sample_rate = sample_rate
+        self.top_n = top_n
+        self.max_tracked = max(top_n * 20, 100)
+        self.counts: Dict[str, int] = {}
+
+    def record(self, key: str) -> None:
+        if self.sample_rate <= 0 or random.random() >= self.sample_rate:
+            return
+        self.counts[key] = self.counts.get(key, 0) + 1
+        if len(self.counts) > self.max_tracked:
+            # Keep the leaders and halve their counts so the report follows current traffic
+            leaders = sorted(self.counts.items(), key=lambda item: item[1], reverse=True)[:self.max_tracked // 2]
+            self.counts = {tracked: count // 2 for tracked, count in leaders if count > 1}
+
+    def top(self) -> List[Tuple[str, int]]:
+        """Top keys with their estimated read counts"""
+        leaders = sorted(self.counts.items(), key=lambda item: item[1], reverse=True)[:self.top_n]
+        return [(key, round(count / self.sample_rate)) for key, count in leaders]
+
+hot_keys = HotKeyTracker(CACHE_HOT_KEY_SAMPLE_RATE, CACHE_HOT_KEY_TOP_N)
+
+class HotKeyCollector:
+    """Exposes the sampled top-N keys as a gauge on /metrics"""
+
+    def collect(self):
+        gauge = GaugeMetricFamily("cache_hot_key_reads", "Estimated reads of the hottest cache keys", labels=["key"])
+        for key, count in hot_keys.top():
+            gauge.add_metric([key], count)
+        yield gauge
+
+REGISTRY.register(HotKeyCollector())
+
+def scrape_registry() -> CollectorRegistry:
+    """
+    The registry /metrics serves. Each worker process has its own metric values, so with several
+    workers they are written to PROMETHEUS_MULTIPROC_DIR and summed across workers on every scrape
+    (gauges by their multiprocess_mode). The hot keys are sampled per process: a scrape reports
+    those of the worker that served it.
+    """
+    if not PROMETHEUS_MULTIPROC_DIR:
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry, path=PROMETHEUS_MULTIPROC_DIR)
+    registry.register(HotKeyCollector())
+    return registry
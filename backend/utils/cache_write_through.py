@@ -0,0 +1,122 @@
+#utils/cache_write_through.py
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+from models import BankAccount, FinancialPool, Payment, Transaction
+from utils.cache_constants import CACHE_KEYS, cache_tag_key
+from utils.cache_decorators import build_cache_key
+from utils.pagination import encode_cursor
+from utils.redis_cache import redis_cache, ModelSerializer, RELATIONSHIP_CONFIG
+from config import PAGE_SIZE_DEFAULT
+
+# Collections embedded in a cached account, and how many rows each keeps
+EMBEDDED_LIMITS = {name: config['limit'] for name, config in RELATIONSHIP_CONFIG[BankAccount].items()
+                   if isinstance(config, dict) and 'limit' in config}
+
+def transaction_row(transaction: Transaction) -> Dict:
+    """A transaction as listed by GET /banking/transactions"""
+    return {
+        "id": transaction.id,
+        "type": transaction.type.value.lower(),
+        "amount": transaction.amount,
+        "description": transaction.description,
+        "reference": transaction.reference,
+        "tag": transaction.tag.value.lower(),
+        "date": transaction.created_at.isoformat(),
+        "payment_id": transaction.payment_id
+    }
+
+def snapshot_account_change(account: BankAccount, pools: Iterable[Optional[FinancialPool]] = (),
+                            transaction: Optional[Transaction] = None,
+                            payment: Optional[Payment] = None) -> Dict:
+    """
+    Capture what a money movement changed on `account`, after flush and before commit
+    (while the rows are still loaded), so its cached views can be patched once committed.
+    Bumps the account's version, which commits with the change and orders its patches.
+    """
+    account.version = (account.version or 0) + 1
+    serialized_payment = ModelSerializer._serialize_model(payment) if payment is not None else None
+    return {
+        "user_id": account.user_id,
+        "account_id": account.id,
+        "account_type": account.account_type,
+        "version": account.version,
+        "balance": account.balance,
+        "pools": {pool.id: pool.balance for pool in pools if pool is not None},
+        "transactions": ModelSerializer._serialize_model(transaction) if transaction is not None else None,
+        "transaction_row": transaction_row(transaction) if transaction is not None else None,
+        "outgoing_payments": serialized_payment if payment is not None and payment.from_account_id == account.id else None,
+        "incoming_payments": serialized_payment if payment is not None and payment.to_account_id == account.id else None,
+    }
+
+def _prepend(rows: List[Dict], row: Dict, limit: int) -> List[Dict]:
+    return ([row] + [existing for existing in rows if existing.get("id") != row["id"]])[:limit]
+
+def _patch_account(entry: Dict, change: Dict) -> None:
+    entry["balance"] = change["balance"]
+    for pool in entry.get("pools") or []:
+        if pool.get("id") in change["pools"]:
+            pool["balance"] = change["pools"][pool["id"]]
+    for name, limit in EMBEDDED_LIMITS.items():
+        if change.get(name) is not None and isinstance(entry.get(name), list):
+            entry[name] = _prepend(entry[name], change[name], limit)
+
+def _account_patcher(change: Dict):
+    def mutate(value: Any) -> Optional[Any]:
+        entries = value if isinstance(value, list) else [value]
+        for entry in entries:
+            if not isinstance(entry, dict):
+                return None
+            if entry.get("id") == change["account_id"]:
+                # Only the version right before this change can be patched: a cached copy that
+                # missed a change, or already has this one or a later one, is dropped instead
+                if entry.get("version") != change["version"] - 1:
+                    return None
+                _patch_account(entry, change)
+                entry["version"] = change["version"]
+        return value
+    return mutate
+
+def _transactions_patcher(row: Dict):
+    def mutate(value: Any) -> Optional[Any]:
+        if not isinstance(value, dict) or not isinstance(value.get("items"), list):
+            return None
+        items = [row] + [existing for existing in value["items"] if existing.get("id") != row["id"]]
+        if len(items) > PAGE_SIZE_DEFAULT:
+            # The new row pushes the oldest one onto the next page
+            items = items[:PAGE_SIZE_DEFAULT]
+            last = items[-1]
+            value["next_cursor"] = encode_cursor(datetime.fromisoformat(last["date"]), last["id"])
+        value["items"] = items
+        return value
+    return mutate
+
+async def _tag_members(tag: str) -> List[str]:
+    return await redis_cache.tag_members(cache_tag_key(tag))
+
+async def write_through_account_change(change: Dict) -> None:
+    """
+    Apply a committed account change to the owner's cached account views and transaction
+    list instead of invalidating them, so the next read is served from Redis.
+    """
+    user_id = change["user_id"]
+    account_keys = (await _tag_members(CACHE_KEYS["user_accounts"](user_id)) +
+                    await _tag_members(CACHE_KEYS["account_by_type"](user_id, change["account_type"])))
+    patch_account = _account_patcher(change)
+    for key in account_keys:
+        await redis_cache.update(key, patch_account)
+
+    row = change["transaction_row"]
+    if row is None:
+        return
+    # Only the unfiltered first page (what the transactions tab loads first) can be patched
+    # without re-evaluating its filters; cached filtered variants and later pages are dropped instead
+    user_view = change["account_type"].value
+    unfiltered_key, base = build_cache_key(
+        "get_transactions", {"user_view": user_view, "limit": PAGE_SIZE_DEFAULT}, user_id,
+        key=CACHE_KEYS["user_transactions"]
+    )
+    for key in await _tag_members(base):
+        if key == unfiltered_key:
+            await redis_cache.update(key, _transactions_patcher(row))
+        else:
+            await redis_cache.delete(key)
@@ -0,0 +1,97 @@
+#utils/db_pool.py
+import logging
+import time
+import uuid
+from typing import Dict
+from prometheus_client import Counter, Gauge, Histogram
+from sqlalchemy import event
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from config import (DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_POOL_RECYCLE, DB_POOL_PRE_PING,
+                    DB_STATEMENT_TIMEOUT_MS, DB_PGBOUNCER_MODE, DB_POOL_SLOW_WAIT_MS)
+
+logger = logging.getLogger(__name__)
+
+DB_POOL_WAIT = Histogram(
+    "db_pool_wait_seconds", "Time spent waiting to check a connection out of the pool", ["pool"],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0, 30.0)
+)
+# Summed over the live workers when they share a PROMETHEUS_MULTIPROC_DIR
+DB_POOL_CHECKED_OUT = Gauge("db_pool_checked_out", "Connections currently checked out", ["pool"],
+                            multiprocess_mode="livesum")
+DB_POOL_CONNECTIONS = Counter("db_pool_connections_total", "New database connections opened", ["pool"])
+DB_POOL_TIMEOUTS = Counter("db_pool_timeouts_total", "Checkouts that gave up after pool_timeout", ["pool"])
+
+def _timed_get(pool, do_get):
+    """Run the pool's checkout, recording (and logging when slow) how long it waited"""
+    name = pool.logging_name or "default"
+    started = time.perf_counter()
+    try:
+        return do_get()
+    except Exception:
+        DB_POOL_TIMEOUTS.labels(name).inc()
+        raise
+    finally:
+        waited = time.perf_counter() - started
+        DB_POOL_WAIT.labels(name).observe(waited)
+        if waited * 1000 >= DB_POOL_SLOW_WAIT_MS:
+            logger.warning(f"Waited {waited * 1000:.0f} ms for a database connection ({name}: {pool.status()})")
+
+class InstrumentedQueuePool(QueuePool):
+    def _do_get(self):
+        return _timed_get(self, super()._do_get)
+
+class InstrumentedAsyncAdaptedQueuePool(AsyncAdaptedQueuePool):
+    def _do_get(self):
+        return _timed_get(self, super()._do_get)
+
+def instrument_engine(engine, name: str) -> None:
+    """Track checked-out and newly opened connections of an engine's pool"""
+    @event.listens_for(engine, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        DB_POOL_CONNECTIONS.labels(name).inc()
+
+    @event.listens_for(engine, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        DB_POOL_CHECKED_OUT.labels(name).inc()
+
+    @event.listens_for(engine, "checkin")
+    def on_checkin(dbapi_connection, connection_record):
+        DB_POOL_CHECKED_OUT.labels(name).dec()
+
+def _pool_options(name: str) -> Dict:
+    return {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+        # Labels the pool in metrics and logs; kept when the pool is recreated
+        "pool_logging_name": name,
+    }
+
+def sync_engine_options(name: str = "sync") -> Dict:
+    """create_engine() keyword arguments for psycopg2"""
+    options = _pool_options(name)
+    options["poolclass"] = InstrumentedQueuePool
+    # PgBouncer rejects unknown startup parameters, so the timeout is left to its configuration
+    if DB_STATEMENT_TIMEOUT_MS and not DB_PGBOUNCER_MODE:
+        options["connect_args"] = {"options": f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"}
+    return options
+
+def async_engine_options(name: str = "async") -> Dict:
+    """create_async_engine() keyword arguments for asyncpg"""
+    options = _pool_options(name)
+    options["poolclass"] = InstrumentedAsyncAdaptedQueuePool
+    connect_args = {}
+    if DB_PGBOUNCER_MODE:
+        # Transaction pooling hands each transaction a different server connection, so
+        # named prepared statements can't be reused: disable asyncpg's statement cache and
+        # give any statement it still prepares a unique name
+        connect_args["statement_cache_size"] = 0
+        connect_args["prepared_statement_cache_size"] = 0
+        connect_args["prepared_statement_name_func"] = lambda: f"__asyncpg_{uuid.uuid4()}__"
+    elif DB_STATEMENT_TIMEOUT_MS:
+        connect_args["server_settings"] = {"statement_timeout": str(DB_STATEMENT_TIMEOUT_MS)}
+    if connect_args:
+        options["connect_args"] = connect_args
+    return options
@@ -0,0 +1,62 @@
+#utils/eager_loading.py
+from sqlalchemy.orm import contains_eager, joinedload, selectinload
+from models import (MarketplaceOrder, Order, OrderItem, Payout, Product, ProductReview,
+                    ProductWishlist, StorefrontProduct, User)
+
+# Loader option sets for the list endpoints. Each one loads every relationship the endpoint's
+# serializer walks, so a listing costs a fixed number of queries however many rows it returns.
+# Collections use selectinload (one IN query per level); single parents already joined by the
+# listing query use contains_eager.
+
+# Marketplace listing: product, its images and the owning store
+MARKETPLACE_PRODUCT_OPTIONS = (
+    selectinload(StorefrontProduct.product).selectinload(Product.images),
+    selectinload(StorefrontProduct.owner),
+)
+
+# A seller's own storefront listing and public preview
+STOREFRONT_PRODUCT_OPTIONS = (
+    selectinload(StorefrontProduct.product).selectinload(Product.images),
+)
+
+STORE_OPTIONS = (
+    selectinload(User.store_settings),
+)
+
+# Buyer's orders: items -> product -> images
+BUYER_ORDER_OPTIONS = (
+    selectinload(Order.items).selectinload(OrderItem.product).selectinload(Product.images),
+)
+
+# Seller's orders: items -> product
+SELLER_ORDER_OPTIONS = (
+    selectinload(Order.items).selectinload(OrderItem.product),
+)
+
+MARKETPLACE_ORDER_OPTIONS = (
+    selectinload(MarketplaceOrder.seller_orders).selectinload(Order.items).selectinload(OrderItem.product),
+)
+
+ADMIN_MARKETPLACE_ORDER_OPTIONS = (
+    selectinload(MarketplaceOrder.seller_orders).joinedload(Order.seller),
+    selectinload(MarketplaceOrder.seller_orders).joinedload(Order.payout).joinedload(Payout.seller),
+)
+
+REVIEW_OPTIONS = (
+    selectinload(ProductReview.product).selectinload(Product.images),
+)
+
+WISHLIST_OPTIONS = (
+    selectinload(ProductWishlist.product).selectinload(Product.images),
+)
+
+# Seller's payouts; the listing query joins Payout.order
+SELLER_PAYOUT_OPTIONS = (
+    contains_eager(Payout.order).joinedload(Order.marketplace_order),
+)
+
+# Admin payouts; the listing query joins Payout.seller and Payout.order
+ADMIN_PAYOUT_OPTIONS = (
+    contains_eager(Payout.seller).selectinload(User.payout_bank_details),
+    contains_eager(Payout.order),
+)
@@ -0,0 +1,57 @@
+#utils/local_cache.py
+import time
+from collections import OrderedDict
+from typing import Any, Iterable, Optional
+
+class LocalCache:
+    """In-process LRU cache with per-entry TTL and a total size cap in bytes"""
+
+    def __init__(self, max_bytes: int, max_ttl: int):
+        self.max_bytes = max_bytes
+        self.max_ttl = max_ttl
+        self.current_bytes = 0
+        self._entries = OrderedDict()  # key -> (value, size, expires_at)
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        value, _, expires_at = entry
+        if expires_at <= time.monotonic():
+            self.delete(key)
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any, size: int, expire: int) -> None:
+        """Store a decoded value; `size` is the byte length of its encoded payload"""
+        self.delete(key)
+        if size > self.max_bytes:
+            return
+
+        # Cap the local TTL so a missed invalidation message can only serve stale data briefly
+        expires_at = time.monotonic() + min(expire, self.max_ttl)
+        self._entries[key] = (value, size, expires_at)
+        self.current_bytes += size
+
+        while self.current_bytes > self.max_bytes:
+            _, (_, evicted_size, _) = self._entries.popitem(last=False)
+            self.current_bytes -= evicted_size
+
+    def delete(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.current_bytes -= entry[1]
+
+    def delete_many(self, keys: Iterable[str]) -> None:
+        for key in keys:
+            self.delete(key)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.current_bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,288 @@
+#utils/metric_counters.py
+import asyncio
+import logging
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Tuple
+from prometheus_client import Counter
+from sqlalchemy import event, func, inspect, select, text
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+from models import (BuyerMetrics, InvoiceRequest, InvoiceStatus, Order, OrderStatus, Product, ProductReview,
+                    ProductView, ProductWishlist, SellerCategoryMetrics, SellerMetrics, User)
+from sql_database import SessionLocal
+from utils.redis_cache import redis_cache
+from config import METRIC_COUNTERS_RECONCILE_BATCH_SIZE, METRIC_COUNTERS_RECONCILE_INTERVAL
+
+logger = logging.getLogger(__name__)
+
+# The dashboard counters in seller_metrics / seller_category_metrics / buyer_metrics are moved by
+# mapper events in the same flush (and so the same transaction) as the rows they count, whichever
+# route or job writes them. A periodic reconciliation rebuilds them from the source tables, a few
+# users at a time, and reports any drift (e.g. from bulk query.update()/delete() calls, which
+# bypass mapper events).
+
+METRIC_COUNTER_DRIFT = Counter(
+    "metric_counter_drift_total", "Counter rows that reconciliation found wrong and rewrote", ["table"]
+)
+
+INVOICE_STATUS_COUNTERS = {
+    InvoiceStatus.pending: "pending_invoice_count",
+    InvoiceStatus.sent: "sent_invoice_count",
+    InvoiceStatus.paid: "paid_invoice_count",
+    InvoiceStatus.overdue: "overdue_invoice_count",
+}
+
+RECONCILE_LOCK = "metric_counters:reconcile"
+# Under PostgreSQL's deadlock_timeout, so when a batch and a write wait on each other the batch gives way
+RECONCILE_LOCK_TIMEOUT_MS = 500
+
+# A row's contribution: (counter model, counter row key, {counter: amount}) entries
+Contribution = List[Tuple[type, Dict[str, Any], Dict[str, int]]]
+
+def _status(value: Any) -> Any:
+    return getattr(value, "value", value)
+
+def _product_contribution(connection, values: Dict) -> Contribution:
+    quantity, threshold = values["quantity"], values["low_stock_threshold"]
+    contribution = [(SellerMetrics, {"user_id": values["user_id"]}, {
+        "product_count": 1,
+        "low_stock_count": int(quantity is not None and threshold is not None and quantity <= threshold),
+        "out_of_stock_count": int(quantity == 0),
+    })]
+    if values["category"] is not None:
+        contribution.append((SellerCategoryMetrics, {"user_id": values["user_id"], "category": values["category"]},
+                             {"product_count": 1}))
+    return contribution
+
+def _order_contribution(connection, values: Dict) -> Contribution:
+    status = _status(values["status"])
+    return [
+        (SellerMetrics, {"user_id": values["seller_id"]}, {"pending_order_count": int(status == OrderStatus.pending.value)}),
+        (BuyerMetrics, {"user_id": values["buyer_id"]}, {"purchase_count": int(status == OrderStatus.fulfilled.value)}),
+    ]
+
+def _invoice_contribution(connection, values: Dict) -> Contribution:
+    counter = INVOICE_STATUS_COUNTERS.get(_status(values["status"]))
+    if counter is None:
+        return []
+    # Invoices belong to the seller of their order
+    seller_id = connection.scalar(select(Order.seller_id).where(Order.id == values["order_id"]))
+    return [(SellerMetrics, {"user_id": seller_id}, {counter: 1})]
+
+def _buyer_contribution(counter: str) -> Callable:
+    def contribution(connection, values: Dict) -> Contribution:
+        return [(BuyerMetrics, {"user_id": values["user_id"]}, {counter: 1})]
+    return contribution
+
+# Counted model -> (its contribution, the attributes that contribution reads)
+COUNTED_MODELS = {
+    Product: (_product_contribution, ("user_id", "quantity", "low_stock_threshold", "category")),
+    Order: (_order_contribution, ("seller_id", "buyer_id", "status")),
+    InvoiceRequest: (_invoice_contribution, ("order_id", "status")),
+    ProductView: (_buyer_contribution("view_count"), ("user_id",)),
+    ProductWishlist: (_buyer_contribution("wishlist_count"), ("user_id",)),
+    ProductReview: (_buyer_contribution("review_count"), ("user_id",)),
+}
+
+def _bump(connection, model: type, key: Dict[str, Any], deltas: Dict[str, int]) -> None:
+    """Add `deltas` to the counters of `model`'s row for `key`, creating the row on first use"""
+    deltas = {name: delta for name, delta in deltas.items() if delta}
+    if not deltas or None in key.values():
+        return
+    insert = postgresql_insert if connection.dialect.name == "postgresql" else sqlite_insert
+    table = model.__table__
+    values = dict(key, **deltas)
+    updates = {name: table.c[name] + delta for name, delta in deltas.items()}
+    if "updated_at" in table.c:
+        values["updated_at"] = updates["updated_at"] = datetime.utcnow()
+    connection.execute(insert(table).values(**values).on_conflict_do_update(index_elements=list(key), set_=updates))
+
+def _apply(connection, before: Contribution, after: Contribution) -> None:
+    """Move a row's counts from what it contributed `before` a change to what it contributes `after`"""
+    deltas = defaultdict(lambda: defaultdict(int))
+    for sign, contribution in ((-1, before), (1, after)):
+        for model, key, counts in contribution:
+            for name, count in counts.items():
+                deltas[model, tuple(sorted(key.items()))][name] += sign * count
+    for (model, key), counts in deltas.items():
+        _bump(connection, model, dict(key), counts)
+
+def _current_values(connection, target, names: Tuple[str, ...]) -> Dict:
+    """`target`'s values for `names`, reading any attribute that isn't loaded from its row"""
+    state = inspect(target)
+    values = {name: state.dict[name] for name in names if name in state.dict}
+    missing = [name for name in names if name not in values]
+    if missing:
+        mapper = state.mapper
+        primary_key = mapper.primary_key[0]
+        row = connection.execute(
+            select(*(mapper.columns[name] for name in missing))
+            .where(primary_key == mapper.primary_key_from_instance(target)[0])
+        ).one()
+        values.update(zip(missing, row))
+    return values
+
+def _previous_values(target, current: Dict) -> Dict:
+    state = inspect(target)
+    previous = {}
+    for name, value in current.items():
+        deleted = state.attrs[name].history.deleted
+        previous[name] = deleted[0] if deleted else value
+    return previous
+
+def _keep_previous_value(target, value, oldvalue, initiator):
+    """No-op 'set' listener registered with active_history, so updates know the value they replace"""
+
+def _register(model: type, contribution: Callable, names: Tuple[str, ...]) -> None:
+    @event.listens_for(model, "after_insert")
+    def after_insert(mapper, connection, target):
+        _apply(connection, [], contribution(connection, _current_values(connection, target, names)))
+
+    @event.listens_for(model, "after_update")
+    def after_update(mapper, connection, target):
+        state = inspect(target)
+        if not any(state.attrs[name].history.has_changes() for name in names):
+            return
+        current = _current_values(connection, target, names)
+        _apply(connection, contribution(connection, _previous_values(target, current)),
+               contribution(connection, current))
+
+    # Before the DELETE, while the row can still be read
+    @event.listens_for(model, "before_delete")
+    def before_delete(mapper, connection, target):
+        current = _current_values(connection, target, names)
+        _apply(connection, contribution(connection, _previous_values(target, current)), [])
+
+    for name in names:
+        event.listen(getattr(model, name), "set", _keep_previous_value, active_history=True)
+
+for _model, (_contribution, _names) in COUNTED_MODELS.items():
+    _register(_model, _contribution, _names)
+
+def _expected_counters(db: Session, user_ids: List[int]) -> Dict[type, Dict[tuple, Dict[str, int]]]:
+    """The counter rows of `user_ids` recomputed from the source tables, keyed by primary key"""
+    expected = {SellerMetrics: defaultdict(dict), SellerCategoryMetrics: defaultdict(dict), BuyerMetrics: defaultdict(dict)}
+    seller, category, buyer = expected[SellerMetrics], expected[SellerCategoryMetrics], expected[BuyerMetrics]
+
+    for user_id, total, low_stock, out_of_stock in db.execute(select(
+        Product.user_id,
+        func.count(),
+        func.count().filter(Product.quantity <= Product.low_stock_threshold),
+        func.count().filter(Product.quantity == 0)
+    ).where(Product.user_id.in_(user_ids)).group_by(Product.user_id)):
+        seller[(user_id,)].update(product_count=total, low_stock_count=low_stock, out_of_stock_count=out_of_stock)
+
+    for user_id, product_category, total in db.execute(select(Product.user_id, Product.category, func.count())
+                                                       .where(Product.user_id.in_(user_ids), Product.category != None)
+                                                       .group_by(Product.user_id, Product.category)):
+        category[(user_id, product_category)]["product_count"] = total
+
+    for user_id, total in db.execute(select(Order.seller_id, func.count())
+                                     .where(Order.seller_id.in_(user_ids), Order.status == OrderStatus.pending)
+                                     .group_by(Order.seller_id)):
+        seller[(user_id,)]["pending_order_count"] = total
+
+    for user_id, status, total in db.execute(select(Order.seller_id, InvoiceRequest.status, func.count())
+                                             .join(Order, InvoiceRequest.order_id == Order.id)
+                                             .where(Order.seller_id.in_(user_ids),
+                                                    InvoiceRequest.status.in_(list(INVOICE_STATUS_COUNTERS)))
+                                             .group_by(Order.seller_id, InvoiceRequest.status)):
+        seller[(user_id,)][INVOICE_STATUS_COUNTERS[status]] = total
+
+    for user_column, counter, criteria in (
+        (ProductView.user_id, "view_count", ()),
+        (ProductWishlist.user_id, "wishlist_count", ()),
+        (ProductReview.user_id, "review_count", ()),
+        (Order.buyer_id, "purchase_count", (Order.status == OrderStatus.fulfilled,)),
+    ):
+        for user_id, total in db.execute(select(user_column, func.count())
+                                         .where(user_column.in_(user_ids), *criteria).group_by(user_column)):
+            buyer[(user_id,)][counter] = total
+
+    return expected
+
+def reconcile_metric_counters(db: Session, user_ids: List[int]) -> Dict[str, int]:
+    """
+    Rebuild the counter rows of `user_ids` from the source tables, rewriting those that drifted.
+    Returns the number of drifted rows per counter table; the caller commits.
+    """
+    if db.bind.dialect.name == "postgresql":
+        # Wait for these users' in-flight writes, and hold back new ones until the rewrite commits,
+        # so none can land between the recount and the rewrite and be overwritten. Locking the users
+        # holds back rows that reference them (products, orders, views, ...), whose foreign key
+        # check needs a share lock on the user; locking the counter rows holds back the increments
+        # of updates and deletes. Everyone else's writes carry on.
+        db.execute(text(f"SET LOCAL lock_timeout = {RECONCILE_LOCK_TIMEOUT_MS}"))
+        db.execute(select(User.id).where(User.id.in_(user_ids)).order_by(User.id).with_for_update())
+
+    stored = {}
+    for model in (SellerMetrics, SellerCategoryMetrics, BuyerMetrics):
+        key_columns = list(model.__table__.primary_key.columns)
+        stored[model] = {
+            tuple(getattr(row, column.name) for column in key_columns): row
+            for row in db.scalars(select(model).where(model.user_id.in_(user_ids))
+                                  .order_by(*key_columns).with_for_update())
+        }
+
+    drift = {}
+    for model, expected in _expected_counters(db, user_ids).items():
+        table = model.__table__
+        key_columns = list(table.primary_key.columns)
+        counters = [column.name for column in table.columns if not column.primary_key and column.name != "updated_at"]
+        zeros = dict.fromkeys(counters, 0)
+
+        stored_counts = {key: {name: getattr(row, name) for name in counters} for key, row in stored[model].items()}
+        drifted = [key for key in stored_counts.keys() | expected.keys()
+                   if dict(zeros, **expected.get(key, {})) != stored_counts.get(key, zeros)]
+        for key in drifted:
+            db.merge(model(**dict(zip((column.name for column in key_columns), key)), **dict(zeros, **expected.get(key, {}))))
+
+        drift[table.name] = len(drifted)
+        if drifted:
+            METRIC_COUNTER_DRIFT.labels(table.name).inc(len(drifted))
+            logger.warning(f"Rewrote {len(drifted)} drifted {table.name} rows, e.g. {drifted[:5]}")
+    return drift
+
+def _reconcile() -> Dict[str, int]:
+    """Rebuild every user's counters, a batch of users per transaction"""
+    drift = defaultdict(int)
+    after_id = 0
+    while True:
+        db = SessionLocal()
+        try:
+            user_ids = db.scalars(select(User.id).where(User.id > after_id).order_by(User.id)
+                                  .limit(METRIC_COUNTERS_RECONCILE_BATCH_SIZE)).all()
+            if not user_ids:
+                return dict(drift)
+            after_id = user_ids[-1]
+            for table, rows in reconcile_metric_counters(db, user_ids).items():
+                drift[table] += rows
+            db.commit()
+        except OperationalError as e:
+            # Timed out behind a long write: leave this batch to the next round rather than queue behind it
+            db.rollback()
+            logger.warning(f"Skipped reconciling metric counters of users up to {after_id}: {e}")
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+async def run_metric_counter_reconciliation() -> None:
+    """Rebuild the counters at startup and then every METRIC_COUNTERS_RECONCILE_INTERVAL, on one worker at a time"""
+    while True:
+        # Held (not released) for the whole interval, so other workers skip this round
+        if await redis_cache.acquire_lock(RECONCILE_LOCK, METRIC_COUNTERS_RECONCILE_INTERVAL):
+            try:
+                drift = await asyncio.to_thread(_reconcile)
+                logger.info(f"Metric counters reconciled, drifted rows: {drift}")
+            except Exception as e:
+                logger.error(f"Metric counter reconciliation failed: {e}")
+        await asyncio.sleep(METRIC_COUNTERS_RECONCILE_INTERVAL)
+
+if __name__ == "__main__":
+    # One-off rebuild and drift report: python -m utils.metric_counters
+    print(_reconcile())
@@ -0,0 +1,43 @@
+#utils/pagination.py
+import base64
+import json
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+from fastapi import HTTPException
+from sqlalchemy import tuple_
+
+# Keyset pagination over (created_at, id), newest first. The cursor is an opaque token holding
+# the last row's key; the next page starts strictly after it, so deep pages cost the same as
+# the first one (unlike OFFSET) and rows inserted meanwhile never shift a page.
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    payload = json.dumps([created_at.isoformat(), row_id]).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        payload = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, row_id = json.loads(payload)
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def keyset_paginate(query, model, cursor: Optional[str], limit: int):
+    """
+    Order a Query or select() on `model` newest first, resume after `cursor`, and fetch one
+    row beyond `limit` so keyset_page can tell whether another page follows.
+    """
+    query = query.order_by(model.created_at.desc(), model.id.desc())
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        query = query.filter(tuple_(model.created_at, model.id) < tuple_(created_at, row_id))
+    return query.limit(limit + 1)
+
+def keyset_page(rows: Sequence[Any], limit: int, serialize: Optional[Callable[[Any], Any]] = None) -> Dict:
+    """Build the `{"items", "next_cursor"}` response from rows fetched by keyset_paginate"""
+    has_more = len(rows) > limit
+    rows = list(rows[:limit])
+    return {
+        "items": [serialize(row) for row in rows] if serialize else rows,
+        "next_cursor": encode_cursor(rows[-1].created_at, rows[-1].id) if has_more else None,
+    }
@@ -0,0 +1,91 @@
+#utils/read_replica.py
+import logging
+from typing import Optional
+from fastapi import Depends, Request
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from jose import jwt, JWTError
+from sql_database import ReadSessionLocal, AsyncReadSessionLocal, get_db, get_async_db
+from utils.redis_cache import redis_cache
+from config import SECRET_KEY, ALGORITHM, READ_REPLICA_DATABASE_URL, READ_YOUR_WRITES_WINDOW
+
+logger = logging.getLogger(__name__)
+
+# Read-only routes take get_read_db / get_async_read_db to read from the replica. A user who
+# has just written is routed back to the primary for READ_YOUR_WRITES_WINDOW seconds, so they
+# never see the replica's view from before their own change: track_user_writes sets a short
+# Redis marker around every mutating request they make.
+
+REPLICA_ENABLED = bool(READ_REPLICA_DATABASE_URL)
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+def _write_marker_key(user_id: int) -> str:
+    return f"read_your_writes:{user_id}"
+
+def _request_user_id(request: Request) -> Optional[int]:
+    """The user id in the request's bearer token, without a database lookup"""
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM]).get("user_id")
+    except JWTError:
+        return None
+
+async def mark_user_write(user_id: int) -> None:
+    """Keep the user's reads on the primary for the next READ_YOUR_WRITES_WINDOW seconds"""
+    await redis_cache.redis_client.set(_write_marker_key(user_id), 1, ex=READ_YOUR_WRITES_WINDOW)
+
+async def _reads_from_primary(request: Request) -> bool:
+    if not REPLICA_ENABLED:
+        return True
+    user_id = _request_user_id(request)
+    if user_id is None:
+        return False
+    try:
+        return bool(await redis_cache.redis_client.exists(_write_marker_key(user_id)))
+    except Exception as e:
+        # Without the marker we can't rule out a recent write
+        logger.warning(f"Read-your-writes check failed, reading from the primary: {e}")
+        return True
+
+# On the primary the read dependencies hand out the request's get_db / get_async_db session
+# itself, which the auth dependencies share too, so a request holds one primary connection.
+
+async def get_read_db(request: Request, db: Session = Depends(get_db)):
+    """Like get_db, but on the read replica unless the user wrote within the window"""
+    if await _reads_from_primary(request):
+        yield db
+        return
+    replica = ReadSessionLocal()
+    try:
+        yield replica
+    finally:
+        replica.close()
+
+async def get_async_read_db(request: Request, db: AsyncSession = Depends(get_async_db)):
+    """Like get_async_db, but on the read replica unless the user wrote within the window"""
+    if await _reads_from_primary(request):
+        yield db
+        return
+    async with AsyncReadSessionLocal() as replica:
+        yield replica
+
+async def track_user_writes(request: Request, call_next):
+    """HTTP middleware setting the read-your-writes marker for authenticated mutating requests"""
+    user_id = _request_user_id(request) if REPLICA_ENABLED and request.method not in SAFE_METHODS else None
+    if user_id is None:
+        return await call_next(request)
+
+    # Before, so reads racing the write already go to the primary, and again after, so the
+    # window runs from the commit rather than from the start of a slow request
+    await _mark_quietly(user_id)
+    response = await call_next(request)
+    await _mark_quietly(user_id)
+    return response
+
+async def _mark_quietly(user_id: int) -> None:
+    try:
+        await mark_user_write(user_id)
+    except Exception as e:
+        logger.warning(f"Could not set the read-your-writes marker for user {user_id}: {e}")
@@ -1,149 +1,385 @@
 #utils/redis_cache.py
 import redis
 import json
-from typing import Any, Optional, Dict
+from typing import Any, Callable, Optional, Dict, List
 import os
 from functools import wraps
+from operator import attrgetter
+from sqlalchemy import inspect as sa_inspect, DateTime, Date, Time, Enum as SQLEnum
+from sqlalchemy.exc import InvalidRequestError
 from sqlalchemy.orm import class_mapper
 from datetime import datetime
 import enum
 from models import User, Product, Order, BankAccount
-from config import REDIS_CLIENT
+from sql_database import Base
+import asyncio
+import logging
+import time
+import uuid
+from config import (REDIS_ASYNC_CLIENT, L1_CACHE_ENABLED, L1_CACHE_MAX_BYTES,
+                    L1_CACHE_TTL, CACHE_INVALIDATION_CHANNEL)
+from utils.cache_constants import cache_tag_key, cache_tags_for_key, cache_tag_for_pattern, cache_lock_key
+from utils.local_cache import LocalCache
+from utils.cache_codec import CacheCodec, CacheCodecError, cache_codec
+from utils.cache_metrics import CACHE_HITS, CACHE_MISSES, CACHE_SETS, CACHE_SET_BYTES, CACHE_LATENCY, hot_keys, namespace_of
+
+logger = logging.getLogger(__name__)
+
+# Delete a lock only if it is still held by the caller's token
+RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+# Relationships embedded per model. True embeds the relationship in full, {'limit': n} embeds
+# the n most recent rows (limited in SQL, never by slicing a loaded collection) and
+# {'fields': [...]} embeds only those columns. Unlisted relationships are skipped.
+RELATIONSHIP_CONFIG = {
+    User: {
+        'products': True,  # Include full product details
+        'store_settings': True,  # Include store settings
+        'bank_details': True,  # Include banking info
+        'notifications': {'limit': 5},  # Only recent notifications
+        'restock_requests': {'limit': 5},  # Only recent requests
+        'bank_accounts': True,  # Include bank accounts
+        'financial_pools': True,  # Include financial pools
+        'automations': True,  # Include automations
+    },
+    Product: {
+        'images': True,  # Include all images
+        'restock_requests': {'limit': 1}  # Only latest restock request
+    },
+    Order: {
+        'seller': {'fields': ['id', 'email', 'business_name']},
+        'items': True,  # Include all items
+        'payments': True,  # Include payment info
+        'invoice_requests': True  # Include invoice info
+    },
+    BankAccount: {
+        'transactions': {'limit': 10},  # Recent transactions
+        'pools': True,  # Include pools
+        'outgoing_payments': {'limit': 5},
+        'incoming_payments': {'limit': 5}
+    },
+}
+
+def _isoformat(value: Any) -> Any:
+    return value.isoformat() if value is not None else None
+
+def _enum_value(value: Any) -> Any:
+    return value.value if isinstance(value, enum.Enum) else value
+
+def _column_converter(column) -> Optional[Callable[[Any], Any]]:
+    """Pick the value conversion for a column once, from its declared type"""
+    if isinstance(column.type, (DateTime, Date, Time)):
+        return _isoformat
+    if isinstance(column.type, SQLEnum):
+        return _enum_value
+    return None
+
+class CompiledSerializer:
+    """Column getters and relationship plan for one model class, built once"""
+
+    __slots__ = ('columns', 'relationships')
+
+    def __init__(self, model: type):
+        mapper = class_mapper(model)
+        self.columns = tuple(
+            (prop.key, attrgetter(prop.key), _column_converter(prop.columns[0]))
+            for prop in mapper.column_attrs
+        )
+
+        relationships = []
+        for name, config in RELATIONSHIP_CONFIG.get(model, {}).items():
+            rel = mapper.relationships[name]
+            target = rel.mapper.class_
+            if isinstance(config, dict) and 'limit' in config:
+                # Most recent first where the target records creation time, else newest id first
+                order_by = getattr(target, 'created_at', None)
+                if order_by is None:
+                    order_by = rel.mapper.primary_key[0]
+                relationships.append((name, 'limit', (getattr(model, name), target, order_by.desc(), config['limit'])))
+            elif isinstance(config, dict) and 'fields' in config:
+                getters = tuple((field, attrgetter(field)) for field in config['fields'])
+                relationships.append((name, 'fields', getters))
+            elif config:
+                relationships.append((name, 'full', None))
+        self.relationships = tuple(relationships)
+
+    def __call__(self, obj: Any, processed: set) -> Dict:
+        # What the instance has loaded is in its __dict__: read it there and only go through the
+        # attribute descriptors (and their loaders) for what is missing
+        loaded = obj.__dict__
+        data = {}
+        for key, getter, convert in self.columns:
+            value = loaded[key] if key in loaded else getter(obj)
+            data[key] = convert(value) if convert is not None else value
+
+        for name, mode, spec in self.relationships:
+            if name not in loaded:
+                _require_loadable(obj, name)
+
+            if mode == 'limit':
+                items = loaded[name][:spec[-1]] if name in loaded else _load_limited(obj, *spec)
+                data[name] = [ModelSerializer._serialize_model(item, processed)
+                              for item in items if id(item) not in processed]
+                continue
+
+            value = loaded[name] if name in loaded else getattr(obj, name)
+            if value is None:
+                data[name] = None
+            elif mode == 'fields':
+                data[name] = {field: _enum_value(getter(value)) for field, getter in spec}
+            elif isinstance(value, list):
+                data[name] = [ModelSerializer._serialize_model(item, processed) for item in value
+                              if id(item) not in processed]
+            else:
+                data[name] = ModelSerializer._serialize_model(value, processed) if id(value) not in processed else None
+        return data
+
+def _require_loadable(obj: Any, name: str) -> None:
+    """
+    AsyncSession objects can't lazy-load (the sync load raises MissingGreenlet mid-serialization):
+    refuse an unloaded relationship up front, naming what the query has to eager-load
+    """
+    if sa_inspect(obj).async_session is not None:
+        raise InvalidRequestError(
+            f"{type(obj).__name__}.{name} was not loaded with its AsyncSession query; "
+            f"eager-load it (e.g. selectinload) to serialize it"
+        )
+
+def _load_limited(obj: Any, attribute: Any, target: type, order_by: Any, limit: int) -> List:
+    """Fetch at most `limit` rows of an unloaded collection, without loading the whole of it"""
+    session = sa_inspect(obj).session
+    if session is None:
+        # Transient or detached: there is nothing to query
+        return list(getattr(obj, attribute.key))[:limit]
+    return session.query(target).with_parent(obj, attribute).order_by(order_by).limit(limit).all()
 
 class ModelSerializer:
-    """Enhanced serializer for SQLAlchemy models with relationship handling"""
-    
-    @staticmethod
-    def _serialize_relationship(obj: Any, relationship: str, processed: set) -> Any:
-        """Serialize a relationship while avoiding circular references"""
-        if not hasattr(obj, relationship):
-            return None
-            
-        value = getattr(obj, relationship)
-        if value is None:
-            return None
-            
-        # Handle collections (lists of related objects)
-        if isinstance(value, list):
-            return [ModelSerializer._serialize_model(item, processed) for item in value 
-                   if id(item) not in processed]
-        
-        # Handle single related object
-        return ModelSerializer._serialize_model(value, processed) if id(value) not in processed else None
+    """Serializer for SQLAlchemy models using per-class compiled serializers"""
+
+    _compiled: Dict[type, CompiledSerializer] = {}
+
+    @classmethod
+    def compile(cls, model: type) -> CompiledSerializer:
+        serializer = cls._compiled.get(model)
+        if serializer is None:
+            serializer = cls._compiled[model] = CompiledSerializer(model)
+        return serializer
+
+    @classmethod
+    def compile_all(cls) -> None:
+        """Build serializers for every mapped model up front"""
+        for mapper in Base.registry.mappers:
+            cls.compile(mapper.class_)
 
     @staticmethod
-    def _serialize_model(obj: Any, processed: set = None) -> Dict:
+    def _serialize_model(obj: Any, processed: set = None) -> Any:
         """Convert SQLAlchemy model to dictionary with relationship handling"""
+        if not hasattr(obj, '__table__'):
+            if isinstance(obj, enum.Enum):
+                return obj.value
+            return obj
+
         if processed is None:
             processed = set()
-            
         # Prevent infinite recursion
         if id(obj) in processed:
             return None
         processed.add(id(obj))
-        
-        if not hasattr(obj, '__table__'):
-            if isinstance(obj, enum.Enum):
-                return obj.value
-            return obj
-            
-        mapper = class_mapper(obj.__class__)
-        data = {}
-        
-        # Serialize regular columns
-        for column in mapper.columns:
-            value = getattr(obj, column.key)
-            if isinstance(value, datetime):
-                data[column.key] = value.isoformat()
-            elif isinstance(value, enum.Enum):
-                data[column.key] = value.value
-            else:
-                data[column.key] = value
-        
-        # Handle relationships based on model type
-        if isinstance(obj, User):
-            relationships = {
-                'products': True,  # Include full product details
-                'store_settings': True,  # Include store settings
-                'orders': False,  # Skip to avoid large payloads
-                'bank_details': True,  # Include banking info
-                'notifications': {'limit': 5},  # Only recent notifications
-                'feedbacks': False,  # Skip feedback
-                'restock_requests': {'limit': 5},  # Only recent requests
-                'bank_accounts': True,  # Include bank accounts
-                'financial_pools': True,  # Include financial pools
-                'loans': False,  # Skip loans for privacy
-                'automations': True,  # Include automations
-            }
-        elif isinstance(obj, Product):
-            relationships = {
-                'owner': False,  # Skip owner details
-                'images': True,  # Include all images
-                'restock_requests': {'limit': 1}  # Only latest restock request
-            }
-        elif isinstance(obj, Order):
-            relationships = {
-                'seller': {'fields': ['id', 'email', 'business_name']},
-                'items': True,  # Include all items
-                'payments': True,  # Include payment info
-                'invoice_requests': True  # Include invoice info
-            }
-        elif isinstance(obj, BankAccount):
-            relationships = {
-                'user': False,  # Skip user details
-                'transactions': {'limit': 10},  # Recent transactions
-                'pools': True,  # Include pools
-                'outgoing_payments': {'limit': 5},
-                'incoming_payments': {'limit': 5}
-            }
-        else:
-            # Default behavior for other models
-            relationships = {rel.key: False for rel in mapper.relationships}
-        
-        # Process relationships based on configuration
-        for rel_name, rel_config in relationships.items():
-            if not hasattr(obj, rel_name):
-                continue
-                
-            if isinstance(rel_config, dict):
-                # Handle configured relationship
-                value = getattr(obj, rel_name)
-                if isinstance(value, list) and 'limit' in rel_config:
-                    value = value[:rel_config['limit']]
-                if isinstance(value, dict) and 'fields' in rel_config:
-                    value = {k: v for k, v in value.items() if k in rel_config['fields']}
-                data[rel_name] = ModelSerializer._serialize_relationship(obj, rel_name, processed)
-            elif rel_config:
-                # Include full relationship
-                data[rel_name] = ModelSerializer._serialize_relationship(obj, rel_name, processed)
-        
-        return data
+
+        return ModelSerializer.compile(type(obj))(obj, processed)
+
+ModelSerializer.compile_all()
 
 class RedisCache:
-    def __init__(self, redis_client):
+    def __init__(self, redis_client, local_cache: Optional[LocalCache] = None, codec: CacheCodec = cache_codec):
         self.redis_client = redis_client
+        self.local_cache = local_cache
+        self.codec = codec
+        self.stats = {"l1_hits": 0, "l1_misses": 0, "l2_hits": 0, "l2_misses": 0}
+        self._release_lock = redis_client.register_script(RELEASE_LOCK_SCRIPT)
         
     async def get(self, key: str) -> Optional[Any]:
-        data = self.redis_client.get(key)
-        if data:
-            return json.loads(data)
-        return None
+        namespace = namespace_of(key)
+        hot_keys.record(key)
+        with CACHE_LATENCY.labels("get").time():
+            if self.local_cache is not None:
+                value = self.local_cache.get(key)
+                if value is not None:
+                    self.stats["l1_hits"] += 1
+                    CACHE_HITS.labels(namespace, "l1").inc()
+                    return value
+                self.stats["l1_misses"] += 1
+
+                # Fetch the remaining TTL in the same round trip so L1 never outlives Redis
+                async with self.redis_client.pipeline(transaction=False) as pipe:
+                    pipe.get(key)
+                    pipe.ttl(key)
+                    data, ttl = await pipe.execute()
+            else:
+                data = await self.redis_client.get(key)
+
+            if data:
+                try:
+                    value = self.codec.decode(data)
+                except CacheCodecError as e:
+                    # Written by a worker with a codec this one lacks; recompute rather than fail
+                    logger.warning(f"Treating cache key {key} as a miss: {str(e)}")
+                    value = None
+                if value is not None:
+                    self.stats["l2_hits"] += 1
+                    CACHE_HITS.labels(namespace, "l2").inc()
+                    if self.local_cache is not None and ttl > 0:
+                        self.local_cache.set(key, value, len(data), ttl)
+                    return value
+            self.stats["l2_misses"] += 1
+            CACHE_MISSES.labels(namespace).inc()
+            return None
         
-    async def set(self, key: str, value: Any, expire: int = 3600) -> None:
-        serialized = ModelSerializer._serialize_model(value) if hasattr(value, '__table__') \
+    @staticmethod
+    def serialize(value: Any) -> Any:
+        """Convert models (or lists of models, or pages of them) into their JSON-compatible form"""
+        return ModelSerializer._serialize_model(value) if hasattr(value, '__table__') \
                     else [ModelSerializer._serialize_model(item) for item in value] if isinstance(value, list) \
+                    else {name: RedisCache.serialize(item) for name, item in value.items()} if isinstance(value, dict) \
                     else value
-                    
-        self.redis_client.set(key, json.dumps(serialized), ex=expire)
-        
+
+    async def set(self, key: str, value: Any, expire: int = 3600, tags: Optional[List[str]] = None) -> Any:
+        """Cache `value` under its derived tags plus any extra `tags`; returns its JSON-compatible form"""
+        with CACHE_LATENCY.labels("set").time():
+            serialized = self.serialize(value)
+            payload = self.codec.encode(serialized)
+            now = time.time()
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                pipe.set(key, payload, ex=expire)
+                # Register the key in its tag sets, scored by its expiry; a tag set lives as long as
+                # its longest-lived member. Members that expired since are dropped on the way, so
+                # tags that are written far more often than invalidated don't grow without bound.
+                for tag in cache_tags_for_key(key) + (tags or []):
+                    tag_key = cache_tag_key(tag)
+                    pipe.zremrangebyscore(tag_key, "-inf", now)
+                    pipe.zadd(tag_key, {key: now + expire})
+                    pipe.expire(tag_key, expire, nx=True)
+                    pipe.expire(tag_key, expire, gt=True)
+                await pipe.execute()
+
+        namespace = namespace_of(key)
+        CACHE_SETS.labels(namespace).inc()
+        CACHE_SET_BYTES.labels(namespace).inc(len(payload))
+
+        if self.local_cache is not None:
+            self.local_cache.set(key, serialized, len(payload), expire)
+        return serialized
+
+    async def update(self, key: str, mutate: Callable[[Any], Optional[Any]]) -> bool:
+        """
+        Patch a cached value in place, keeping its TTL and tags. `mutate` receives the decoded
+        value and returns the new one, or None when it can't be patched. The key is deleted if
+        it can't be patched or changes concurrently, so readers never see a half-applied update.
+        Returns whether the key now holds the patched value.
+        """
+        with CACHE_LATENCY.labels("update").time():
+            async with self.redis_client.pipeline(transaction=True) as pipe:
+                try:
+                    await pipe.watch(key)
+                    data = await pipe.get(key)
+                    if not data:
+                        return False
+                    value = mutate(self.codec.decode(data))
+                    if value is None:
+                        await pipe.unwatch()
+                        await self.delete(key)
+                        return False
+                    payload = self.codec.encode(value)
+                    pipe.multi()
+                    pipe.set(key, payload, keepttl=True)
+                    await pipe.execute()
+                except (redis.WatchError, CacheCodecError):
+                    await self.delete(key)
+                    return False
+
+        CACHE_SETS.labels(namespace_of(key)).inc()
+        CACHE_SET_BYTES.labels(namespace_of(key)).inc(len(payload))
+        # Other workers drop their L1 copy and reload the patched value from Redis
+        await self.publish_invalidation([key])
+        return True
+
     async def delete(self, key: str) -> None:
-        self.redis_client.delete(key)
+        await self.redis_client.delete(key)
+        await self.publish_invalidation([key])
         
     async def delete_pattern(self, pattern: str) -> None:
-        """Delete all keys matching the pattern"""
-        keys = self.redis_client.keys(pattern)
+        """Delete all keys matching the pattern using the tag index"""
+        tag_key = cache_tag_key(cache_tag_for_pattern(pattern))
+        keys = await self.tag_members(tag_key)
         if keys:
-            self.redis_client.delete(*keys)
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                pipe.delete(*keys)
+                pipe.zrem(tag_key, *keys)
+                await pipe.execute()
+            await self.publish_invalidation(keys)
+
+    async def tag_members(self, tag_key: str) -> List[str]:
+        """The unexpired keys indexed in a tag set"""
+        return [key.decode() for key in await self.redis_client.zrangebyscore(tag_key, time.time(), "+inf")]
+
+    async def acquire_lock(self, key: str, timeout: int) -> Optional[str]:
+        """Try to take the recompute lock for `key`; returns the owner token or None"""
+        token = uuid.uuid4().hex
+        if await self.redis_client.set(cache_lock_key(key), token, nx=True, ex=timeout):
+            return token
+        return None
+
+    async def release_lock(self, key: str, token: str) -> None:
+        await self._release_lock(keys=[cache_lock_key(key)], args=[token])
+
+    async def is_locked(self, key: str) -> bool:
+        return bool(await self.redis_client.exists(cache_lock_key(key)))
+
+    async def publish_invalidation(self, keys: List[str]) -> None:
+        """Evict keys from this worker's L1 and tell every other worker to do the same"""
+        if self.local_cache is None or not keys:
+            return
+        self.local_cache.delete_many(keys)
+        await self.redis_client.publish(CACHE_INVALIDATION_CHANNEL, json.dumps(keys))
+
+    async def listen_for_invalidations(self) -> None:
+        """Background task: evict L1 entries announced on the invalidation channel"""
+        if self.local_cache is None:
+            return
+        while True:
+            pubsub = self.redis_client.pubsub()
+            try:
+                await pubsub.subscribe(CACHE_INVALIDATION_CHANNEL)
+                # Messages may have been missed while disconnected
+                self.local_cache.clear()
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        self.local_cache.delete_many(json.loads(message["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Cache invalidation listener error: {str(e)}")
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.aclose()
+
+    def get_stats(self) -> Dict:
+        """Per-tier hit/miss counters for this worker"""
+        stats = dict(self.stats)
+        stats["l1_enabled"] = self.local_cache is not None
+        if self.local_cache is not None:
+            stats["l1_entries"] = len(self.local_cache)
+            stats["l1_bytes"] = self.local_cache.current_bytes
+        stats["hot_keys"] = [{"key": key, "reads": reads} for key, reads in hot_keys.top()]
+        return stats
 
 # Initialize enhanced cache
-redis_cache = RedisCache(REDIS_CLIENT)
+redis_cache = RedisCache(
+    REDIS_ASYNC_CLIENT,
+    local_cache=LocalCache(L1_CACHE_MAX_BYTES, L1_CACHE_TTL) if L1_CACHE_ENABLED else None
+)
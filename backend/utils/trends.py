@@ -0,0 +1,55 @@
+#utils/trends.py
+from datetime import datetime, timedelta
+from typing import List, Optional
+from sqlalchemy import func
+
+# Period-over-period trends for the dashboards. A TrendWindows adds a "current" and a "previous"
+# FILTERed aggregate per metric to a statement, so every trend on a table comes out of the same
+# single query (restricted with `covers` to the range both windows span) instead of one extra
+# query per window.
+
+def calculate_trend(current, previous) -> str:
+    """Helper function to calculate trend percentage"""
+    if not previous:
+        return "+100%" if current and current > 0 else "0%"
+
+    change = ((current - previous) / previous) * 100
+    return f"+{change:.1f}%" if change >= 0 else f"{change:.1f}%"
+
+class TrendWindows:
+    """The `days` up to `now` and the `days` before them"""
+
+    def __init__(self, days: int = 30, now: Optional[datetime] = None):
+        self.end = now or datetime.utcnow()
+        self.current_start = self.end - timedelta(days=days)
+        self.previous_start = self.current_start - timedelta(days=days)
+
+    def covers(self, timestamp):
+        """WHERE criterion limiting a scan to the rows either window can count"""
+        return timestamp >= self.previous_start
+
+    def count(self, label: str, timestamp, *criteria) -> List:
+        """`{label}_current` and `{label}_previous` row counts, by `timestamp`"""
+        current, previous = self._windows(timestamp, *criteria)
+        return [
+            func.count().filter(*current).label(f"{label}_current"),
+            func.count().filter(*previous).label(f"{label}_previous"),
+        ]
+
+    def sum(self, label: str, amount, timestamp, *criteria) -> List:
+        """`{label}_current` and `{label}_previous` sums of `amount`, by `timestamp`"""
+        current, previous = self._windows(timestamp, *criteria)
+        return [
+            func.coalesce(func.sum(amount).filter(*current), 0).label(f"{label}_current"),
+            func.coalesce(func.sum(amount).filter(*previous), 0).label(f"{label}_previous"),
+        ]
+
+    def _windows(self, timestamp, *criteria):
+        return (
+            (timestamp >= self.current_start, timestamp < self.end, *criteria),
+            (timestamp >= self.previous_start, timestamp < self.current_start, *criteria),
+        )
+
+def trend(row, label: str) -> str:
+    """Trend between the two windows a TrendWindows added to `row` under `label`"""
+    return calculate_trend(getattr(row, f"{label}_current"), getattr(row, f"{label}_previous"))
@@ -1,199 +1,218 @@
-from sqlalchemy import func, desc, and_
-from sqlalchemy.orm import Session
+from sqlalchemy import Row, and_, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
-from models import (Product, Order, OrderStatus, InvoiceRequest, InvoiceStatus,
-                    ProductView, ProductWishlist, ProductReview)
+from typing import Dict, Optional, Tuple
+from models import (Product, Order, OrderStatus, InvoiceRequest, InvoiceStatus, ProductView, ProductWishlist,
+                    ProductReview, RestockRequest, RestockRequestStatus, RestockRequestUrgency,
+                    SellerMetrics, SellerCategoryMetrics, BuyerMetrics)
 from decimal import Decimal
-import random  # For dummy data
+from utils.trends import TrendWindows, calculate_trend, trend
+
+SELLER_COUNTER_NAMES = (
+    "product_count", "low_stock_count", "out_of_stock_count", "pending_order_count", "pending_invoice_count",
+    "sent_invoice_count", "paid_invoice_count", "overdue_invoice_count", "categories"
+)
+
+async def _fetch_row(db: AsyncSession, statement) -> Row:
+    """Run one aggregate on the request's session"""
+    return (await db.execute(statement)).one()
+
+async def _fetch_row_or_none(db: AsyncSession, statement) -> Optional[Row]:
+    return (await db.execute(statement)).one_or_none()
 
 class MetricsCalculator:
-    def __init__(self, db: Session, user_id: int):
+    def __init__(self, db: AsyncSession, user_id: int):
         self.db = db
         self.user_id = user_id
 
-    def get_inventory_metrics(self) -> Dict:
+    async def get_seller_counters(self) -> Dict:
+        """The seller's maintained counters (see utils/metric_counters), plus how many categories hold products"""
+        categories = select(func.count()).where(
+            SellerCategoryMetrics.user_id == self.user_id,
+            SellerCategoryMetrics.product_count > 0
+        ).scalar_subquery()
+        row = await _fetch_row_or_none(self.db, select(
+            SellerMetrics.product_count,
+            SellerMetrics.low_stock_count,
+            SellerMetrics.out_of_stock_count,
+            SellerMetrics.pending_order_count,
+            SellerMetrics.pending_invoice_count,
+            SellerMetrics.sent_invoice_count,
+            SellerMetrics.paid_invoice_count,
+            SellerMetrics.overdue_invoice_count,
+            categories.label("categories")
+        ).where(SellerMetrics.user_id == self.user_id))
+        # No counter row yet means nothing has been counted for this seller
+        return row._asdict() if row else dict.fromkeys(SELLER_COUNTER_NAMES, 0)
+
+    async def get_product_activity(self) -> Row:
+        """Products added in the last 30 days"""
+        windows = TrendWindows(days=30)
+        return await _fetch_row(self.db, select(
+            *windows.count("added", Product.created_at)
+        ).where(Product.user_id == self.user_id, windows.covers(Product.created_at)))
+
+    def get_inventory_metrics(self, counters: Dict, activity: Row) -> Dict:
         """Calculate inventory-related metrics"""
-        total_items = self.db.query(Product).filter(
-            Product.user_id == self.user_id
-        ).count()
-
-        low_stock_items = self.db.query(Product).filter(
-            Product.user_id == self.user_id,
-            Product.quantity <= Product.low_stock_threshold
-        ).count()
-
-        out_of_stock = self.db.query(Product).filter(
-            Product.user_id == self.user_id,
-            Product.quantity == 0
-        ).count()
-
-        categories = self.db.query(Product.category).filter(
-            Product.user_id == self.user_id,
-            Product.category != None  # Exclude null categories
-        ).distinct().count()
-
+        # Stock levels have no history to compare against, so only the catalogue size trends:
+        # against its size 30 days ago, i.e. before this window's additions. The rest report a
+        # flat "0%", as the dashboard expects a trend string on every metric
+        total_items = counters["product_count"]
         return {
             "total_items": {
                 "value": total_items,
-                "trend": self._calculate_dummy_trend()
+                "trend": calculate_trend(total_items, total_items - activity.added_current)
             },
             "low_stock": {
-                "value": low_stock_items,
-                "trend": self._calculate_dummy_trend(),
-                "status": "warning" if low_stock_items > 0 else "normal"
+                "value": counters["low_stock_count"],
+                "trend": "0%",
+                "status": "warning" if counters["low_stock_count"] > 0 else "normal"
             },
             "out_of_stock": {
-                "value": out_of_stock,
-                "trend": self._calculate_dummy_trend(),
-                "status": "danger" if out_of_stock > 0 else "normal"
+                "value": counters["out_of_stock_count"],
+                "trend": "0%",
+                "status": "danger" if counters["out_of_stock_count"] > 0 else "normal"
             },
             "categories": {
-                "value": categories,
+                "value": counters["categories"],
                 "trend": "0%"  # Categories typically don't change frequently
             }
         }
 
-    def get_orders_metrics(self) -> Dict:
-        """Calculate order-related metrics"""
-        # Get current date range
+    async def get_order_activity(self) -> Row:
+        """Windowed order counts for the order trends, and this and last month's GMV, in one query"""
         now = datetime.utcnow()
-        thirty_days_ago = now - timedelta(days=30)
-
-        # New orders (created in last 24 hours)
-        new_orders = self.db.query(Order).filter(
-            Order.seller_id == self.user_id,
-            Order.created_at >= now - timedelta(days=1)
-        ).count()
-
-        # Processing orders
-        processing = self.db.query(Order).filter(
-            Order.seller_id == self.user_id,
-            Order.status == OrderStatus.pending
-        ).count()
-
-        # Shipped/fulfilled orders
-        shipped = self.db.query(Order).filter(
+        day, month = TrendWindows(days=1, now=now), TrendWindows(days=30, now=now)
+        start_of_month = datetime(now.year, now.month, 1)
+        start_of_prev_month = (start_of_month - timedelta(days=1)).replace(day=1)
+        not_cancelled = Order.status != OrderStatus.cancelled
+
+        return await _fetch_row(self.db, select(
+            *day.count("new_orders", Order.created_at),
+            *month.count("processing", Order.created_at, Order.status == OrderStatus.pending),
+            *month.count("shipped", Order.updated_at, Order.status == OrderStatus.fulfilled),
+            # Orders don't record returns: "returns" is the orders cancelled in the window, shown
+            # on the dashboard as Cancellations (it used to be a random placeholder)
+            *month.count("returns", Order.updated_at, Order.status == OrderStatus.cancelled),
+            func.sum(Order.total_amount).filter(Order.created_at >= start_of_month, not_cancelled).label("gmv_current"),
+            func.sum(Order.total_amount).filter(
+                Order.created_at >= start_of_prev_month,
+                Order.created_at < start_of_month,
+                not_cancelled
+            ).label("gmv_previous")
+        ).where(
             Order.seller_id == self.user_id,
-            Order.status == OrderStatus.fulfilled,
-            Order.updated_at >= thirty_days_ago
-        ).count()
+            or_(
+                Order.created_at >= min(start_of_prev_month, month.previous_start),
+                month.covers(Order.updated_at)
+            )
+        ))
 
-        # Returns (dummy data as we don't have returns in our model)
-        returns = random.randint(2, 6)  # Dummy value
+    def get_orders_metrics(self, counters: Dict, activity: Row) -> Dict:
+        """Calculate order-related metrics"""
+        returns = activity.returns_current
 
         return {
             "new_orders": {
-                "value": new_orders,
-                "trend": self._calculate_dummy_trend()
+                "value": activity.new_orders_current,
+                "trend": trend(activity, "new_orders")
             },
             "processing": {
-                "value": processing,
-                "trend": self._calculate_dummy_trend()
+                "value": counters["pending_order_count"],
+                "trend": trend(activity, "processing")
             },
             "shipped": {
-                "value": shipped,
-                "trend": self._calculate_dummy_trend()
+                "value": activity.shipped_current,
+                "trend": trend(activity, "shipped")
             },
             "returns": {
                 "value": returns,
-                "trend": self._calculate_dummy_trend(),
+                "trend": trend(activity, "returns"),
                 "status": "warning" if returns > 5 else "normal"
             }
         }
 
-    def get_restock_metrics(self) -> Dict:
-        """Calculate restock-related metrics (dummy data as we don't have restock model)"""
+    async def get_restock_metrics(self) -> Dict:
+        """Calculate restock-related metrics from the seller's restock requests"""
+        windows = TrendWindows(days=30)
+        open_request = RestockRequest.status.in_([RestockRequestStatus.PENDING, RestockRequestStatus.APPROVED])
+        urgent = and_(open_request, RestockRequest.urgency == RestockRequestUrgency.HIGH)
+        row = await _fetch_row(self.db, select(
+            func.count().filter(RestockRequest.status == RestockRequestStatus.PENDING).label("new_requests"),
+            func.count().filter(RestockRequest.status == RestockRequestStatus.APPROVED).label("in_progress"),
+            func.count().filter(RestockRequest.status == RestockRequestStatus.DELIVERED).label("fulfilled"),
+            func.count().filter(urgent).label("urgent"),
+            *windows.count("new_requests", RestockRequest.request_date, RestockRequest.status == RestockRequestStatus.PENDING),
+            *windows.count("in_progress", RestockRequest.request_date, RestockRequest.status == RestockRequestStatus.APPROVED),
+            *windows.count("fulfilled", RestockRequest.delivered_date, RestockRequest.status == RestockRequestStatus.DELIVERED),
+            *windows.count("urgent", RestockRequest.request_date, urgent)
+        ).where(RestockRequest.user_id == self.user_id))
+
         return {
             "new_requests": {
-                "value": random.randint(5, 10),
-                "trend": self._calculate_dummy_trend()
+                "value": row.new_requests,
+                "trend": trend(row, "new_requests")
             },
             "in_progress": {
-                "value": random.randint(8, 15),
-                "trend": self._calculate_dummy_trend()
+                "value": row.in_progress,
+                "trend": trend(row, "in_progress")
             },
             "fulfilled": {
-                "value": random.randint(20, 30),
-                "trend": self._calculate_dummy_trend()
+                "value": row.fulfilled,
+                "trend": trend(row, "fulfilled")
             },
             "urgent": {
-                "value": random.randint(2, 5),
-                "trend": self._calculate_dummy_trend(),
-                "status": "warning"
+                "value": row.urgent,
+                "trend": trend(row, "urgent"),
+                "status": "warning" if row.urgent > 0 else "normal"
             }
         }
 
-    def get_invoice_metrics(self) -> Dict:
-        """Calculate invoice-related metrics for the current user through order relationship"""
-        # Base query joining InvoiceRequest with Order to get seller's invoices
-        base_query = self.db.query(InvoiceRequest).join(
-            Order,
-            InvoiceRequest.order_id == Order.id
-        ).filter(
-            Order.seller_id == self.user_id
-        )
-        
-        # Pending invoices
-        pending = base_query.filter(
-            InvoiceRequest.status == InvoiceStatus.pending
-        ).count()
-
-        # Sent invoices
-        sent = base_query.filter(
-            InvoiceRequest.status == InvoiceStatus.sent
-        ).count()
-
-        # Paid invoices
-        paid = base_query.filter(
-            InvoiceRequest.status == InvoiceStatus.paid
-        ).count()
-
-        # Overdue invoices
-        overdue = base_query.filter(
-            InvoiceRequest.status == InvoiceStatus.overdue
-        ).count()
-
+    async def get_invoice_activity(self) -> Row:
+        """Invoices raised, sent, paid and fallen due in the trend windows, in one query"""
+        windows = TrendWindows(days=30)
+        return await _fetch_row(self.db, select(
+            *windows.count("pending", InvoiceRequest.created_at, InvoiceRequest.status == InvoiceStatus.pending),
+            *windows.count("sent", InvoiceRequest.sent_at),
+            *windows.count("paid", InvoiceRequest.paid_at),
+            *windows.count("overdue", InvoiceRequest.due_date, InvoiceRequest.status == InvoiceStatus.overdue)
+        ).join(Order, InvoiceRequest.order_id == Order.id).where(
+            Order.seller_id == self.user_id,
+            or_(
+                windows.covers(InvoiceRequest.created_at),
+                windows.covers(InvoiceRequest.sent_at),
+                windows.covers(InvoiceRequest.paid_at),
+                windows.covers(InvoiceRequest.due_date)
+            )
+        ))
+
+    def get_invoice_metrics(self, counters: Dict, activity: Row) -> Dict:
+        """Calculate invoice-related metrics; invoices are counted against the seller of their order"""
         return {
             "pending": {
-                "value": pending,
-                "trend": self._calculate_dummy_trend()
+                "value": counters["pending_invoice_count"],
+                "trend": trend(activity, "pending")
             },
             "sent": {
-                "value": sent,
-                "trend": self._calculate_dummy_trend()
+                "value": counters["sent_invoice_count"],
+                "trend": trend(activity, "sent")
             },
             "paid": {
-                "value": paid,
-                "trend": self._calculate_dummy_trend()
+                "value": counters["paid_invoice_count"],
+                "trend": trend(activity, "paid")
             },
             "overdue": {
-                "value": overdue,
-                "trend": self._calculate_dummy_trend(),
-                "status": "danger" if overdue > 0 else "normal"
+                "value": counters["overdue_invoice_count"],
+                "trend": trend(activity, "overdue"),
+                "status": "danger" if counters["overdue_invoice_count"] > 0 else "normal"
             }
         }
 
-    def get_gmv_metrics(self) -> Dict:
+    def get_gmv_metrics(self, activity: Row) -> Dict:
         """Calculate Gross Merchandise Value metrics"""
-        # Current month GMV
-        now = datetime.utcnow()
-        start_of_month = datetime(now.year, now.month, 1)
-        
-        current_month_gmv = self.db.query(func.sum(Order.total_amount)).filter(
-            Order.seller_id == self.user_id,
-            Order.created_at >= start_of_month,
-            Order.status != OrderStatus.cancelled
-        ).scalar() or Decimal('0')
-
-        # Previous month GMV
-        start_of_prev_month = (start_of_month - timedelta(days=1)).replace(day=1)
-        prev_month_gmv = self.db.query(func.sum(Order.total_amount)).filter(
-            Order.seller_id == self.user_id,
-            Order.created_at >= start_of_prev_month,
-            Order.created_at < start_of_month,
-            Order.status != OrderStatus.cancelled
-        ).scalar() or Decimal('0')
+        # Current and previous month GMV
+        current_month_gmv = activity.gmv_current or Decimal('0')
+        prev_month_gmv = activity.gmv_previous or Decimal('0')
 
         # Calculate growth percentage
         if prev_month_gmv > 0:
@@ -207,37 +226,29 @@ class MetricsCalculator:
             "growth_percentage": float(growth_percentage)
         }
 
-    def _calculate_dummy_trend(self) -> str:
-        """Helper method to generate a dummy trend percentage"""
-        trend = random.uniform(-20, 20)
-        return f"+{trend:.1f}%" if trend >= 0 else f"{trend:.1f}%"
-
 class PersonalMetricsCalculator:
-    def __init__(self, db: Session, user_id: int):
+    def __init__(self, db: AsyncSession, user_id: int):
         self.db = db
         self.user_id = user_id
 
-    def get_viewing_metrics(self) -> Dict:
+    async def _count_with_trend(self, counter, *criteria, timestamp) -> Tuple[int, str]:
+        """
+        The maintained `counter` total, and the last 30 days' trend against the 30 before
+        counted over the rows matching `criteria` (a range scan on their timestamp index)
+        """
+        windows = TrendWindows(days=30)
+        total = select(counter).where(BuyerMetrics.user_id == self.user_id).scalar_subquery()
+        row = await _fetch_row(self.db, select(
+            func.coalesce(total, 0).label("total"),
+            *windows.count("rows", timestamp)
+        ).where(*criteria, windows.covers(timestamp)))
+        return row.total, trend(row, "rows")
+
+    async def get_viewing_metrics(self) -> Dict:
         """Calculate viewing related metrics"""
-        total_views = self.db.query(ProductView).filter(
-            ProductView.user_id == self.user_id
-        ).count()
-
-        # Get views in last 30 days for trend
-        thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-        recent_views = self.db.query(ProductView).filter(
-            ProductView.user_id == self.user_id,
-            ProductView.viewed_at >= thirty_days_ago
-        ).count()
-
-        # Calculate trend compared to previous 30 days
-        previous_period = self.db.query(ProductView).filter(
-            ProductView.user_id == self.user_id,
-            ProductView.viewed_at >= thirty_days_ago - timedelta(days=30),
-            ProductView.viewed_at < thirty_days_ago
-        ).count()
-
-        trend = calculate_trend(recent_views, previous_period)
+        total_views, trend = await self._count_with_trend(
+            BuyerMetrics.view_count, ProductView.user_id == self.user_id, timestamp=ProductView.viewed_at
+        )
 
         return {
             "total_views": {
@@ -246,25 +257,11 @@ class PersonalMetricsCalculator:
             }
         }
 
-    def get_wishlist_metrics(self) -> Dict:
+    async def get_wishlist_metrics(self) -> Dict:
         """Calculate wishlist metrics"""
-        total_wishlisted = self.db.query(ProductWishlist).filter(
-            ProductWishlist.user_id == self.user_id
-        ).count()
-
-        thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-        recent_wishlisted = self.db.query(ProductWishlist).filter(
-            ProductWishlist.user_id == self.user_id,
-            ProductWishlist.created_at >= thirty_days_ago
-        ).count()
-
-        previous_period = self.db.query(ProductWishlist).filter(
-            ProductWishlist.user_id == self.user_id,
-            ProductWishlist.created_at >= thirty_days_ago - timedelta(days=30),
-            ProductWishlist.created_at < thirty_days_ago
-        ).count()
-
-        trend = calculate_trend(recent_wishlisted, previous_period)
+        total_wishlisted, trend = await self._count_with_trend(
+            BuyerMetrics.wishlist_count, ProductWishlist.user_id == self.user_id, timestamp=ProductWishlist.created_at
+        )
 
         return {
             "total_wishlisted": {
@@ -273,25 +270,11 @@ class PersonalMetricsCalculator:
             }
         }
 
-    def get_review_metrics(self) -> Dict:
+    async def get_review_metrics(self) -> Dict:
         """Calculate review metrics"""
-        total_reviews = self.db.query(ProductReview).filter(
-            ProductReview.user_id == self.user_id
-        ).count()
-
-        thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-        recent_reviews = self.db.query(ProductReview).filter(
-            ProductReview.user_id == self.user_id,
-            ProductReview.created_at >= thirty_days_ago
-        ).count()
-
-        previous_period = self.db.query(ProductReview).filter(
-            ProductReview.user_id == self.user_id,
-            ProductReview.created_at >= thirty_days_ago - timedelta(days=30),
-            ProductReview.created_at < thirty_days_ago
-        ).count()
-
-        trend = calculate_trend(recent_reviews, previous_period)
+        total_reviews, trend = await self._count_with_trend(
+            BuyerMetrics.review_count, ProductReview.user_id == self.user_id, timestamp=ProductReview.created_at
+        )
 
         return {
             "total_reviews": {
@@ -300,28 +283,14 @@ class PersonalMetricsCalculator:
             }
         }
 
-    def get_purchase_metrics(self) -> Dict:
+    async def get_purchase_metrics(self) -> Dict:
         """Calculate purchase metrics"""
-        total_purchases = self.db.query(Order).filter(
-            Order.buyer_id == self.user_id,
-            Order.status == OrderStatus.fulfilled
-        ).count()
-
-        thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-        recent_purchases = self.db.query(Order).filter(
+        total_purchases, trend = await self._count_with_trend(
+            BuyerMetrics.purchase_count,
             Order.buyer_id == self.user_id,
             Order.status == OrderStatus.fulfilled,
-            Order.created_at >= thirty_days_ago
-        ).count()
-
-        previous_period = self.db.query(Order).filter(
-            Order.buyer_id == self.user_id,
-            Order.status == OrderStatus.fulfilled,
-            Order.created_at >= thirty_days_ago - timedelta(days=30),
-            Order.created_at < thirty_days_ago
-        ).count()
-
-        trend = calculate_trend(recent_purchases, previous_period)
+            timestamp=Order.created_at
+        )
 
         return {
             "total_purchases": {
@@ -330,32 +299,33 @@ class PersonalMetricsCalculator:
             }
         }
 
-def calculate_trend(current: int, previous: int) -> str:
-    """Helper function to calculate trend percentage"""
-    if previous == 0:
-        return "+100%" if current > 0 else "0%"
-    
-    change = ((current - previous) / previous) * 100
-    return f"+{change:.1f}%" if change >= 0 else f"{change:.1f}%"
-
-async def get_all_metrics(db: Session, user_id: int, active_view: str) -> Dict:
-    """Get all metrics based on active view"""
+async def get_all_metrics(db: AsyncSession, user_id: int, active_view: str) -> Dict:
+    """
+    Get all metrics based on active view; totals come from the maintained counters, and each
+    table's trend windows from one query on it. The queries run one after another on the
+    request's session, so a dashboard load holds a single pooled connection.
+    """
     if active_view == "business":
         calculator = MetricsCalculator(db, user_id)
+        counters = await calculator.get_seller_counters()
+        products = await calculator.get_product_activity()
+        orders = await calculator.get_order_activity()
+        invoices = await calculator.get_invoice_activity()
+        restock = await calculator.get_restock_metrics()
         return {
-            "inventory": calculator.get_inventory_metrics(),
-            "orders": calculator.get_orders_metrics(),
-            "restock": calculator.get_restock_metrics(),
-            "invoicing": calculator.get_invoice_metrics(),
-            "gmv": calculator.get_gmv_metrics()
+            "inventory": calculator.get_inventory_metrics(counters, products),
+            "orders": calculator.get_orders_metrics(counters, orders),
+            "restock": restock,
+            "invoicing": calculator.get_invoice_metrics(counters, invoices),
+            "gmv": calculator.get_gmv_metrics(orders)
         }
     else:
         calculator = PersonalMetricsCalculator(db, user_id)
         return {
-            "viewing": calculator.get_viewing_metrics(),
-            "wishlist": calculator.get_wishlist_metrics(),
-            "reviews": calculator.get_review_metrics(),
-            "purchases": calculator.get_purchase_metrics()
+            "viewing": await calculator.get_viewing_metrics(),
+            "wishlist": await calculator.get_wishlist_metrics(),
+            "reviews": await calculator.get_review_metrics(),
+            "purchases": await calculator.get_purchase_metrics()
         }
 
 """async def get_all_metrics(db: Session, user_id: int) -> Dict:
@@ -23,11 +23,15 @@ echo "PostgreSQL is up - executing migrations"
 mkdir -p /app/alembic/versions
 chmod 777 /app/alembic/versions
 
-# Check if this is first run (no migrations exist)
-if [ -z "$(ls -A /app/alembic/versions 2>/dev/null)" ]; then
-    echo "No migrations found. Creating initial migration..."
-    alembic revision --autogenerate -m "initial_migration"
-fi
+# Migrations are kept in alembic/versions. Deployments started before that autogenerated an
+# untracked initial revision on their first run, and their schema is the tracked baseline:
+# retire that revision and stamp the database at the baseline, then upgrade from there
+for legacy in /app/alembic/versions/*_initial_migration.py; do
+    [ -e "$legacy" ] || continue
+    echo "Retiring locally generated migration $legacy"
+    mv "$legacy" "$legacy.retired"
+    alembic stamp --purge 0001_baseline
+done
 
 # Run migrations
 echo "Running migrations..."
@@ -18,6 +18,7 @@ import { apiBaseUrl } from '@/config';
 
 export default function AdminFeedback() {
   const [feedback, setFeedback] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [isLoading, setIsLoading] = useState(true);
   const [selectedFeedback, setSelectedFeedback] = useState(null);
   const [statusFilter, setStatusFilter] = useState('all');
@@ -26,13 +27,16 @@ export default function AdminFeedback() {
   const router = useRouter();
   const { toast } = useToast();
 
-  const fetchFeedback = useCallback(async () => {
-    setIsLoading(true);
+  const fetchFeedback = useCallback(async (cursor = null) => {
+    if (!cursor) setIsLoading(true);
     try {
       // Ensure we access localStorage only on the client side
       if (typeof window !== 'undefined' && window.localStorage) {
         const token = localStorage.getItem('token');
-        const url = `${apiBaseUrl}/feedback/admin/feedback${statusFilter !== 'all' ? `?status=${statusFilter}` : ''}`;
+        const params = new URLSearchParams();
+        if (statusFilter !== 'all') params.append('status', statusFilter);
+        if (cursor) params.append('cursor', cursor);
+        const url = `${apiBaseUrl}/feedback/admin/feedback?${params}`;
         const response = await fetch(url, {
           headers: {
             'Authorization': `Bearer ${token}`,
@@ -45,7 +49,9 @@ export default function AdminFeedback() {
         }
   
         const data = await response.json();
-        setFeedback(Array.isArray(data) ? data : []);
+        const items = Array.isArray(data.items) ? data.items : [];
+        setFeedback(prev => cursor ? [...prev, ...items] : items);
+        setNextCursor(data.next_cursor || null);
       }
     } catch (error) {
       toast({
@@ -199,6 +205,13 @@ export default function AdminFeedback() {
             </tbody>
           </table>
         </div>
+        {nextCursor && !isLoading && (
+          <div className="flex justify-center mt-4">
+            <Button variant="outline" onClick={() => fetchFeedback(nextCursor)}>
+              Load more
+            </Button>
+          </div>
+        )}
 
         <Dialog open={!!selectedFeedback} onOpenChange={() => setSelectedFeedback(null)}>
           <DialogContent>
@@ -18,6 +18,7 @@ import { apiBaseUrl } from '@/config';
 
 export default function AdminPayoutManagement() {
   const [payouts, setPayouts] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [isLoading, setIsLoading] = useState(true);
   const [statusFilter, setStatusFilter] = useState('all');
   const [selectedPayout, setSelectedPayout] = useState(null);
@@ -27,13 +28,16 @@ export default function AdminPayoutManagement() {
   const router = useRouter();
   const { toast } = useToast();
 
-  const fetchPayouts = useCallback(async () => {
-    setIsLoading(true);
+  const fetchPayouts = useCallback(async (cursor = null) => {
+    if (!cursor) setIsLoading(true);
     try {
       // Ensure we're in the client-side context before accessing localStorage
       if (typeof window !== 'undefined' && window.localStorage) {
         const token = localStorage.getItem('token');
-        const url = `${apiBaseUrl}/admin/payouts${statusFilter !== 'all' ? `?status=${statusFilter}` : ''}`;
+        const params = new URLSearchParams();
+        if (statusFilter !== 'all') params.append('status', statusFilter);
+        if (cursor) params.append('cursor', cursor);
+        const url = `${apiBaseUrl}/admin/payouts?${params}`;
         const response = await fetch(url, {
           headers: {
             'Authorization': `Bearer ${token}`,
@@ -46,7 +50,9 @@ export default function AdminPayoutManagement() {
         }
   
         const data = await response.json();
-        setPayouts(Array.isArray(data) ? data : []);
+        const items = Array.isArray(data.items) ? data.items : [];
+        setPayouts(prev => cursor ? [...prev, ...items] : items);
+        setNextCursor(data.next_cursor || null);
       }
     } catch (error) {
       toast({
@@ -216,6 +222,13 @@ export default function AdminPayoutManagement() {
             </tbody>
           </table>
         </div>
+        {nextCursor && !isLoading && (
+          <div className="flex justify-center mt-4">
+            <Button variant="outline" onClick={() => fetchPayouts(nextCursor)}>
+              Load more
+            </Button>
+          </div>
+        )}
 
         {/* Payout Details Dialog */}
         <Dialog open={!!selectedPayout} onOpenChange={() => setSelectedPayout(null)}>
@@ -149,7 +149,7 @@ useEffect(() => {
         { label: "New Orders", key: "new_orders" },
         { label: "Processing", key: "processing" },
         { label: "Shipped", key: "shipped" },
-        { label: "Returns", key: "returns" }
+        { label: "Cancellations", key: "returns" }
       ]
     },
     {
@@ -18,6 +18,7 @@ import { apiBaseUrl } from '@/config';
 
 const InvoicingPage = () => {
   const [invoices, setInvoices] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [selectedInvoice, setSelectedInvoice] = useState(null);
   const [isGenerating, setIsGenerating] = useState(false);
   const [isDownloading, setIsDownloading] = useState(false);
@@ -40,7 +41,7 @@ const InvoicingPage = () => {
 
   const { toast } = useToast();
 
-  const fetchInvoices = useCallback(async () => {
+  const fetchInvoices = useCallback(async (cursor = null) => {
     if (typeof window !== 'undefined') { // Check if we're on the client side
       try {
         const token = localStorage.getItem('token');
@@ -48,15 +49,16 @@ const InvoicingPage = () => {
           throw new Error('Authorization token is missing');
         }
   
-        const response = await fetch(`${apiBaseUrl}/invoicing/requests`, {
+        const response = await fetch(`${apiBaseUrl}/invoicing/requests${cursor ? `?cursor=${cursor}` : ''}`, {
           headers: {
             'Authorization': `Bearer ${token}`,
           },
         });
   
         const data = await response.json();
-        if (Array.isArray(data)) {
-          setInvoices(data);
+        if (Array.isArray(data.items)) {
+          setInvoices(prev => cursor ? [...prev, ...data.items] : data.items);
+          setNextCursor(data.next_cursor);
         }
       } catch (error) {
         toast({
@@ -563,7 +565,7 @@ const InvoicingPage = () => {
                 </Select>
                 <Button 
                   variant="outline" 
-                  onClick={fetchInvoices}
+                  onClick={() => fetchInvoices()}
                   className="whitespace-nowrap"
                 >
                   <RefreshCw className="mr-2 h-4 w-4" />
@@ -666,6 +668,13 @@ const InvoicingPage = () => {
                   </Table>
                 </Card>
               )}
+              {nextCursor && (
+                <div className="flex justify-center">
+                  <Button variant="outline" onClick={() => fetchInvoices(nextCursor)}>
+                    Load more
+                  </Button>
+                </div>
+              )}
             </div>
           </TabsContent>
 
@@ -21,8 +21,10 @@ const MyItemsView = () => {
   //const [endDate, setEndDate] = useState(null);
   const [items, setItems] = useState([]);
   const [loading, setLoading] = useState(false);
-  const [page, setPage] = useState(1);
-  const [totalPages, setTotalPages] = useState(1);
+  // Cursors of the pages visited so far; the last one is the current page (null = first page)
+  const [cursors, setCursors] = useState([null]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const cursor = cursors[cursors.length - 1];
   const { toast } = useToast();
 
   const { addToCart } = useCart();
@@ -38,12 +40,12 @@ const MyItemsView = () => {
         }
   
         const params = new URLSearchParams({
-          page,
           limit: 12,
           search: searchTerm,
           // ...(startDate && { start_date: startDate.toISOString() }),
           // ...(endDate && { end_date: endDate.toISOString() }),
-          ...(activeTab === 'orders' && { status: orderStatus })
+          ...(activeTab === 'orders' && { status: orderStatus }),
+          ...(cursor && { cursor })
         });
   
         const response = await fetch(
@@ -59,7 +61,7 @@ const MyItemsView = () => {
   
         const data = await response.json();
         setItems(data.items);
-        setTotalPages(data.pages);
+        setNextCursor(data.next_cursor);
       } else {
         throw new Error('Window not found, localStorage is unavailable');
       }
@@ -73,7 +75,12 @@ const MyItemsView = () => {
     } finally {
       setLoading(false);
     }
-  }, [activeTab, orderStatus, page, searchTerm, toast]);  
+  }, [activeTab, orderStatus, cursor, searchTerm, toast]);  
+
+  // Changing tab or filters starts again from the first page
+  useEffect(() => {
+    setCursors([null]);
+  }, [activeTab, orderStatus, searchTerm]);
 
   useEffect(() => {
     fetchItems();
@@ -236,31 +243,20 @@ const MyItemsView = () => {
         </TabsContent>
 
         {/* Pagination */}
-        {totalPages > 1 && (
-          <div className="mt-8 flex justify-center gap-2">
+        {(cursors.length > 1 || nextCursor) && (
+          <div className="mt-8 flex justify-center items-center gap-2">
             <Button
               variant="outline"
-              onClick={() => setPage(p => Math.max(1, p - 1))}
-              disabled={page === 1}
+              onClick={() => setCursors(c => c.slice(0, -1))}
+              disabled={cursors.length === 1}
             >
               Previous
             </Button>
-            <div className="flex items-center gap-2">
-              {[...Array(totalPages)].map((_, i) => (
-                <Button
-                  key={i}
-                  variant={page === i + 1 ? "default" : "outline"}
-                  onClick={() => setPage(i + 1)}
-                  className="w-10 h-10 p-0"
-                >
-                  {i + 1}
-                </Button>
-              ))}
-            </div>
+            <span className="px-2 text-sm text-gray-500">Page {cursors.length}</span>
             <Button
               variant="outline"
-              onClick={() => setPage(p => Math.min(totalPages, p + 1))}
-              disabled={page === totalPages}
+              onClick={() => setCursors(c => [...c, nextCursor])}
+              disabled={!nextCursor}
             >
               Next
             </Button>
@@ -23,6 +23,7 @@ const StorefrontManagement = () => {
   const [inventoryProducts, setInventoryProducts] = useState([]);
   const [storeProducts, setStoreProducts] = useState([]);
   const [orders, setOrders] = useState([]);
+  const [ordersCursor, setOrdersCursor] = useState(null);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState('');
   //const [selectedProducts, setSelectedProducts] = useState([]);
@@ -91,20 +92,21 @@ const StorefrontManagement = () => {
     }
   };  
 
-  const fetchOrders = async () => {
+  const fetchOrders = async (cursor = null) => {
     try {
       // Check for the presence of `window` to ensure we are in the browser
       if (typeof window !== 'undefined') {
         const token = localStorage.getItem('token');
         if (!token) throw new Error('Token is missing');
   
-        const response = await fetch(`${apiBaseUrl}/orders/seller/list`, {
+        const response = await fetch(`${apiBaseUrl}/orders/seller/list${cursor ? `?cursor=${cursor}` : ''}`, {
           headers: {
             'Authorization': `Bearer ${token}`
           }
         });
         const data = await response.json();
-        setOrders(data);
+        setOrders(prev => cursor ? [...prev, ...data.items] : data.items);
+        setOrdersCursor(data.next_cursor);
       } else {
         throw new Error('Window not found, localStorage is unavailable');
       }
@@ -338,6 +340,13 @@ const StorefrontManagement = () => {
             </div>
           </div>
         ))}
+        {ordersCursor && (
+          <div className="flex justify-center">
+            <Button variant="outline" onClick={() => fetchOrders(ordersCursor)}>
+              Load more
+            </Button>
+          </div>
+        )}
 
         {/* Delete Order Confirmation Dialog */}
         {orderToDelete && (
@@ -18,14 +18,14 @@ export default function DashboardLayout ({ children }) {
   const [isAuthenticated, setIsAuthenticated] = useState(false);
   const { 
     notifications, 
+    unreadCount,
+    hasMore,
     loading, 
     markAsRead, 
-    markAllAsRead 
+    markAllAsRead,
+    loadMore
   } = useNotifications();
 
-  // Calculate unread count
-  const unreadCount = notifications.filter(n => !n.is_read).length;
-
   useEffect(() => {
     // Ensure the code runs only on the client (browser)
     if (typeof window !== 'undefined') {
@@ -112,7 +112,9 @@ export default function DashboardLayout ({ children }) {
         loading={loading}
         onNotificationClick={markAsRead}
         onMarkAllRead={markAllAsRead}
+        onLoadMore={loadMore}
         unreadCount={unreadCount}
+        hasMore={hasMore}
         onMouseEnter={() => !isMobile && setIsSidebarOpen(true)}
         onMouseLeave={() => !isMobile && setIsSidebarOpen(false)}
         sidebarRef={sidebarRef}
@@ -26,9 +26,12 @@ const Sidebar = ({
   searchQuery, 
   onSearchChange,
   notifications = [],
+  unreadCount = 0,
+  hasMore = false,
   loading = false,
   onNotificationClick,
   onMarkAllRead,
+  onLoadMore,
   onMouseEnter,
   onMouseLeave,
   sidebarRef 
@@ -108,8 +111,6 @@ const Sidebar = ({
 
   const currentMenuItems = activeView === 'personal' ? personalMenuItems : businessMenuItems;
 
-  const unreadCount = notifications.filter(n => !n.is_read).length;
-
   return (
     <>
       {/* Overlay for mobile */}
@@ -238,6 +239,16 @@ const Sidebar = ({
                       </div>
                     </div>
                   ))}
+                  {hasMore && (
+                    <Button
+                      variant="ghost"
+                      size="sm"
+                      className="w-full text-xs text-green-600 hover:text-green-700"
+                      onClick={onLoadMore}
+                    >
+                      Load more
+                    </Button>
+                  )}
                 </div>
               )}
             </ScrollArea>
@@ -5,6 +5,7 @@ import { Select, SelectContent, SelectItem, SelectTrigger, SelectValue } from "@
 import { Input } from "@/components/ui/input";
 import { Label } from "@/components/ui/label";
 import { Badge } from "@/components/ui/badge";
+import { Button } from "@/components/ui/button";
 import { apiBaseUrl } from '@/config';
 import { useToast } from "@/hooks/use-toast";
 
@@ -38,6 +39,7 @@ export const TransactionsTab = () => {
     const [transactionType, setTransactionType] = useState('all');
     const [transactionTag, setTransactionTag] = useState(TRANSACTION_TAGS.ALL);
     const [transactions, setTransactions] = useState([]);
+    const [nextCursor, setNextCursor] = useState(null);
     const [loading, setLoading] = useState(true);
     const { toast } = useToast();
 
@@ -73,7 +75,7 @@ export const TransactionsTab = () => {
       setEndDate(newEndDate);
     };
 
-    const fetchTransactions = useCallback(async () => {
+    const fetchTransactions = useCallback(async (cursor = null) => {
       try {
         if (typeof window === 'undefined') return; 
         
@@ -86,6 +88,7 @@ export const TransactionsTab = () => {
         if (endDate) url += `&end_date=${endDate}`;
         if (transactionType !== 'all') url += `&transaction_type=${transactionType}`;
         if (transactionTag !== TRANSACTION_TAGS.ALL) url += `&transaction_tag=${transactionTag}`;
+        if (cursor) url += `&cursor=${cursor}`;
 
         const response = await fetch(url, {
           headers: {
@@ -96,7 +99,9 @@ export const TransactionsTab = () => {
         if (!response.ok) throw new Error('Failed to fetch transactions');
         
         const data = await response.json();
-        setTransactions(data);
+        // Later pages are appended; a fresh fetch (new filters) replaces the list
+        setTransactions(prev => cursor ? [...prev, ...data.items] : data.items);
+        setNextCursor(data.next_cursor);
       } catch (error) {
         toast({
           title: "Error",
@@ -278,6 +283,13 @@ export const TransactionsTab = () => {
                   </div>
                 ))
               )}
+              {nextCursor && (
+                <div className="flex justify-center">
+                  <Button variant="outline" onClick={() => fetchTransactions(nextCursor)}>
+                    Load more
+                  </Button>
+                </div>
+              )}
             </div>
           </CardContent>
         </Card>
@@ -1,8 +1,12 @@
-import { useState, useEffect, useCallback } from 'react';
+import { useState, useEffect, useCallback, useRef } from 'react';
 import { apiBaseUrl } from '@/config';
 
 export const useNotifications = () => {
     const [notifications, setNotifications] = useState([]);
+    const [nextCursor, setNextCursor] = useState(null);
+    const [unreadCount, setUnreadCount] = useState(0);
+    // Set once older pages are loaded, so polling keeps their cursor
+    const loadedMore = useRef(false);
     const [loading, setLoading] = useState(true);
     const [error, setError] = useState(null);
     const [userView, setUserView] = useState(null);
@@ -22,11 +26,12 @@ export const useNotifications = () => {
         }
     };
   
-    const fetchNotifications = useCallback(async () => {
+    const fetchNotifications = useCallback(async (cursor = null) => {
       const currentUserView = fetchUserView();
         if (!currentUserView) {
             console.error('No active user found. Skipping notification fetch.');
             setNotifications([]);
+            setUnreadCount(0);
             setLoading(false);
             return;
         }
@@ -37,6 +42,7 @@ export const useNotifications = () => {
         const queryParams = new URLSearchParams({
             user_view: currentUserView,
         });
+        if (cursor) queryParams.append('cursor', cursor);
 
         const response = await fetch(`${apiBaseUrl}/notifications/get_notifications?${queryParams}`, {
           headers: {
@@ -47,7 +53,15 @@ export const useNotifications = () => {
         if (!response.ok) throw new Error('Failed to fetch notifications');
         
         const data = await response.json();
-        setNotifications(data);
+        // loadMore appends older pages; polling refreshes the first page in front of them
+        setNotifications(prev => {
+          const ids = new Set(data.items.map(notification => notification.id));
+          const kept = prev.filter(notification => !ids.has(notification.id));
+          return cursor ? [...kept, ...data.items] : [...data.items, ...kept];
+        });
+        if (cursor) loadedMore.current = true;
+        if (cursor || !loadedMore.current) setNextCursor(data.next_cursor);
+        if (!cursor) setUnreadCount(data.unread_count);
         setLoading(false);
       } catch (err) {
         setError(err.message);
@@ -64,7 +78,9 @@ export const useNotifications = () => {
           }
         });
         
-        setNotifications(notifications.map(notification => 
+        const target = notifications.find(notification => notification.id === notificationId);
+        if (target && !target.is_read) setUnreadCount(count => Math.max(count - 1, 0));
+        setNotifications(prev => prev.map(notification => 
           notification.id === notificationId 
             ? { ...notification, is_read: true }
             : notification
@@ -83,7 +99,8 @@ export const useNotifications = () => {
           }
         });
         
-        setNotifications(notifications.map(notification => ({
+        setUnreadCount(0);
+        setNotifications(prev => prev.map(notification => ({
           ...notification,
           is_read: true
         })));
@@ -94,16 +111,19 @@ export const useNotifications = () => {
   
     useEffect(() => {
       fetchNotifications();
-      const interval = setInterval(fetchNotifications, 30000);
+      const interval = setInterval(() => fetchNotifications(), 30000);
       return () => clearInterval(interval);
     }, [fetchNotifications]);
   
     return {
       notifications,
+      unreadCount,
       loading,
       error,
       markAsRead,
       markAllAsRead,
-      refresh: fetchNotifications
+      hasMore: Boolean(nextCursor),
+      loadMore: () => nextCursor && fetchNotifications(nextCursor),
+      refresh: () => fetchNotifications()
     };
   };
\ No newline at end of file